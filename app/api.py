@@ -0,0 +1,295 @@
+import asyncio
+import os
+import secrets
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+from app.services.access import MEDIA_KEYS
+from app.services.archive import ARCHIVE
+from app.services.metrics import SAMPLER, SESSIONS, render
+from app.services.mixer import MIXERS
+from app.services.ptt import GLOBAL_PTT_LATENCY
+from app.services.session import GLOBAL_RECOVERY_MS, GLOBAL_STARTUP_MS, RoomSession
+from app.services.thumbnails import THUMBNAILS, thumb_key
+from app.services.tokens import ISSUER
+
+# Operator token for the archive, metrics and stats routes. ARCHIVE_API_TOKEN
+# is its older name and still read when OPERATOR_API_TOKEN is unset.
+OPERATOR_API_TOKEN = os.environ.get("OPERATOR_API_TOKEN") or os.environ.get(
+    "ARCHIVE_API_TOKEN", ""
+)
+UNAUTHORIZED = {"error": "operator token or media key required"}
+
+
+def _operator(request: Request) -> bool:
+    """Whether the request carries `Authorization: Bearer $OPERATOR_API_TOKEN`."""
+    return bool(OPERATOR_API_TOKEN) and secrets.compare_digest(
+        request.headers.get("authorization", "").encode(),
+        f"Bearer {OPERATOR_API_TOKEN}".encode(),
+    )
+
+
+def authorized(request: Request) -> bool:
+    """Whether the caller holds the operator token or any live media key."""
+    if _operator(request):
+        return True
+    return MEDIA_KEYS.session(request.query_params.get("key", "")) is not None
+
+
+def archive_room(request: Request) -> str | None:
+    """Room the caller may read recordings of: "" for all, None for none.
+
+    The operator token opens every room; a browser's media key opens the
+    room its session is in.
+    """
+    if _operator(request):
+        return ""
+    session = MEDIA_KEYS.session(request.query_params.get("key", ""))
+    if session is None or session.room is None:
+        return None
+    return session.room.name or "room"
+
+
+def stats_sessions(request: Request) -> list[RoomSession] | None:
+    """Sessions whose stats the caller may see, or None for neither credential.
+
+    The operator token sees every session; a media key only its own.
+    """
+    if _operator(request):
+        return list(SESSIONS)
+    session = MEDIA_KEYS.session(request.query_params.get("key", ""))
+    return None if session is None else [session]
+
+
+async def metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape target: sessions, PTT, errors, WebRTC stats, loop lag.
+
+    Operator token only: the labels name every room and identity served.
+    """
+    if not _operator(request):
+        return PlainTextResponse("operator token required", 401)
+    SAMPLER.start()
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
+
+
+async def ptt_latency(request: Request) -> JSONResponse:
+    """Process-wide PTT press latency per stage, in milliseconds."""
+    if not authorized(request):
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(GLOBAL_PTT_LATENCY.summary())
+
+
+async def session_recovery(request: Request) -> JSONResponse:
+    """Process-wide time from connection loss to a usable room, in milliseconds."""
+    if not authorized(request):
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(GLOBAL_RECOVERY_MS.summary())
+
+
+async def session_startup(request: Request) -> JSONResponse:
+    """Process-wide connect-to-ready time per startup phase, in milliseconds."""
+    if not authorized(request):
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(
+        {phase: window.summary() for phase, window in GLOBAL_STARTUP_MS.items()}
+    )
+
+
+async def token_stats(request: Request) -> JSONResponse:
+    """Token issuer cache size, hit rate and signing time."""
+    if not authorized(request):
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(ISSUER.stats())
+
+
+async def audio_stats(request: Request) -> JSONResponse:
+    """Mix CPU, jitter-buffer underruns and end-to-end latency per visible mixer."""
+    sessions = stats_sessions(request)
+    if sessions is None:
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(
+        {
+            session.mixer.id: session.mixer.stats()
+            for session in sessions
+            if session.mixer is not None
+        }
+    )
+
+
+async def audio_mix(websocket: WebSocket):
+    """Mixed remote audio as 20 ms mu-law frames; the player reports playout back.
+
+    Needs the media key of the session the mixer belongs to.
+    """
+    session = MEDIA_KEYS.session(websocket.query_params.get("key", ""))
+    if session is None:
+        await websocket.close(code=4403)
+        return
+    mixer = MIXERS.get(websocket.path_params["mix_id"])
+    if mixer is None or session.mixer is not mixer:
+        await websocket.close(code=4404)
+        return
+    await websocket.accept()
+    frames = mixer.listen()
+
+    async def send():
+        while frame := await frames.get():
+            await websocket.send_bytes(frame)
+
+    async def receive():
+        while True:
+            mixer.report(await websocket.receive_json())
+
+    tasks = [asyncio.create_task(send()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        mixer.unlisten(frames)
+
+
+async def archive_search(request: Request) -> JSONResponse:
+    """Recorded transmissions by room, identity and time range (epoch ms)."""
+    allowed = archive_room(request)
+    if allowed is None:
+        return JSONResponse(UNAUTHORIZED, 401)
+    params = request.query_params
+    if allowed and params.get("room", allowed) != allowed:
+        return JSONResponse({"error": "no access to that room"}, 403)
+    try:
+        since, until = (
+            int(params[key]) if key in params else None for key in ("since", "until")
+        )
+        limit = min(int(params.get("limit", 100)), 1000)
+    except ValueError:
+        return JSONResponse({"error": "since, until and limit must be integers"}, 400)
+    rows = await run_in_threadpool(
+        ARCHIVE.search,
+        allowed or params.get("room"),
+        params.get("identity"),
+        since,
+        until,
+        limit,
+    )
+    return JSONResponse(rows)
+
+
+async def archive_stats(request: Request) -> JSONResponse:
+    """Writer spool usage, dropped audio and index lookup time."""
+    if not authorized(request):
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(ARCHIVE.stats())
+
+
+async def archive_playback(request: Request) -> Response:
+    """One recorded transmission as WAV, streamed from a memory map."""
+    allowed = archive_room(request)
+    if allowed is None:
+        return Response(status_code=401)
+    chunks = await run_in_threadpool(
+        ARCHIVE.read, request.path_params["transmission_id"], allowed or None
+    )
+    if chunks is None:
+        return Response(status_code=404)
+    return StreamingResponse(chunks, media_type="audio/wav")
+
+
+async def video_stats(request: Request) -> JSONResponse:
+    """Encode time, delivered fps and dropped frames per visible session and feed."""
+    sessions = stats_sessions(request)
+    if sessions is None:
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(
+        {
+            f"{session.room.name}/{session.room.local_participant.identity}": {
+                sid: feed.stats() for sid, feed in session.video_feeds.feeds.items()
+            }
+            for session in sessions
+            if session.video_feeds is not None and session.room is not None
+        }
+    )
+
+
+async def video_feed(request: Request) -> Response:
+    """MJPEG stream of one camera track the key's session is subscribed to."""
+    session = MEDIA_KEYS.session(request.query_params.get("key", ""))
+    if session is None:
+        return Response(status_code=403)
+    feeds = session.video_feeds
+    feed = feeds.feeds.get(request.path_params["track_sid"]) if feeds else None
+    if feed is None:
+        return Response(status_code=404)
+
+    async def body():
+        async for jpeg in feed.frames():
+            yield (
+                b"--frame\r\nContent-Type: image/jpeg\r\nContent-Length: "
+                + str(len(jpeg)).encode()
+                + b"\r\n\r\n"
+                + jpeg
+                + b"\r\n"
+            )
+
+    return StreamingResponse(
+        body(),
+        media_type="multipart/x-mixed-replace; boundary=frame",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+async def thumbnail_stats(request: Request) -> JSONResponse:
+    """Thumbnail cache size, hit rate and share of requests answered with 304."""
+    if not authorized(request):
+        return JSONResponse(UNAUTHORIZED, 401)
+    return JSONResponse(THUMBNAILS.stats())
+
+
+async def thumbnail(request: Request) -> Response:
+    """Latest still of one camera in the key's room; revalidates against its ETag."""
+    session = MEDIA_KEYS.session(request.query_params.get("key", ""))
+    if session is None:
+        return Response(status_code=403)
+    if session.room is None:
+        return Response(status_code=404)
+    thumb, fresh = THUMBNAILS.lookup(
+        thumb_key(session.room.name, request.path_params["track_sid"]),
+        request.headers.get("if-none-match", ""),
+    )
+    if thumb is None:
+        return Response(status_code=404)
+    headers = {"ETag": f'"{thumb.etag}"', "Cache-Control": "no-cache"}
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    return Response(thumb.jpeg, media_type="image/jpeg", headers=headers)
+
+
+api = Starlette(
+    routes=[
+        Route("/metrics", metrics),
+        Route("/api/ptt/latency", ptt_latency),
+        Route("/api/session/recovery", session_recovery),
+        Route("/api/session/startup", session_startup),
+        Route("/api/tokens/stats", token_stats),
+        Route("/api/audio/stats", audio_stats),
+        WebSocketRoute("/api/audio/{mix_id}", audio_mix),
+        Route("/api/archive", archive_search),
+        Route("/api/archive/stats", archive_stats),
+        Route("/api/archive/{transmission_id:int}", archive_playback),
+        Route("/api/video/stats", video_stats),
+        Route("/api/video/{track_sid}", video_feed),
+        Route("/api/thumbs/stats", thumbnail_stats),
+        Route("/api/thumbs/{track_sid}", thumbnail),
+    ]
+)
@@ -1,4 +1,5 @@
 import reflex as rx
+from app.api import api
 from app.components.connection_ui import connection_form
 from app.components.room_ui import room_view
 from app.states.livekit_state import LiveKitState
@@ -44,6 +45,7 @@ def index() -> rx.Component:
 
 app = rx.App(
     theme=rx.theme(appearance="light"),
+    api_transformer=api,
     head_components=[
         rx.el.link(rel="preconnect", href="https://fonts.googleapis.com"),
         rx.el.link(rel="preconnect", href="https://fonts.gstatic.com", cross_origin=""),
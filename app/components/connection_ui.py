@@ -13,9 +13,13 @@ def status_badge() -> rx.Component:
                     LiveKitState.connection_status == "connecting",
                     "animate-bounce h-2.5 w-2.5 rounded-full bg-yellow-500",
                     rx.cond(
-                        LiveKitState.connection_status == "error",
-                        "h-2.5 w-2.5 rounded-full bg-red-500",
-                        "h-2.5 w-2.5 rounded-full bg-gray-400",
+                        LiveKitState.connection_status == "reconnecting",
+                        "animate-pulse h-2.5 w-2.5 rounded-full bg-yellow-500",
+                        rx.cond(
+                            LiveKitState.connection_status == "error",
+                            "h-2.5 w-2.5 rounded-full bg-red-500",
+                            "h-2.5 w-2.5 rounded-full bg-gray-400",
+                        ),
                     ),
                 ),
             )
@@ -56,13 +60,59 @@ def connection_form() -> rx.Component:
                 ),
                 class_name="mb-5",
             ),
+            rx.cond(
+                LiveKitState.token_issuer,
+                rx.el.div(
+                    rx.el.div(
+                        rx.el.label(
+                            "Room",
+                            class_name="block text-sm font-medium text-gray-700 mb-1.5",
+                        ),
+                        rx.el.input(
+                            placeholder="ops-channel",
+                            on_change=LiveKitState.set_room_name,
+                            disabled=LiveKitState.is_connected,
+                            class_name=rx.cond(
+                                LiveKitState.is_connected,
+                                "w-full px-4 py-2.5 bg-gray-50 border border-gray-200 rounded-lg text-gray-500 cursor-not-allowed",
+                                "w-full px-4 py-2.5 bg-white border border-gray-300 rounded-lg focus:ring-2 focus:ring-violet-500 focus:border-violet-500 transition-all text-gray-900 placeholder-gray-400",
+                            ),
+                            default_value=LiveKitState.room_name,
+                        ),
+                        class_name="flex-1 min-w-0",
+                    ),
+                    rx.el.div(
+                        rx.el.label(
+                            "Identity",
+                            class_name="block text-sm font-medium text-gray-700 mb-1.5",
+                        ),
+                        rx.el.input(
+                            placeholder="unit-7",
+                            on_change=LiveKitState.set_identity,
+                            disabled=LiveKitState.is_connected,
+                            class_name=rx.cond(
+                                LiveKitState.is_connected,
+                                "w-full px-4 py-2.5 bg-gray-50 border border-gray-200 rounded-lg text-gray-500 cursor-not-allowed",
+                                "w-full px-4 py-2.5 bg-white border border-gray-300 rounded-lg focus:ring-2 focus:ring-violet-500 focus:border-violet-500 transition-all text-gray-900 placeholder-gray-400",
+                            ),
+                            default_value=LiveKitState.identity,
+                        ),
+                        class_name="flex-1 min-w-0",
+                    ),
+                    class_name="flex gap-3 mb-5",
+                ),
+            ),
             rx.el.div(
                 rx.el.label(
                     "Access Token",
                     class_name="block text-sm font-medium text-gray-700 mb-1.5",
                 ),
                 rx.el.input(
-                    placeholder="ey...",
+                    placeholder=rx.cond(
+                        LiveKitState.token_issuer,
+                        "Optional: issued by the server",
+                        "ey...",
+                    ),
                     type="password",
                     on_change=LiveKitState.set_token,
                     disabled=LiveKitState.is_connected,
@@ -73,7 +123,18 @@ def connection_form() -> rx.Component:
                     ),
                     default_value=LiveKitState.token,
                 ),
-                class_name="mb-6",
+                class_name="mb-4",
+            ),
+            rx.el.button(
+                rx.icon("history", class_name="h-4 w-4"),
+                rx.cond(
+                    LiveKitState.preroll_ms > 0,
+                    "Mic pre-roll: " + LiveKitState.preroll_ms.to_string() + " ms",
+                    "Mic pre-roll: off",
+                ),
+                on_click=LiveKitState.toggle_preroll,
+                disabled=LiveKitState.is_connected,
+                class_name="flex items-center gap-2 mb-6 text-sm font-medium text-gray-600 hover:text-violet-600 transition-colors",
             ),
             rx.el.div(
                 rx.cond(
@@ -1,5 +1,10 @@
 import reflex as rx
-from app.states.livekit_state import LiveKitState
+from app.states.livekit_state import ROSTER_SLOTS, LiveKitState
+
+VIDEO_FEED_URL = f"{rx.config.get_config().api_url}/api/video/"
+THUMB_URL = f"{rx.config.get_config().api_url}/api/thumbs/"
+# The page's slot vars, indexed by the numbers in LiveKitState.roster_slots.
+ROSTER_ROWS = rx.Var.create([getattr(LiveKitState, slot) for slot in ROSTER_SLOTS])
 
 
 def participant_controls(p: dict) -> rx.Component:
@@ -43,20 +48,134 @@ def participant_controls(p: dict) -> rx.Component:
             ),
             title=rx.cond(p["has_video"], "Toggle Video", "No Video Available"),
         ),
+        rx.cond(
+            LiveKitState.listening & p["audio_subscribed"],
+            rx.debounce_input(
+                rx.el.input(
+                    type="range",
+                    min="0",
+                    max="200",
+                    default_value="100",
+                    on_change=lambda value: LiveKitState.set_gain(p["identity"], value),
+                    class_name="w-20 accent-emerald-600",
+                    title="Mix Gain",
+                ),
+                debounce_timeout=150,
+            ),
+        ),
+        rx.cond(
+            LiveKitState.autosub & p["has_audio"],
+            rx.el.button(
+                rx.icon(
+                    "pin",
+                    class_name=rx.cond(
+                        LiveKitState.pinned.contains(p["identity"]),
+                        "h-4 w-4 text-amber-600",
+                        "h-4 w-4 text-gray-400",
+                    ),
+                ),
+                on_click=lambda: LiveKitState.toggle_pin(p["identity"]),
+                class_name=rx.cond(
+                    LiveKitState.pinned.contains(p["identity"]),
+                    "p-2 rounded-lg bg-amber-50 hover:bg-amber-100 border border-amber-200 transition-colors",
+                    "p-2 rounded-lg bg-gray-50 hover:bg-gray-100 border border-gray-200 transition-colors",
+                ),
+                title="Keep Audio Subscribed",
+            ),
+        ),
+        rx.cond(
+            p["has_screen"],
+            rx.el.button(
+                rx.icon(
+                    "monitor-up",
+                    class_name=rx.cond(
+                        p["screen_subscribed"],
+                        "h-4 w-4 text-violet-600",
+                        "h-4 w-4 text-gray-400",
+                    ),
+                ),
+                on_click=lambda: LiveKitState.toggle_subscription(p["sid"], "screen"),
+                class_name=rx.cond(
+                    p["screen_subscribed"],
+                    "p-2 rounded-lg bg-violet-50 hover:bg-violet-100 border border-violet-200 transition-colors",
+                    "p-2 rounded-lg bg-gray-50 hover:bg-gray-100 border border-gray-200 transition-colors",
+                ),
+                title="Toggle Screen Share",
+            ),
+        ),
         class_name="flex items-center gap-2",
     )
 
 
+def unit_telemetry(p: dict) -> rx.Component:
+    """Latest status a participant reported over the telemetry channel."""
+    return rx.el.div(
+        rx.cond(
+            p["on_air"],
+            rx.el.span(
+                "On air",
+                class_name="px-1.5 rounded bg-emerald-50 text-emerald-700 border border-emerald-200",
+            ),
+        ),
+        rx.cond(
+            p["busy"],
+            rx.el.span(
+                "Busy",
+                class_name="px-1.5 rounded bg-amber-50 text-amber-700 border border-amber-200",
+            ),
+        ),
+        rx.cond(
+            p["battery"] != "",
+            rx.el.span(
+                rx.icon("battery", class_name="h-3 w-3"),
+                p["battery"],
+                class_name="flex items-center gap-0.5",
+            ),
+        ),
+        rx.cond(
+            p["position"] != "",
+            rx.el.span(
+                rx.icon("map-pin", class_name="h-3 w-3"),
+                p["position"],
+                class_name="flex items-center gap-0.5 font-mono",
+            ),
+        ),
+        class_name="flex items-center gap-2 text-xs text-gray-500",
+    )
+
+
 def participant_item(p: dict) -> rx.Component:
     """Row item for a single participant."""
     return rx.el.div(
         rx.el.div(
-            rx.el.div(
-                rx.el.span(
-                    p["identity"].to_string()[0].upper(),
-                    class_name="text-sm font-bold text-violet-600",
+            rx.cond(
+                p["thumb"] != "",
+                rx.el.img(
+                    src=THUMB_URL
+                    + p["video_track"].to_string()
+                    + "?v="
+                    + p["thumb"].to_string()
+                    + "&key="
+                    + LiveKitState.media_key,
+                    alt=p["identity"].to_string(),
+                    loading="lazy",
+                    class_name=rx.cond(
+                        p["speaking"],
+                        "h-9 w-16 rounded-lg object-cover bg-gray-100 border border-violet-200 ring-2 ring-emerald-400",
+                        "h-9 w-16 rounded-lg object-cover bg-gray-100 border border-violet-200",
+                    ),
+                ),
+                rx.el.div(
+                    rx.el.span(
+                        p["identity"].to_string()[0].upper(),
+                        class_name="text-sm font-bold text-violet-600",
+                    ),
+                    class_name=rx.cond(
+                        p["speaking"],
+                        "h-8 w-8 rounded-full bg-violet-100 flex items-center justify-center border border-violet-200 ring-2 ring-emerald-400",
+                        "h-8 w-8 rounded-full bg-violet-100 flex items-center justify-center border border-violet-200",
+                    ),
                 ),
-                class_name="h-8 w-8 rounded-full bg-violet-100 flex items-center justify-center border border-violet-200",
             ),
             rx.el.div(
                 rx.el.p(
@@ -67,6 +186,7 @@ def participant_item(p: dict) -> rx.Component:
                     p["sid"],
                     class_name="text-xs text-gray-400 truncate max-w-[120px] font-mono",
                 ),
+                unit_telemetry(p),
                 class_name="flex flex-col",
             ),
             class_name="flex items-center gap-3",
@@ -76,30 +196,219 @@ def participant_item(p: dict) -> rx.Component:
     )
 
 
+def mix_listener() -> rx.Component:
+    """Plays the mixed remote audio in the browser and shows its health."""
+    return rx.el.div(
+        rx.el.button(
+            rx.cond(
+                LiveKitState.listening,
+                rx.icon("volume-2", class_name="h-4 w-4"),
+                rx.icon("volume-x", class_name="h-4 w-4"),
+            ),
+            rx.el.span(
+                rx.cond(LiveKitState.listening, "Listening", "Listen"),
+                class_name="text-xs font-medium",
+            ),
+            on_click=LiveKitState.toggle_listening,
+            class_name=rx.cond(
+                LiveKitState.listening,
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-emerald-50 text-emerald-700 border border-emerald-200 transition-colors",
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-gray-50 text-gray-500 border border-gray-200 hover:bg-gray-100 transition-colors",
+            ),
+            title="Play the mix of all subscribed audio",
+        ),
+        rx.cond(
+            LiveKitState.listening,
+            rx.fragment(
+                rx.el.span(
+                    LiveKitState.mix_stats["talkers"].to_string(),
+                    " talkers · ",
+                    LiveKitState.mix_stats["end_to_end_ms"].to_string(),
+                    " ms · ",
+                    LiveKitState.mix_stats["underruns"].to_string(),
+                    " underruns",
+                    class_name="text-xs text-gray-400 font-mono",
+                ),
+                rx.moment(
+                    interval=1000,
+                    on_change=LiveKitState.refresh_mix_stats,
+                    class_name="hidden",
+                ),
+            ),
+        ),
+        class_name="flex items-center justify-center gap-3 mt-4",
+    )
+
+
+def autosub_toggle() -> rx.Component:
+    """Switch between manual audio toggles and active-speaker subscriptions."""
+    return rx.el.div(
+        rx.cond(
+            LiveKitState.autosub,
+            rx.el.span(
+                LiveKitState.autosub_stats["subscribed"].to_string(),
+                " live · ",
+                LiveKitState.autosub_stats["evictions"].to_string(),
+                " evicted · p50 ",
+                LiveKitState.autosub_stats["subscribe_p50"].to_string(),
+                " ms",
+                class_name="text-xs text-gray-400 font-mono",
+            ),
+        ),
+        rx.el.button(
+            rx.icon("audio-lines", class_name="h-4 w-4"),
+            rx.el.span("Auto audio", class_name="text-xs font-medium"),
+            on_click=LiveKitState.toggle_autosub,
+            class_name=rx.cond(
+                LiveKitState.autosub,
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-emerald-50 text-emerald-700 border border-emerald-200 transition-colors",
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-gray-50 text-gray-500 border border-gray-200 hover:bg-gray-100 transition-colors",
+            ),
+            title="Subscribe to whoever is talking",
+        ),
+        class_name="flex items-center gap-3",
+    )
+
+
+def journal_toggle() -> rx.Component:
+    """Records room and PTT events to a journal that can be replayed later."""
+    return rx.el.div(
+        rx.cond(
+            LiveKitState.journal,
+            rx.fragment(
+                rx.el.span(
+                    LiveKitState.journal_stats["events"].to_string(),
+                    " events · ",
+                    LiveKitState.journal_stats["bytes"].to_string(),
+                    " B",
+                    class_name="text-xs text-gray-400 font-mono",
+                    title=LiveKitState.journal_stats["path"].to_string(),
+                ),
+                rx.moment(
+                    interval=2000,
+                    on_change=LiveKitState.refresh_journal_stats,
+                    class_name="hidden",
+                ),
+            ),
+        ),
+        rx.el.button(
+            rx.icon("scroll-text", class_name="h-4 w-4"),
+            rx.el.span("Journal", class_name="text-xs font-medium"),
+            on_click=LiveKitState.toggle_journal,
+            class_name=rx.cond(
+                LiveKitState.journal,
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-rose-50 text-rose-700 border border-rose-200 transition-colors",
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-gray-50 text-gray-500 border border-gray-200 hover:bg-gray-100 transition-colors",
+            ),
+            title="Record room events for replay",
+        ),
+        class_name="flex items-center gap-3",
+    )
+
+
+def roster_controls() -> rx.Component:
+    """Identity search, sort order and paging for the participant list."""
+    return rx.el.div(
+        rx.debounce_input(
+            rx.el.input(
+                placeholder="Search identity",
+                value=LiveKitState.roster_query,
+                on_change=LiveKitState.set_roster_query,
+                class_name="flex-1 min-w-0 px-3 py-1.5 text-sm rounded-lg border border-gray-200 bg-white focus:outline-none focus:ring-2 focus:ring-violet-200",
+            ),
+            debounce_timeout=200,
+        ),
+        rx.el.select(
+            rx.el.option("Name", value="name"),
+            rx.el.option("Talking now", value="talking"),
+            rx.el.option("Has audio", value="audio"),
+            rx.el.option("Recently active", value="recent"),
+            value=LiveKitState.roster_order,
+            on_change=LiveKitState.set_roster_order,
+            class_name="px-2 py-1.5 text-sm rounded-lg border border-gray-200 bg-white",
+        ),
+        rx.el.div(
+            rx.el.button(
+                rx.icon("chevron-left", class_name="h-4 w-4"),
+                on_click=LiveKitState.roster_page(-1),
+                disabled=~LiveKitState.roster_has_prev,
+                class_name="p-1.5 rounded-lg border border-gray-200 bg-white hover:bg-gray-50 disabled:opacity-40",
+            ),
+            rx.el.span(
+                LiveKitState.roster_range,
+                class_name="text-xs text-gray-400 font-mono whitespace-nowrap",
+            ),
+            rx.el.button(
+                rx.icon("chevron-right", class_name="h-4 w-4"),
+                on_click=LiveKitState.roster_page(1),
+                disabled=~LiveKitState.roster_has_next,
+                class_name="p-1.5 rounded-lg border border-gray-200 bg-white hover:bg-gray-50 disabled:opacity-40",
+            ),
+            class_name="flex items-center gap-2",
+        ),
+        class_name="flex items-center gap-2",
+    )
+
+
+def thumbnail_stats() -> rx.Component:
+    """Roster thumbnail cache size and how often it answers the browser."""
+    return rx.el.div(
+        rx.cond(
+            LiveKitState.thumbnail_stats["entries"] > 0,
+            rx.el.span(
+                LiveKitState.thumbnail_stats["entries"].to_string(),
+                " stills · ",
+                LiveKitState.thumbnail_stats["kb"].to_string(),
+                " kB cached · ",
+                LiveKitState.thumbnail_stats["hit_rate"].to_string(),
+                "% hits · ",
+                LiveKitState.thumbnail_stats["not_modified_pct"].to_string(),
+                "% 304",
+                class_name="text-xs text-gray-400 font-mono",
+            ),
+        ),
+        rx.moment(
+            interval=5000,
+            on_change=LiveKitState.refresh_thumbnail_stats,
+            class_name="hidden",
+        ),
+        class_name="flex justify-end",
+    )
+
+
 def participant_list() -> rx.Component:
-    """List of remote participants."""
+    """One page of remote participants; the server sends only this page."""
     return rx.el.div(
+        roster_controls(),
         rx.cond(
-            LiveKitState.remote_participants.length() > 0,
+            LiveKitState.roster_slots.length() > 0,
             rx.el.div(
-                rx.foreach(LiveKitState.remote_participants, participant_item),
+                rx.foreach(
+                    LiveKitState.roster_slots,
+                    lambda slot: participant_item(ROSTER_ROWS[slot]),
+                ),
                 class_name="space-y-2",
             ),
             rx.el.div(
                 rx.icon("users", class_name="h-8 w-8 text-gray-300 mb-2"),
                 rx.el.p(
-                    "No other participants",
+                    rx.cond(
+                        LiveKitState.roster_query != "",
+                        "No matching participants",
+                        "No other participants",
+                    ),
                     class_name="text-sm font-medium text-gray-400",
                 ),
                 class_name="flex flex-col items-center justify-center py-8 bg-gray-50 rounded-xl border border-dashed border-gray-200",
             ),
         ),
+        thumbnail_stats(),
         class_name="flex flex-col gap-3",
     )
 
 
 def remote_video_card(p: dict) -> rx.Component:
-    """Simulated video feed for a remote participant."""
+    """Live video feed for a remote participant."""
     return rx.el.div(
         rx.el.div(
             rx.icon("user", class_name="h-16 w-16 text-gray-300 mb-2"),
@@ -116,6 +425,14 @@ def remote_video_card(p: dict) -> rx.Component:
             ),
             class_name="absolute inset-0 flex flex-col items-center justify-center",
         ),
+        rx.el.img(
+            src=VIDEO_FEED_URL
+            + p["video_track"].to_string()
+            + "?key="
+            + LiveKitState.media_key,
+            alt="",
+            class_name="absolute inset-0 h-full w-full object-cover",
+        ),
         rx.cond(
             p["audio_subscribed"],
             rx.el.div(
@@ -130,6 +447,7 @@ def remote_video_card(p: dict) -> rx.Component:
             ),
             class_name="absolute bottom-3 left-3 bg-black/50 px-2 py-1 rounded backdrop-blur-sm",
         ),
+        custom_attrs={"data-video-track": p["video_track"]},
         class_name="relative aspect-video bg-gray-800 rounded-2xl overflow-hidden shadow-lg border border-gray-700 animate-in fade-in duration-300",
     )
 
@@ -137,11 +455,29 @@ def remote_video_card(p: dict) -> rx.Component:
 def remote_video_grid() -> rx.Component:
     """Grid of subscribed remote video streams."""
     return rx.el.div(
-        rx.foreach(
-            LiveKitState.remote_participants,
-            lambda p: rx.cond(
-                p["video_subscribed"], remote_video_card(p), rx.fragment()
+        rx.el.div(
+            rx.foreach(LiveKitState.video_participants, remote_video_card),
+            class_name="grid grid-cols-1 sm:grid-cols-2 gap-4 w-full",
+        ),
+        rx.cond(
+            LiveKitState.viewport_savings["tracks"] > 0,
+            rx.el.p(
+                "Video in ",
+                LiveKitState.viewport_savings["kbps"].to_string(),
+                " kbps · decode ",
+                LiveKitState.viewport_savings["decode_ms"].to_string(),
+                " ms/s · layers save ~",
+                LiveKitState.viewport_savings["saved_kbps_est"].to_string(),
+                " kbps, decode -",
+                LiveKitState.viewport_savings["decode_saved_pct_est"].to_string(),
+                "% (est.)",
+                class_name="text-xs text-gray-400 font-mono mt-2",
             ),
         ),
-        class_name="grid grid-cols-1 sm:grid-cols-2 gap-4 w-full",
+        rx.moment(
+            interval=1000,
+            on_change=LiveKitState.sync_viewport,
+            class_name="hidden",
+        ),
+        class_name="w-full",
     )
\ No newline at end of file
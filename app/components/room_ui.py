@@ -1,7 +1,13 @@
 import reflex as rx
 from app.states.livekit_state import LiveKitState
 from app.components.connection_ui import status_badge
-from app.components.participant_ui import participant_list, remote_video_grid
+from app.components.participant_ui import (
+    autosub_toggle,
+    journal_toggle,
+    mix_listener,
+    participant_list,
+    remote_video_grid,
+)
 
 
 def video_preview() -> rx.Component:
@@ -41,6 +47,27 @@ def video_preview() -> rx.Component:
                 "hidden",
             ),
         ),
+        rx.cond(
+            LiveKitState.camera_active,
+            rx.fragment(
+                rx.el.span(
+                    LiveKitState.camera_stats["profile"].to_string(),
+                    " · ",
+                    LiveKitState.camera_stats["kbps_avg"].to_string(),
+                    " kbps avg · saves ~",
+                    LiveKitState.camera_stats["kbps_saved_est"].to_string(),
+                    " kbps (est.) · ",
+                    LiveKitState.camera_stats["pixels_saved_pct"].to_string(),
+                    " % pixels",
+                    class_name="absolute bottom-4 right-4 bg-black/50 px-2 py-1 rounded text-xs text-white/80 font-mono backdrop-blur-sm",
+                ),
+                rx.moment(
+                    interval=2000,
+                    on_change=LiveKitState.refresh_camera_stats,
+                    class_name="hidden",
+                ),
+            ),
+        ),
         class_name="relative aspect-video bg-gray-900 rounded-2xl overflow-hidden shadow-lg border border-gray-800",
     )
 
@@ -55,22 +82,133 @@ def ptt_button() -> rx.Component:
                 rx.icon("mic-off", class_name="h-12 w-12 text-white/70 mb-2"),
             ),
             rx.el.span(
-                rx.cond(LiveKitState.is_talking, "TRANSMITTING", "HOLD TO TALK"),
+                rx.cond(
+                    LiveKitState.is_talking,
+                    "TRANSMITTING",
+                    rx.cond(
+                        LiveKitState.floor_busy,
+                        "CHANNEL BUSY",
+                        "HOLD TO TALK",
+                    ),
+                ),
                 class_name="text-lg font-bold tracking-widest",
             ),
+            rx.cond(
+                LiveKitState.floor_busy,
+                rx.el.span(
+                    rx.cond(LiveKitState.floor_waiting, "Queued · ", ""),
+                    LiveKitState.floor_holder,
+                    class_name="text-xs font-medium text-white/80 mt-1 truncate max-w-[180px]",
+                ),
+            ),
             on_mouse_down=LiveKitState.start_talking,
             on_mouse_up=LiveKitState.stop_talking,
             on_mouse_leave=LiveKitState.stop_talking,
             class_name=rx.cond(
                 LiveKitState.is_talking,
                 "w-64 h-64 rounded-full bg-red-600 shadow-[0_0_50px_rgba(220,38,38,0.5)] scale-105 transition-all duration-100 flex flex-col items-center justify-center border-4 border-red-400",
-                "w-64 h-64 rounded-full bg-gradient-to-b from-violet-600 to-violet-800 shadow-xl hover:shadow-2xl hover:scale-105 active:scale-95 transition-all duration-200 flex flex-col items-center justify-center border-b-8 border-violet-900",
+                rx.cond(
+                    LiveKitState.floor_busy,
+                    "w-64 h-64 rounded-full bg-gradient-to-b from-gray-500 to-gray-700 shadow-xl transition-all duration-200 flex flex-col items-center justify-center border-b-8 border-gray-800",
+                    "w-64 h-64 rounded-full bg-gradient-to-b from-violet-600 to-violet-800 shadow-xl hover:shadow-2xl hover:scale-105 active:scale-95 transition-all duration-200 flex flex-col items-center justify-center border-b-8 border-violet-900",
+                ),
             ),
         ),
         class_name="flex justify-center py-8",
     )
 
 
+def vox_controls() -> rx.Component:
+    """Voice-operated transmit, its hang time and the mic noise gate."""
+    return rx.el.div(
+        rx.el.button(
+            rx.icon("audio-waveform", class_name="h-4 w-4"),
+            rx.el.span("VOX", class_name="text-xs font-medium"),
+            on_click=LiveKitState.toggle_vox,
+            class_name=rx.cond(
+                LiveKitState.vox,
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-emerald-50 text-emerald-700 border border-emerald-200 transition-colors",
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-gray-50 text-gray-500 border border-gray-200 hover:bg-gray-100 transition-colors",
+            ),
+            title="Transmit automatically while you speak",
+        ),
+        rx.cond(
+            LiveKitState.vox,
+            rx.el.select(
+                rx.el.option("Hang 400 ms", value="400"),
+                rx.el.option("Hang 800 ms", value="800"),
+                rx.el.option("Hang 1.5 s", value="1500"),
+                value=LiveKitState.vox_hang_ms.to_string(),
+                on_change=LiveKitState.set_vox_hang_ms,
+                class_name="px-2 py-1.5 text-xs rounded-lg border border-gray-200 bg-white",
+            ),
+        ),
+        rx.el.button(
+            rx.icon("volume-x", class_name="h-4 w-4"),
+            rx.el.span("Gate", class_name="text-xs font-medium"),
+            on_click=LiveKitState.toggle_noise_gate,
+            class_name=rx.cond(
+                LiveKitState.noise_gate,
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-emerald-50 text-emerald-700 border border-emerald-200 transition-colors",
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-gray-50 text-gray-500 border border-gray-200 hover:bg-gray-100 transition-colors",
+            ),
+            title="Attenuate background noise between words",
+        ),
+        rx.cond(
+            LiveKitState.vox | LiveKitState.noise_gate,
+            rx.fragment(
+                rx.el.span(
+                    LiveKitState.vox_stats["open_pct"].to_string(),
+                    " % open · ",
+                    LiveKitState.vox_stats["saved_kbps"].to_string(),
+                    " kbps saved · ",
+                    LiveKitState.vox_stats["cpu_us_per_frame"].to_string(),
+                    " us/frame",
+                    class_name="text-xs text-gray-400 font-mono",
+                ),
+                rx.moment(
+                    interval=1000,
+                    on_change=LiveKitState.refresh_vox_stats,
+                    class_name="hidden",
+                ),
+            ),
+        ),
+        class_name="flex flex-wrap items-center justify-center gap-3 mt-4",
+    )
+
+
+def unit_status() -> rx.Component:
+    """Busy toggle and the telemetry this unit shares with the room."""
+    return rx.el.div(
+        rx.el.button(
+            rx.icon("circle-slash", class_name="h-4 w-4"),
+            rx.el.span("Busy", class_name="text-xs font-medium"),
+            on_click=LiveKitState.toggle_busy,
+            class_name=rx.cond(
+                LiveKitState.busy,
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-amber-50 text-amber-700 border border-amber-200 transition-colors",
+                "flex items-center gap-1.5 px-2.5 py-1.5 rounded-lg bg-gray-50 text-gray-500 border border-gray-200 hover:bg-gray-100 transition-colors",
+            ),
+            title="Show the room you are busy",
+        ),
+        rx.el.span(
+            LiveKitState.telemetry_stats["units"].to_string(),
+            " units · ",
+            LiveKitState.telemetry_stats["sent_bps"].to_string(),
+            " B/s out · ",
+            LiveKitState.telemetry_stats["received_bps"].to_string(),
+            " B/s in",
+            class_name="text-xs text-gray-400 font-mono",
+        ),
+        rx.moment(
+            interval=5000,
+            on_change=LiveKitState.sync_telemetry,
+            class_name="hidden",
+        ),
+        class_name="flex items-center justify-center gap-3 mt-4",
+    )
+
+
 def room_view() -> rx.Component:
     """The main room view for connected users."""
     return rx.el.div(
@@ -94,9 +232,17 @@ def room_view() -> rx.Component:
                     video_preview(),
                     remote_video_grid(),
                     rx.el.div(
-                        rx.el.h3(
-                            "Participants",
-                            class_name="text-sm font-semibold text-gray-500 uppercase tracking-wider mb-3",
+                        rx.el.div(
+                            rx.el.h3(
+                                "Participants",
+                                class_name="text-sm font-semibold text-gray-500 uppercase tracking-wider",
+                            ),
+                            rx.el.div(
+                                journal_toggle(),
+                                autosub_toggle(),
+                                class_name="flex items-center gap-3",
+                            ),
+                            class_name="flex items-center justify-between mb-3",
                         ),
                         participant_list(),
                         class_name="mt-6",
@@ -106,10 +252,21 @@ def room_view() -> rx.Component:
                 rx.el.div(
                     rx.el.div(
                         ptt_button(),
+                        vox_controls(),
+                        unit_status(),
+                        mix_listener(),
                         rx.el.p(
                             "Press and hold the button to speak",
                             class_name="text-center text-gray-500 text-sm mt-4",
                         ),
+                        rx.el.p(
+                            LiveKitState.ptt_latency_label,
+                            class_name="text-center text-gray-400 text-xs font-mono mt-1",
+                        ),
+                        rx.el.p(
+                            LiveKitState.startup_label,
+                            class_name="text-center text-gray-400 text-xs font-mono mt-1",
+                        ),
                         class_name="bg-white rounded-3xl border border-gray-200 p-8 shadow-sm flex flex-col items-center justify-center h-full",
                     ),
                     class_name="min-h-[400px]",
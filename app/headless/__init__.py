@@ -0,0 +1,5 @@
+"""Headless PTT clients for load generation and bot units.
+
+Runs RoomSession, the same connect/publish/PTT logic LiveKitState drives,
+without Reflex: `python -m app.headless --help`.
+"""
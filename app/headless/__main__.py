@@ -0,0 +1,92 @@
+"""Runs headless PTT clients against a LiveKit deployment.
+
+Tokens are minted in process, so LIVEKIT_API_KEY and LIVEKIT_API_SECRET
+must be set (and --room listed in LIVEKIT_TOKEN_ROOMS, if that is set).
+Example:
+
+    python -m app.headless --url wss://lk.example.com --room load \\
+        --clients 300 --processes 8 --duration 120 --ptt-interval 6 --talk 1.5
+"""
+
+import argparse
+import json
+import sys
+from app.headless.client import LoadConfig
+from app.headless.supervisor import supervise
+from app.services.session import SESSION_FEATURES
+from app.services.tokens import ISSUER
+
+
+def print_report(total: dict):
+    print(
+        f"{total['connected']}/{total['clients']} clients connected"
+        f" in {total['processes']} processes"
+        f" ({total['connect_failures']} failed, {total['reconnects']} reconnects,"
+        f" {total['errors']} errors)"
+    )
+    print(
+        f"{total['presses']} presses, {total['denied']} denied the floor,"
+        f" {total['press_failures']} failed"
+    )
+    for key, label in (
+        ("ready_ms", "connect to mic ready"),
+        ("press_ms", "press to first frame"),
+        ("floor_ms", "press to floor granted"),
+        ("recovery_ms", "connection recovery"),
+    ):
+        s = total[key]
+        if s["count"]:
+            print(
+                f"{label:<24} p50 {s['p50']:8.1f}  p95 {s['p95']:8.1f}"
+                f"  p99 {s['p99']:8.1f} ms  (n={s['count']})"
+            )
+    print(
+        f"cpu {total['cpu_s']} s ({total['cpu_ms_per_client']} ms/client),"
+        f" peak rss {total['max_rss_mb']} MB/process,"
+        f" {total['late_ticks']} late audio ticks, wall {total['wall_s']} s"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--room", required=True)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=0, help="default: cpus")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds")
+    parser.add_argument("--ptt-interval", type=float, default=5.0, help="seconds")
+    parser.add_argument("--talk", type=float, default=1.0, help="seconds")
+    parser.add_argument("--prefix", default="bot", help="identity prefix")
+    parser.add_argument(
+        "--feature",
+        action="append",
+        default=[],
+        choices=sorted(SESSION_FEATURES),
+        help="also run this session service on every client (repeatable)",
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    args = parser.parse_args()
+    if not ISSUER.configured:
+        parser.error("LIVEKIT_API_KEY and LIVEKIT_API_SECRET must be set")
+    config = LoadConfig(
+        args.url,
+        args.room,
+        args.clients,
+        duration_s=args.duration,
+        ramp_s=args.ramp,
+        ptt_interval_s=args.ptt_interval,
+        talk_s=args.talk,
+        identity_prefix=args.prefix,
+        features=frozenset(args.feature),
+    )
+    total = supervise(config, args.processes)
+    if args.json:
+        print(json.dumps(total, indent=2))
+    else:
+        print_report(total)
+    return 0 if total["connected"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import random
+import resource
+import time
+import numpy as np
+from app.services.metrics import CONNECTS, ERRORS, RECONNECTS
+from app.services.mic import FRAME_SAMPLES, SAMPLE_RATE
+from app.services.ptt import PttTrace
+from app.services.session import RoomSession
+from app.services.stats import LatencyWindow
+from app.services.tokens import ISSUER
+
+SAMPLE_CAP = 20000
+
+
+def _tone() -> np.ndarray:
+    """One second of a harmonic tone, shared by every client in the process."""
+    t = np.arange(SAMPLE_RATE) / SAMPLE_RATE
+    wave = sum(np.sin(2 * np.pi * 180 * k * t) / k for k in range(1, 6))
+    return (wave * 4000).astype(np.int16)
+
+
+TONE = _tone()
+
+
+class LoadConfig:
+    """One load run: where to connect and the PTT schedule every client follows."""
+
+    def __init__(
+        self,
+        url: str,
+        room: str,
+        clients: int,
+        duration_s: float = 60.0,
+        ramp_s: float = 10.0,
+        ptt_interval_s: float = 5.0,
+        talk_s: float = 1.0,
+        identity_prefix: str = "bot",
+        seed: int = 1,
+        features: frozenset[str] = frozenset(),
+    ):
+        self.url = url
+        self.room = room
+        self.clients = clients
+        self.duration_s = duration_s
+        self.ramp_s = ramp_s
+        self.ptt_interval_s = ptt_interval_s
+        self.talk_s = talk_s
+        self.identity_prefix = identity_prefix
+        self.seed = seed
+        self.features = features
+
+
+class HeadlessClient:
+    """One bot unit: a RoomSession that publishes tone audio and keys PTT.
+
+    No camera, device or UI state, and no mixer, recorder, telemetry or
+    thumbnails unless the run asks for them in `LoadConfig.features`; the
+    process-wide AudioFeeder writes the tone into its mic while it is
+    transmitting.
+    """
+
+    def __init__(self, config: LoadConfig, index: int, stats: "ShardStats"):
+        self.config = config
+        self.identity = f"{config.identity_prefix}-{index:05d}"
+        self.index = index
+        self.stats = stats
+        self.session: RoomSession | None = None
+
+    async def run(self, started: float):
+        config = self.config
+        await asyncio.sleep(self.index / max(1, config.clients) * config.ramp_s)
+        begin = time.perf_counter()
+        lease = ISSUER.lease(config.room, self.identity)
+        self.session = RoomSession(
+            config.url, "", token_provider=lease, features=config.features
+        )
+        try:
+            await self.session.connect()
+            await self.session.setup_media(camera=False, devices=False)
+        except Exception as e:
+            self.stats.connect_failures += 1
+            logging.warning(f"{self.identity} failed to connect: {e}")
+            await self.session.close()
+            self.session = None
+            return
+        self.stats.ready_ms.record((time.perf_counter() - begin) * 1000)
+        self.stats.connected += 1
+        rng = random.Random(config.seed * 100003 + self.index)
+        await asyncio.sleep(rng.uniform(0, config.ptt_interval_s))
+        deadline = started + config.ramp_s + config.duration_s
+        while time.perf_counter() + config.talk_s < deadline:
+            await self.press()
+            await asyncio.sleep(max(0.0, config.ptt_interval_s - config.talk_s))
+
+    async def press(self):
+        """Holds PTT for `talk_s`; a press still queued for the floor is withdrawn."""
+        self.stats.presses += 1
+        keying = asyncio.create_task(self._key(PttTrace()))
+        await asyncio.sleep(self.config.talk_s)
+        try:
+            await self.session.stop_talking()
+        except Exception as e:
+            self.stats.press_failures += 1
+            logging.warning(f"{self.identity} PTT release failed: {e}")
+        await keying
+
+    async def _key(self, trace: PttTrace):
+        try:
+            if not await self.session.start_talking(trace):
+                self.stats.denied += 1
+                return
+            await self.session.ptt.finish_trace(trace)
+        except Exception as e:
+            self.stats.press_failures += 1
+            logging.warning(f"{self.identity} PTT press failed: {e}")
+            return
+        if trace.first_frame is None:
+            self.stats.press_failures += 1
+            return
+        self.stats.press_ms.record((trace.first_frame - trace.received) * 1000)
+        if trace.floor_granted is not None:
+            self.stats.floor_ms.record((trace.floor_granted - trace.received) * 1000)
+
+    async def close(self):
+        if self.session is not None:
+            self.stats.recovery_ms.extend(self.session.recovery_ms.samples())
+            await self.session.close()
+            self.session = None
+
+
+class AudioFeeder:
+    """Feeds the shared tone into every transmitting client from one 10 ms tick.
+
+    A single task for the whole process instead of one per client keeps an
+    idle bot free, and nothing is captured while a mic is muted.
+    """
+
+    def __init__(self, clients: list[HeadlessClient]):
+        self.clients = clients
+        self.late_ticks = 0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        period = FRAME_SAMPLES / SAMPLE_RATE
+        tick = 0
+        next_at = loop.time()
+        while True:
+            start = tick * FRAME_SAMPLES % TONE.size
+            frame = TONE[start : start + FRAME_SAMPLES]
+            for client in self.clients:
+                session = client.session
+                if session is not None and session.mic and session.ptt.transmitting:
+                    session.mic.feed(frame)
+            tick += 1
+            next_at += period
+            delay = next_at - loop.time()
+            if delay < 0:
+                self.late_ticks += 1
+                next_at = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+
+
+class ShardStats:
+    """What one worker process measured, in plain types for the supervisor."""
+
+    def __init__(self):
+        self.clients = 0
+        self.connected = 0
+        self.connect_failures = 0
+        self.presses = 0
+        self.denied = 0
+        self.press_failures = 0
+        self.ready_ms = LatencyWindow(SAMPLE_CAP)
+        self.press_ms = LatencyWindow(SAMPLE_CAP)
+        self.floor_ms = LatencyWindow(SAMPLE_CAP)
+        self.recovery_ms: list[float] = []
+
+    def report(self, feeder: AudioFeeder, cpu_s: float) -> dict:
+        return {
+            "clients": self.clients,
+            "connected": self.connected,
+            "connect_failures": self.connect_failures,
+            "presses": self.presses,
+            "denied": self.denied,
+            "press_failures": self.press_failures,
+            "reconnects": sum(RECONNECTS.values.values()),
+            "errors": sum(ERRORS.values.values()),
+            "connect_errors": CONNECTS.values.get((("result", "error"),), 0),
+            "late_ticks": feeder.late_ticks,
+            "cpu_s": round(cpu_s, 2),
+            "max_rss_mb": round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+            ),
+            "ready_ms": self.ready_ms.samples(),
+            "press_ms": self.press_ms.samples(),
+            "floor_ms": self.floor_ms.samples(),
+            "recovery_ms": self.recovery_ms,
+        }
+
+
+async def run_clients(config: LoadConfig, indices: list[int]) -> dict:
+    """Runs this process's share of the clients to the end of the schedule."""
+    stats = ShardStats()
+    stats.clients = len(indices)
+    clients = [HeadlessClient(config, index, stats) for index in indices]
+    feeder = AudioFeeder(clients)
+    feeding = asyncio.create_task(feeder.run())
+    cpu = time.process_time()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(client.run(started) for client in clients))
+    finally:
+        feeding.cancel()
+        await asyncio.gather(
+            *(client.close() for client in clients), return_exceptions=True
+        )
+        ISSUER.stop()
+    return stats.report(feeder, time.process_time() - cpu)
+
+
+def run_shard(config: LoadConfig, indices: list[int]) -> dict:
+    """Process pool entry point."""
+    logging.basicConfig(level=logging.WARNING)
+    return asyncio.run(run_clients(config, indices))
@@ -0,0 +1,84 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+import time
+from app.headless.client import LoadConfig, run_shard
+from app.services.stats import LatencyWindow
+
+LATENCIES = ("ready_ms", "press_ms", "floor_ms", "recovery_ms")
+COUNTS = (
+    "clients",
+    "connected",
+    "connect_failures",
+    "presses",
+    "denied",
+    "press_failures",
+    "reconnects",
+    "errors",
+    "late_ticks",
+)
+
+
+def shards(clients: int, processes: int) -> list[list[int]]:
+    """Client indices per process, interleaved so every shard ramps evenly."""
+    processes = max(1, min(processes, clients))
+    return [list(range(i, clients, processes)) for i in range(processes)]
+
+
+def aggregate(reports: list[dict]) -> dict:
+    """Sums the counters of every shard and pools the latency samples."""
+    total = {key: sum(report[key] for report in reports) for key in COUNTS}
+    total["processes"] = len(reports)
+    total["cpu_s"] = round(sum(report["cpu_s"] for report in reports), 2)
+    total["max_rss_mb"] = max((report["max_rss_mb"] for report in reports), default=0)
+    total["cpu_ms_per_client"] = round(
+        total["cpu_s"] * 1000 / max(1, total["clients"]), 1
+    )
+    for key in LATENCIES:
+        samples = [ms for report in reports for ms in report[key]]
+        window = LatencyWindow(max(1, len(samples)))
+        for ms in samples:
+            window.record(ms)
+        total[key] = window.summary()
+    return total
+
+
+def supervise(config: LoadConfig, processes: int = 0) -> dict:
+    """Spreads `config.clients` over a process pool and aggregates the results.
+
+    Workers are spawned rather than forked so each gets its own LiveKit FFI
+    runtime and event loop; none of them imports Reflex.
+    """
+    processes = processes or os.cpu_count() or 1
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    parts = shards(config.clients, processes)
+    with concurrent.futures.ProcessPoolExecutor(len(parts), context) as pool:
+        futures = {pool.submit(run_shard, config, part): part for part in parts}
+        reports = []
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                logging.error(f"Load shard failed: {e}")
+                reports.append(_failed_shard(len(futures[future])))
+    total = aggregate(reports)
+    total["wall_s"] = round(time.perf_counter() - started, 1)
+    return total
+
+
+def _failed_shard(clients: int) -> dict:
+    """A crashed shard's report: all of its planned clients count as failed."""
+    report = {key: 0 for key in COUNTS}
+    report.update({key: [] for key in LATENCIES})
+    report.update(
+        {
+            "cpu_s": 0.0,
+            "max_rss_mb": 0.0,
+            "errors": 1,
+            "clients": clients,
+            "connect_failures": clients,
+        }
+    )
+    return report
@@ -0,0 +1,36 @@
+import secrets
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.services.session import RoomSession
+
+
+class MediaKeys:
+    """Unguessable per-browser keys that open a session's media routes.
+
+    A browser gets one when it connects and sends it as `?key=` with its
+    video, thumbnail, audio mix and archive requests; it stops working on
+    disconnect. The key is the capability: a request can only reach the
+    tracks, stills, mix and recordings of the session it was granted for.
+    """
+
+    def __init__(self):
+        self._sessions: dict[str, "RoomSession"] = {}
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def grant(self, session: "RoomSession") -> str:
+        key = secrets.token_urlsafe(16)
+        self._sessions[key] = session
+        return key
+
+    def revoke(self, key: str):
+        self._sessions.pop(key, None)
+
+    def session(self, key: str) -> "RoomSession | None":
+        """The session a key was granted for, if it is still valid."""
+        return self._sessions.get(key) if key else None
+
+
+MEDIA_KEYS = MediaKeys()
@@ -0,0 +1,411 @@
+import asyncio
+import collections
+import itertools
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import wave
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+from livekit import rtc
+from app.services.metrics import TRANSMISSIONS
+from app.services.stats import LatencyWindow
+
+# Next to the app rather than the working directory; PTT_ARCHIVE_DIR overrides.
+ARCHIVE_DIR = Path(
+    os.environ.get("PTT_ARCHIVE_DIR") or Path(__file__).resolve().parents[2] / "archive"
+)
+ARCHIVE_SAMPLE_RATE = 16000
+ARCHIVE_QUEUE_BYTES = 8 * 1024 * 1024
+ARCHIVE_CHUNK_BYTES = 64 * 1024
+LOCAL = "local"
+
+MICROPHONE = rtc.TrackSource.SOURCE_MICROPHONE
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transmissions (
+    id INTEGER PRIMARY KEY,
+    room TEXT NOT NULL,
+    identity TEXT NOT NULL,
+    started_ms INTEGER NOT NULL,
+    ended_ms INTEGER NOT NULL,
+    sample_rate INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS by_identity ON transmissions (identity, started_ms);
+CREATE INDEX IF NOT EXISTS by_room ON transmissions (room, started_ms);
+CREATE INDEX IF NOT EXISTS by_time ON transmissions (started_ms);
+"""
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _safe(name: str) -> str:
+    return _UNSAFE.sub("_", name)[:64] or "_"
+
+
+class TransmissionArchive:
+    """Writes transmissions to WAV files on one thread and indexes them in SQLite.
+
+    Callers on the event loop only append to a spool capped at `max_bytes`;
+    when the disk falls that far behind, audio is dropped and counted rather
+    than letting memory grow. Open and close markers are never dropped, so
+    every transmission still gets a file and an index row.
+
+    Only one transmission per room and speaker is open at a time. When
+    several sessions in the process hear the same talker, the first to
+    start recording keeps it and the others get handle 0, which writes
+    nothing. All SQLite work runs off the event loop: writes on the writer
+    thread, and `search` and `read` are meant for a thread pool. Several
+    processes may share one root: file names carry a per-archive run id, so
+    two transmissions started in the same millisecond never share a file.
+    """
+
+    def __init__(self, root: Path = ARCHIVE_DIR, max_bytes: int = ARCHIVE_QUEUE_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._spool: collections.deque[tuple] = collections.deque()
+        self._cond = threading.Condition()
+        self._queued = 0
+        self._handles = itertools.count(1)
+        self.run_id = uuid.uuid4().hex[:12]
+        self._open: dict[int, tuple[str, str]] = {}
+        self._speakers: set[tuple[str, str]] = set()
+        self._thread: threading.Thread | None = None
+        self._reader: sqlite3.Connection | None = None
+        self._reader_lock = threading.Lock()
+        self.peak_bytes = 0
+        self.written_bytes = 0
+        self.dropped_bytes = 0
+        self.transmissions = 0
+        self.duplicates = 0
+        self.lookup_ms = LatencyWindow()
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.sqlite3"
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.index_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _prepare(self) -> sqlite3.Connection:
+        self.root.mkdir(parents=True, exist_ok=True)
+        db = self._connect()
+        db.executescript(_SCHEMA)
+        return db
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="archive-writer", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: tuple, size: int = 0) -> bool:
+        with self._cond:
+            if size and self._queued + size > self.max_bytes:
+                self.dropped_bytes += size
+                return False
+            self._spool.append(item)
+            self._queued += size
+            self.peak_bytes = max(self.peak_bytes, self._queued)
+            self._cond.notify()
+        return True
+
+    def open(self, room: str, identity: str, sample_rate: int) -> int:
+        """Starts a transmission and returns the handle to write it through.
+
+        0 if this speaker is already being recorded in this room.
+        """
+        speaker = (room, identity)
+        if speaker in self._speakers:
+            self.duplicates += 1
+            return 0
+        self.start()
+        handle = next(self._handles)
+        self._open[handle] = speaker
+        self._speakers.add(speaker)
+        self._put(("open", handle, room, identity, sample_rate, _now_ms()))
+        return handle
+
+    def write(self, handle: int, pcm: np.ndarray) -> bool:
+        """Queues int16 mono PCM; False if it was dropped for lack of spool space."""
+        if handle not in self._open:
+            return False
+        data = pcm.astype(np.int16, copy=False).tobytes()
+        return self._put(("data", handle, data), len(data))
+
+    def close(self, handle: int):
+        speaker = self._open.pop(handle, None)
+        if speaker is not None:
+            self._speakers.discard(speaker)
+            self._put(("close", handle, _now_ms()))
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until everything queued so far is on disk and indexed."""
+        done = threading.Event()
+        self._put(("flush", done))
+        return done.wait(timeout)
+
+    def _run(self):
+        db = self._prepare()
+        files: dict[int, tuple[wave.Wave_write, tuple]] = {}
+        while True:
+            with self._cond:
+                while not self._spool:
+                    self._cond.wait()
+                batch = list(self._spool)
+                self._spool.clear()
+            for item in batch:
+                try:
+                    self._apply(db, files, item)
+                except Exception as e:
+                    logging.exception(f"Archive write failed: {e}")
+            db.commit()
+
+    def _apply(self, db: sqlite3.Connection, files: dict, item: tuple):
+        kind = item[0]
+        if kind == "data":
+            _, handle, data = item
+            with self._cond:
+                self._queued -= len(data)
+            if handle in files:
+                files[handle][0].writeframesraw(data)
+                self.written_bytes += len(data)
+        elif kind == "open":
+            _, handle, room, identity, sample_rate, started = item
+            folder = self.root / _safe(room) / _safe(identity)
+            folder.mkdir(parents=True, exist_ok=True)
+            path = folder / f"{started}-{self.run_id}-{handle}.wav"
+            out = wave.open(str(path), "wb")
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(sample_rate)
+            files[handle] = (out, (room, identity, started, sample_rate, path))
+        elif kind == "close":
+            _, handle, ended = item
+            if handle not in files:
+                return
+            out, (room, identity, started, sample_rate, path) = files.pop(handle)
+            frames = out.getnframes()
+            out.close()
+            db.execute(
+                "INSERT INTO transmissions"
+                " (room, identity, started_ms, ended_ms, sample_rate, frames, path)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (room, identity, started, ended, sample_rate, frames, str(path)),
+            )
+            self.transmissions += 1
+        elif kind == "flush":
+            db.commit()
+            item[1].set()
+
+    def search(
+        self,
+        room: str | None = None,
+        identity: str | None = None,
+        since_ms: int | None = None,
+        until_ms: int | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Transmissions overlapping [since_ms, until_ms], newest first."""
+        clauses, args = [], []
+        for clause, value in (
+            ("room = ?", room),
+            ("identity = ?", identity),
+            ("ended_ms >= ?", since_ms),
+            ("started_ms <= ?", until_ms),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                args.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        started = time.perf_counter()
+        with self._reader_lock:
+            rows = (
+                self._read_db()
+                .execute(
+                    "SELECT id, room, identity, started_ms, ended_ms, sample_rate, frames"
+                    f" FROM transmissions{where} ORDER BY started_ms DESC LIMIT ?",
+                    (*args, limit),
+                )
+                .fetchall()
+            )
+        self.lookup_ms.record((time.perf_counter() - started) * 1000)
+        keys = ("id", "room", "identity", "started_ms", "ended_ms", "sample_rate")
+        return [
+            {
+                **dict(zip(keys, row[:-1], strict=True)),
+                "duration_ms": row[-1] * 1000 // row[5],
+            }
+            for row in rows
+        ]
+
+    def _read_db(self) -> sqlite3.Connection:
+        if self._reader is None:
+            self._reader = self._prepare()
+        return self._reader
+
+    def path(self, transmission_id: int, room: str | None = None) -> Path | None:
+        """File of one transmission; None if missing or recorded in another room."""
+        query, args = "SELECT path FROM transmissions WHERE id = ?", [transmission_id]
+        if room is not None:
+            query += " AND room = ?"
+            args.append(room)
+        with self._reader_lock:
+            row = self._read_db().execute(query, args).fetchone()
+        return Path(row[0]) if row else None
+
+    def read(
+        self, transmission_id: int, room: str | None = None
+    ) -> Iterator[bytes] | None:
+        """The stored WAV in `ARCHIVE_CHUNK_BYTES` slices of a memory map."""
+        path = self.path(transmission_id, room)
+        if path is None or not path.exists():
+            return None
+        return _mapped_chunks(path)
+
+    def stats(self) -> dict:
+        return {
+            "transmissions": self.transmissions,
+            "open": len(self._open),
+            "duplicates": self.duplicates,
+            "queued_bytes": self._queued,
+            "peak_bytes": self.peak_bytes,
+            "written_bytes": self.written_bytes,
+            "dropped_bytes": self.dropped_bytes,
+            "lookup_ms": self.lookup_ms.summary(),
+        }
+
+
+def _mapped_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        for offset in range(0, len(m), ARCHIVE_CHUNK_BYTES):
+            yield m[offset : offset + ARCHIVE_CHUNK_BYTES]
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+ARCHIVE = TransmissionArchive()
+
+
+class TransmissionRecorder:
+    """Records every PTT transmission heard or sent in one room.
+
+    A remote transmission runs from the mic track's unmute to its mute (or
+    unsubscribe / departure) and is read at `ARCHIVE_SAMPLE_RATE` from its
+    own `rtc.AudioStream`; the local one is fed by the session around
+    `start_talking` / `stop_talking`.
+    """
+
+    def __init__(self, room: rtc.Room, archive: TransmissionArchive = ARCHIVE):
+        self._room = room
+        self.archive = archive
+        self._streams: dict[str, tuple[rtc.AudioStream, asyncio.Task]] = {}
+        self._active: dict[str, int] = {}
+        self._handlers: list[tuple[str, object]] = []
+
+    def attach(self):
+        for event, handler in (
+            ("track_subscribed", self._on_track_subscribed),
+            ("track_unsubscribed", self._on_track_unsubscribed),
+            ("track_muted", self._on_track_muted),
+            ("track_unmuted", self._on_track_unmuted),
+        ):
+            self._handlers.append((event, self._room.on(event, handler)))
+        for p in self._room.remote_participants.values():
+            for pub in p.track_publications.values():
+                if pub.track is not None and pub.subscribed:
+                    self._on_track_subscribed(pub.track, pub, p)
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def rebind(self, room: rtc.Room):
+        """Follows a replacement room; remote transmissions cut by the drop end."""
+        self._unbind()
+        for sid in list(self._streams):
+            self._stop(sid)
+        self._room = room
+        self.attach()
+
+    def close(self):
+        self._unbind()
+        for sid in list(self._streams):
+            self._stop(sid)
+        self.end(LOCAL)
+
+    def begin(self, key: str, identity: str, sample_rate: int):
+        if key in self._active:
+            return
+        handle = self.archive.open(self._room.name or "room", identity, sample_rate)
+        if handle:
+            TRANSMISSIONS.inc(direction="local" if key == LOCAL else "remote")
+            self._active[key] = handle
+
+    def write(self, key: str, pcm: np.ndarray):
+        handle = self._active.get(key)
+        if handle is not None:
+            self.archive.write(handle, pcm)
+
+    def end(self, key: str):
+        handle = self._active.pop(key, None)
+        if handle is not None:
+            self.archive.close(handle)
+
+    def _on_track_subscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        if pub.source != MICROPHONE or pub.sid in self._streams:
+            return
+        stream = rtc.AudioStream(track, sample_rate=ARCHIVE_SAMPLE_RATE, num_channels=1)
+        task = asyncio.create_task(self._read(pub.sid, stream))
+        self._streams[pub.sid] = (stream, task)
+        if not pub.muted:
+            self.begin(pub.sid, p.identity, ARCHIVE_SAMPLE_RATE)
+
+    def _on_track_unsubscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        self._stop(pub.sid)
+
+    def _on_track_unmuted(self, p: rtc.Participant, pub: rtc.TrackPublication):
+        if pub.sid in self._streams:
+            self.begin(pub.sid, p.identity, ARCHIVE_SAMPLE_RATE)
+
+    def _on_track_muted(self, p: rtc.Participant, pub: rtc.TrackPublication):
+        self.end(pub.sid)
+
+    def _stop(self, sid: str):
+        self.end(sid)
+        entry = self._streams.pop(sid, None)
+        if entry is not None:
+            stream, task = entry
+            task.cancel()
+            asyncio.create_task(stream.aclose())
+
+    async def _read(self, sid: str, stream: rtc.AudioStream):
+        async for event in stream:
+            if sid in self._active:
+                self.write(sid, np.frombuffer(event.frame.data, dtype=np.int16))
@@ -0,0 +1,181 @@
+import asyncio
+import collections
+import logging
+import time
+from livekit import rtc
+from app.services.registry import TrackRegistry
+from app.services.stats import LatencyWindow
+
+MAX_AUDIO_SUBSCRIPTIONS = 4
+IDLE_GRACE_S = 8.0
+SWEEP_INTERVAL_S = 1.0
+
+MICROPHONE = rtc.TrackSource.SOURCE_MICROPHONE
+
+
+class AutoSubscriber:
+    """Subscribes remote microphones by who is talking, within a fixed budget.
+
+    Active-speaker events move a participant to the back of an LRU and
+    subscribe its mic. When the budget is full the least recently heard
+    participant that is not talking right now is dropped to make room, and a
+    sweep drops anyone silent for longer than `grace`. Pinned identities stay
+    subscribed and do not count against the budget.
+    """
+
+    def __init__(
+        self,
+        room: rtc.Room,
+        registry: TrackRegistry,
+        max_audio: int = MAX_AUDIO_SUBSCRIPTIONS,
+        grace: float = IDLE_GRACE_S,
+    ):
+        self._room = room
+        self.registry = registry
+        self.max_audio = max_audio
+        self.grace = grace
+        self.pinned: set[str] = set()
+        self._heard: collections.OrderedDict[str, float] = collections.OrderedDict()
+        self._speaking: set[str] = set()
+        self._requested: dict[str, float] = {}
+        self._handlers: list[tuple[str, object]] = []
+        self._sweeper: asyncio.Task | None = None
+        self.subscribe_ms = LatencyWindow()
+        self.evictions = 0
+
+    def attach(self):
+        for event, handler in (
+            ("active_speakers_changed", self._on_active_speakers_changed),
+            ("track_published", self._on_track_published),
+            ("track_subscribed", self._on_track_subscribed),
+            ("participant_disconnected", self._on_participant_disconnected),
+        ):
+            self._handlers.append((event, self._room.on(event, handler)))
+        for record in self.registry:
+            if record.identity in self.pinned:
+                self._subscribe(record.publication(MICROPHONE))
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def rebind(self, room: rtc.Room):
+        """Follows a replacement room; speakers are picked up again as they talk."""
+        self._unbind()
+        self._room = room
+        self._heard.clear()
+        self._speaking.clear()
+        self._requested.clear()
+        self.attach()
+
+    def close(self):
+        self._unbind()
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def _subscribe(self, pub: rtc.RemoteTrackPublication | None):
+        if pub is not None and not pub.subscribed:
+            self._requested[pub.sid] = time.perf_counter()
+            pub.set_subscribed(True)
+
+    def _evict(self, sid: str):
+        self._heard.pop(sid, None)
+        record = self.registry.get(sid)
+        if record is None or record.identity in self.pinned:
+            return
+        pub = record.publication(MICROPHONE)
+        if pub is not None and pub.subscribed:
+            pub.set_subscribed(False)
+            self.evictions += 1
+
+    def _make_room(self) -> bool:
+        for sid in self._heard:
+            if sid not in self._speaking:
+                self._evict(sid)
+                return True
+        return False
+
+    def _on_active_speakers_changed(self, speakers: list[rtc.Participant]):
+        now = time.monotonic()
+        self._speaking = {p.sid for p in speakers}
+        for p in speakers:
+            record = self.registry.get(p.sid)
+            if record is None or record.identity in self.pinned:
+                continue
+            pub = record.publication(MICROPHONE)
+            if pub is None:
+                continue
+            if p.sid not in self._heard and len(self._heard) >= self.max_audio:
+                if not self._make_room():
+                    logging.info(f"Audio budget full; not subscribing {p.identity}.")
+                    continue
+            self._heard[p.sid] = now
+            self._heard.move_to_end(p.sid)
+            self._subscribe(pub)
+
+    def _on_track_published(
+        self, pub: rtc.RemoteTrackPublication, p: rtc.RemoteParticipant
+    ):
+        if pub.source == MICROPHONE and p.identity in self.pinned:
+            self._subscribe(pub)
+
+    def _on_track_subscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        requested = self._requested.pop(pub.sid, None)
+        if requested is not None:
+            self.subscribe_ms.record((time.perf_counter() - requested) * 1000)
+
+    def _on_participant_disconnected(self, p: rtc.RemoteParticipant):
+        self._heard.pop(p.sid, None)
+        self._speaking.discard(p.sid)
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(SWEEP_INTERVAL_S)
+            now = time.monotonic()
+            for sid in self._speaking & self._heard.keys():
+                self._heard[sid] = now
+            for sid, heard in list(self._heard.items()):
+                if sid not in self._speaking and now - heard > self.grace:
+                    self._evict(sid)
+
+    def toggle_pin(self, identity: str) -> bool:
+        """Pins or unpins an identity; an unpinned one starts its idle grace now."""
+        records = [record for record in self.registry if record.identity == identity]
+        if identity in self.pinned:
+            self.pinned.discard(identity)
+            for record in records:
+                self._heard[record.sid] = time.monotonic()
+                self._heard.move_to_end(record.sid)
+            while len(self._heard) > self.max_audio and self._make_room():
+                pass
+            return False
+        self.pinned.add(identity)
+        for record in records:
+            self._heard.pop(record.sid, None)
+            self._subscribe(record.publication(MICROPHONE))
+        return True
+
+    def stats(self) -> dict[str, float]:
+        subscribed = 0
+        for record in self.registry:
+            pub = record.publication(MICROPHONE)
+            subscribed += pub is not None and pub.subscribed
+        latency = self.subscribe_ms.summary()
+        return {
+            "subscribed": subscribed,
+            "auto": len(self._heard),
+            "pinned": len(self.pinned),
+            "speaking": len(self._speaking),
+            "evictions": self.evictions,
+            "subscribe_p50": latency["p50"],
+            "subscribe_p95": latency["p95"],
+        }
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import time
+from livekit import rtc
+from livekit.rtc import stats as rtc_stats
+from app.services.devices import CAMERA_FPS, CAMERA_HEIGHT, CAMERA_WIDTH, CameraDevice
+from app.services.metrics import LOOP_LAG
+
+CAMERA_POLL_S = 0.5
+CAMERA_STATS_TIMEOUT_S = 2.0
+# Quiet time before stepping one profile back up.
+CAMERA_STEP_UP_S = 8.0
+CAMERA_LAG_MS = 50.0
+CAMERA_LOSS = 0.05
+
+
+class CameraProfile:
+    """Capture scale and rate, with the simulcast uplink it roughly costs."""
+
+    __slots__ = ("name", "scale", "fps", "kbps")
+
+    def __init__(self, name: str, scale: int, fps: float, kbps: int):
+        self.name = name
+        self.scale = scale
+        self.fps = fps
+        self.kbps = kbps
+
+    @property
+    def pixel_rate(self) -> float:
+        return CAMERA_WIDTH * CAMERA_HEIGHT / self.scale**2 * self.fps
+
+
+# Best first. Halving the input also drops the top simulcast layer, since
+# the encoder derives its layers from the frame size; kbps is the sum of
+# the layers LiveKit publishes at that size and rate.
+CAMERA_PROFILES = (
+    CameraProfile("high", 1, CAMERA_FPS, 700),
+    CameraProfile("medium", 2, CAMERA_FPS, 220),
+    CameraProfile("low", 2, 8, 130),
+    CameraProfile("minimal", 4, 5, 50),
+)
+# Highest profile allowed while PTT audio is on the air.
+CAMERA_TALKING = 2
+
+
+class CameraSignals:
+    """What one stats poll says about the published camera."""
+
+    __slots__ = ("subscribed", "cpu", "network", "talking", "sent_bytes")
+
+    def __init__(
+        self,
+        subscribed: bool = True,
+        cpu: bool = False,
+        network: bool = False,
+        talking: bool = False,
+        sent_bytes: int = 0,
+    ):
+        self.subscribed = subscribed
+        self.cpu = cpu
+        self.network = network
+        self.talking = talking
+        self.sent_bytes = sent_bytes
+
+
+class CameraGovernor:
+    """Runs `camera_main` only when watched, at a profile that fits the load.
+
+    The room connects with dynacast, so the SFU switches simulcast layers
+    off when nobody subscribes to them; once every layer is inactive the
+    capture thread is paused as well, and it resumes on the next poll that
+    sees a layer switched back on (or at once on the first subscription).
+    CPU pressure (encoder CPU-limited or event-loop lag), network pressure
+    (bandwidth-limited or remote loss) and PTT transmission step the profile
+    down at once; it climbs back one step after `CAMERA_STEP_UP_S` of calm.
+    The camera is shared by every session in the process, so these are only
+    this session's wishes: the device pauses when all governors ask and runs
+    the best profile any of them wants. Like the metrics sampler it never
+    fetches stats while a press or release is in flight, and on the air it
+    steps on loop lag alone, since the profile is capped then anyway.
+    """
+
+    def __init__(self, session, device: CameraDevice | None):
+        self._session = session
+        self.device = device
+        self._room: rtc.Room = session.room
+        self.level = 0
+        self.paused = False
+        self._calm_since = time.monotonic()
+        self._handlers: list[tuple[str, object]] = []
+        self._task: asyncio.Task | None = None
+        self.seconds = {profile.name: 0.0 for profile in CAMERA_PROFILES}
+        self.seconds["paused"] = 0.0
+        self._last_step = time.monotonic()
+        self._sent: tuple[float, int] | None = None
+        self.kbps = 0.0
+        self._sent_bits = 0.0
+        self._sent_s = 0.0
+        self.steps = 0
+        self.skipped = 0
+
+    @property
+    def profile(self) -> CameraProfile:
+        return CAMERA_PROFILES[self.level]
+
+    def attach(self):
+        self._bind(self._session.room)
+        self._hold()
+        self._task = asyncio.create_task(self._poll_forever())
+
+    def rebind(self, room: rtc.Room):
+        self._unbind()
+        self._bind(room)
+        self._sent = None
+
+    def _bind(self, room: rtc.Room):
+        self._room = room
+        self._handlers.append(
+            (
+                "local_track_subscribed",
+                room.on("local_track_subscribed", self._on_subscribed),
+            )
+        )
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def close(self):
+        self._unbind()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.device is not None:
+            self.device.release(self)
+
+    def _on_subscribed(self, track: rtc.Track):
+        if track is self._session.video_track and self.paused:
+            self.step(CameraSignals(talking=self._session.ptt.transmitting))
+
+    async def _poll_forever(self):
+        while True:
+            await asyncio.sleep(CAMERA_POLL_S)
+            ptt = self._session.ptt
+            if ptt.busy:
+                self.skipped += 1
+                continue
+            try:
+                if ptt.transmitting:
+                    self.step(
+                        CameraSignals(
+                            subscribed=not self.paused,
+                            cpu=LOOP_LAG.last > CAMERA_LAG_MS,
+                            talking=True,
+                        )
+                    )
+                else:
+                    self.step(await self.signals())
+            except Exception as e:
+                logging.warning(f"Camera governor poll failed: {e}")
+
+    async def signals(self) -> CameraSignals:
+        stats = await asyncio.wait_for(
+            self._room.get_rtc_stats(), CAMERA_STATS_TIMEOUT_S
+        )
+        layers = active = 0
+        cpu = network = False
+        sent = 0
+        for stat in stats.publisher_stats:
+            which = stat.WhichOneof("stats")
+            if which == "outbound_rtp":
+                rtp = stat.outbound_rtp
+                if rtp.stream.kind != "video":
+                    continue
+                layers += 1
+                active += rtp.outbound.active
+                sent += rtp.sent.bytes_sent
+                reason = rtp.outbound.quality_limitation_reason
+                cpu |= reason == rtc_stats.QualityLimitationReason.LIMITATION_CPU
+                network |= (
+                    reason == rtc_stats.QualityLimitationReason.LIMITATION_BANDWIDTH
+                )
+            elif which == "remote_inbound_rtp":
+                rtp = stat.remote_inbound_rtp
+                if rtp.stream.kind == "video":
+                    network |= rtp.remote_inbound.fraction_lost > CAMERA_LOSS
+        return CameraSignals(
+            # No video layers reported yet: assume watched rather than pause blind.
+            subscribed=active > 0 or layers == 0,
+            cpu=cpu or LOOP_LAG.last > CAMERA_LAG_MS,
+            network=network,
+            talking=self._session.ptt.transmitting,
+            sent_bytes=sent,
+        )
+
+    def step(self, signals: CameraSignals, now: float | None = None):
+        """Folds one poll into the pause state and the current profile."""
+        now = time.monotonic() if now is None else now
+        self.seconds["paused" if self.paused else self.profile.name] += (
+            now - self._last_step
+        )
+        self._last_step = now
+        self._measure(signals.sent_bytes, now)
+        if not signals.subscribed:
+            if not self.paused:
+                self.paused = True
+                self._hold()
+            return
+        if self.paused:
+            self.paused = False
+            self._hold()
+        level = self.level
+        if signals.cpu or signals.network:
+            level = min(level + 1, len(CAMERA_PROFILES) - 1)
+            self._calm_since = now
+        elif now - self._calm_since >= CAMERA_STEP_UP_S and level > 0:
+            level -= 1
+            self._calm_since = now
+        if signals.talking:
+            level = max(level, CAMERA_TALKING)
+        self._set_level(level)
+
+    def _set_level(self, level: int):
+        if level == self.level:
+            return
+        self.level = level
+        self.steps += 1
+        self._hold()
+
+    def _hold(self):
+        if self.device is not None:
+            self.device.hold(self, self.paused, self.profile.scale, self.profile.fps)
+
+    def _measure(self, sent_bytes: int, now: float):
+        if not sent_bytes:
+            return
+        if self._sent is not None and sent_bytes >= self._sent[1]:
+            seconds = max(1e-3, now - self._sent[0])
+            self.kbps = (sent_bytes - self._sent[1]) * 8 / seconds / 1000
+            self._sent_bits += (sent_bytes - self._sent[1]) * 8
+            self._sent_s += seconds
+        self._sent = (now, sent_bytes)
+
+    def stats(self) -> dict[str, float | str]:
+        """Time share per profile, capture pixels saved and the uplink.
+
+        `kbps` and `kbps_avg` are measured from the bytes the camera sent;
+        `kbps_saved_est` prices the time in each profile at its nominal kbps.
+        """
+        total = sum(self.seconds.values()) or 1.0
+        full = CAMERA_PROFILES[0]
+        pixels = kbps = 0.0
+        for profile in CAMERA_PROFILES:
+            share = self.seconds[profile.name] / total
+            pixels += share * profile.pixel_rate
+            kbps += share * profile.kbps
+        stats = {
+            "profile": "paused" if self.paused else self.profile.name,
+            "paused_pct": round(100 * self.seconds["paused"] / total, 1),
+            "pixels_saved_pct": round(100 * (1 - pixels / full.pixel_rate), 1),
+            "kbps_saved_est": round(full.kbps - kbps, 1),
+            "kbps": round(self.kbps, 1),
+            "kbps_avg": (
+                round(self._sent_bits / self._sent_s / 1000, 1) if self._sent_s else 0.0
+            ),
+            "steps": self.steps,
+        }
+        if self.device is not None:
+            stats["convert_us"] = round(self.device.convert_us, 1)
+            stats["frames_sent"] = self.device.frames_sent
+            stats["frames_dropped"] = self.device.frames_dropped
+        return stats
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable
+import numpy as np
+from livekit import rtc
+
+CAMERA_WIDTH = 640
+CAMERA_HEIGHT = 480
+CAMERA_FPS = 15
+
+_mic_lock = threading.Lock()
+_camera_lock = threading.Lock()
+_mic: "MicDevice | None" = None
+_camera: "CameraDevice | None" = None
+
+
+class MicDevice:
+    """Process-wide handle on the default input device.
+
+    The PortAudio stream is opened once and kept running; every attached
+    pipeline receives its own copy of each block, so reconnects and new
+    sessions skip the device open entirely and sessions in one process can
+    all publish the mic.
+    """
+
+    def __init__(self, sample_rate: int, channels: int, blocksize: int):
+        import sounddevice as sd
+
+        self._sinks: dict[Callable[[np.ndarray], None], asyncio.AbstractEventLoop] = {}
+        self._stream = sd.InputStream(
+            samplerate=sample_rate,
+            channels=channels,
+            dtype="int16",
+            blocksize=blocksize,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, indata, frames, time_info, status):
+        for sink, loop in list(self._sinks.items()):
+            loop.call_soon_threadsafe(sink, indata[:, 0].copy())
+
+    def attach(self, sink: Callable[[np.ndarray], None]):
+        self._sinks[sink] = asyncio.get_running_loop()
+
+    def detach(self, sink: Callable[[np.ndarray], None]):
+        self._sinks.pop(sink, None)
+
+    def close(self):
+        self._sinks.clear()
+        self._stream.stop()
+        self._stream.close()
+
+
+class CameraDevice:
+    """Process-wide handle on the default camera, read on its own thread.
+
+    Frames are converted to RGBA once and handed to every attached
+    `rtc.VideoSource`, so the capture survives reconnects without reopening
+    the device and several sessions in one process can publish it.
+    Each session's governor holds it with `hold` (paused or not, and the
+    scale and rate it wants) until `release`. The thread pauses only when
+    every holder asks; otherwise it runs the most demanding profile any
+    running holder wants, scaling frames down by an integer factor and
+    dropping them to a lower frame rate. While paused the thread stops
+    reading but keeps the device open, so a resume delivers the next frame
+    without a device restart.
+    The newest frame read is kept in `latest` (BGR, full size) for stills,
+    and `still` wakes a paused thread for exactly one read.
+    """
+
+    def __init__(self, index: int = 0):
+        import cv2
+
+        self._cv2 = cv2
+        self._capture = cv2.VideoCapture(index)
+        if not self._capture.isOpened():
+            raise RuntimeError(f"Camera {index} could not be opened.")
+        self._capture.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
+        self._capture.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
+        self._capture.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
+        self._sources: dict[rtc.VideoSource, asyncio.AbstractEventLoop] = {}
+        self._running = True
+        self._active = threading.Event()
+        self._active.set()
+        self._lock = threading.Lock()
+        self._paused = False
+        # holder -> (paused, scale, fps)
+        self._holds: dict[object, tuple[bool, int, float]] = {}
+        self._still = False
+        self.latest: np.ndarray | None = None
+        self.scale = 1
+        self.fps = float(CAMERA_FPS)
+        self._next_frame_at = 0.0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.convert_us = 0.0
+        self._thread = threading.Thread(
+            target=self._read, name="camera-capture", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def _read(self):
+        while self._running:
+            if not self._active.wait(0.5):
+                continue
+            ok, bgr = self._capture.read()
+            if not ok:
+                time.sleep(1 / CAMERA_FPS)
+                continue
+            self.latest = bgr
+            if self._still:
+                with self._lock:
+                    self._still = False
+                    if self._paused:
+                        self._active.clear()
+                        continue
+            sources = list(self._sources.items())
+            if not sources:
+                continue
+            now = time.monotonic()
+            if now < self._next_frame_at:
+                self.frames_dropped += 1
+                continue
+            self._next_frame_at = max(now, self._next_frame_at + 1 / self.fps)
+            started = time.perf_counter()
+            if self.scale > 1:
+                bgr = self._cv2.resize(
+                    bgr,
+                    (bgr.shape[1] // self.scale, bgr.shape[0] // self.scale),
+                    interpolation=self._cv2.INTER_AREA,
+                )
+            rgba = self._cv2.cvtColor(bgr, self._cv2.COLOR_BGR2RGBA)
+            frame = rtc.VideoFrame(
+                rgba.shape[1], rgba.shape[0], rtc.VideoBufferType.RGBA, rgba.tobytes()
+            )
+            for source, loop in sources:
+                loop.call_soon_threadsafe(source.capture_frame, frame)
+            self.frames_sent += 1
+            us = (time.perf_counter() - started) * 1e6
+            self.convert_us += (us - self.convert_us) * 0.05
+
+    def hold(self, holder: object, paused: bool, scale: int, fps: float):
+        """Records what one holder wants and settles the capture on all of them."""
+        self._holds[holder] = (paused, max(1, scale), min(float(CAMERA_FPS), fps))
+        self._settle()
+
+    def release(self, holder: object):
+        self._holds.pop(holder, None)
+        self._settle()
+
+    def _settle(self):
+        running = [
+            (scale, fps) for paused, scale, fps in self._holds.values() if not paused
+        ]
+        if self._holds and not running:
+            self._pause()
+            return
+        self.scale = min((scale for scale, _ in running), default=1)
+        self.fps = max((fps for _, fps in running), default=float(CAMERA_FPS))
+        self._resume()
+
+    def _pause(self):
+        with self._lock:
+            self._paused = True
+            self._active.clear()
+
+    def _resume(self):
+        with self._lock:
+            if not self._paused:
+                return
+            self._paused = False
+            self._next_frame_at = 0.0
+            self._active.set()
+
+    def still(self):
+        """Reads one frame into `latest` while paused; a no-op when running."""
+        with self._lock:
+            if self._paused:
+                self._still = True
+                self._active.set()
+
+    def attach(self, source: rtc.VideoSource):
+        self._sources[source] = asyncio.get_running_loop()
+
+    def detach(self, source: rtc.VideoSource):
+        self._sources.pop(source, None)
+
+    def close(self):
+        self._running = False
+        self._sources.clear()
+        self._active.set()
+        self._thread.join(timeout=1.0)
+        self._capture.release()
+
+
+def mic_device(sample_rate: int, channels: int, blocksize: int) -> MicDevice | None:
+    """Opens the input device on first use and returns the cached handle after."""
+    global _mic
+    with _mic_lock:
+        if _mic is None:
+            try:
+                _mic = MicDevice(sample_rate, channels, blocksize)
+            except ImportError:
+                logging.warning(
+                    "sounddevice is not installed; mic_main will be silent."
+                )
+        return _mic
+
+
+def camera_device() -> CameraDevice | None:
+    """Opens the camera on first use and returns the cached handle after."""
+    global _camera
+    with _camera_lock:
+        if _camera is None:
+            try:
+                _camera = CameraDevice()
+            except ImportError:
+                logging.warning("opencv is not installed; camera_main will be blank.")
+        return _camera
+
+
+def close_devices():
+    """Releases the cached devices, e.g. at process shutdown."""
+    global _mic, _camera
+    with _mic_lock:
+        if _mic is not None:
+            _mic.close()
+        _mic = None
+    with _camera_lock:
+        if _camera is not None:
+            _camera.close()
+        _camera = None
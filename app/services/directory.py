@@ -0,0 +1,154 @@
+import bisect
+import itertools
+import time
+
+ROSTER_ORDERS = ("name", "talking", "audio", "recent")
+ROSTER_PAGE_SIZE = 50
+
+Row = dict[str, str | bool]
+
+# Past every real character, so (prefix + _END,) sorts after all matches.
+_END = "\U0010ffff"
+
+
+def page_bounds(
+    offset: int, total: int, size: int = ROSTER_PAGE_SIZE
+) -> tuple[int, int]:
+    """1-based (first, last) row numbers on the page at `offset`, (0, 0) if none."""
+    if offset >= total:
+        return 0, 0
+    return offset + 1, min(offset + size, total)
+
+
+def has_next_page(offset: int, total: int, size: int = ROSTER_PAGE_SIZE) -> bool:
+    return offset + size < total
+
+
+def last_page(total: int, size: int = ROSTER_PAGE_SIZE) -> int:
+    """Offset of the last page holding any of `total` rows."""
+    return max(0, total - 1) // size * size
+
+
+class SortedKeys:
+    """Sorted list of per-sid key tuples ending in the sid, kept with bisect."""
+
+    def __init__(self):
+        self.keys: list[tuple] = []
+        self._of: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def key(self, sid: str) -> tuple | None:
+        return self._of.get(sid)
+
+    def put(self, sid: str, key: tuple):
+        old = self._of.get(sid)
+        if old == key:
+            return
+        if old is not None:
+            del self.keys[bisect.bisect_left(self.keys, old)]
+        self._of[sid] = key
+        bisect.insort(self.keys, key)
+
+    def discard(self, sid: str):
+        old = self._of.pop(sid, None)
+        if old is not None:
+            del self.keys[bisect.bisect_left(self.keys, old)]
+
+    def clear(self):
+        self.keys.clear()
+        self._of.clear()
+
+
+class RosterDirectory:
+    """Roster rows with one maintained sort index per order, for paged views.
+
+    Every patch updates each index in O(log n) plus a list shift, so a page
+    is a slice instead of a sort. Identity prefix search is a bisect range
+    on the name index; when the prefix matches few rows they are sorted on
+    their own, otherwise the chosen order is walked and filtered.
+    """
+
+    def __init__(self):
+        self.rows: dict[str, Row] = {}
+        self._active_at: dict[str, float] = {}
+        self._orders = {order: SortedKeys() for order in ROSTER_ORDERS}
+        self._video = SortedKeys()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def clear(self):
+        self.rows.clear()
+        self._active_at.clear()
+        for index in self._orders.values():
+            index.clear()
+        self._video.clear()
+
+    def apply(self, patch: dict[str, Row | None]):
+        for sid, row in patch.items():
+            if row is None:
+                self._remove(sid)
+            else:
+                self._update(sid, row)
+
+    def _remove(self, sid: str):
+        if self.rows.pop(sid, None) is None:
+            return
+        self._active_at.pop(sid, None)
+        for index in self._orders.values():
+            index.discard(sid)
+        self._video.discard(sid)
+
+    def _update(self, sid: str, row: Row):
+        previous = self.rows.get(sid)
+        self.rows[sid] = row
+        speaking = bool(row.get("speaking"))
+        if speaking or (previous is not None and previous.get("speaking")):
+            self._active_at[sid] = time.monotonic()
+        name = (str(row["identity"]).casefold(), sid)
+        self._orders["name"].put(sid, name)
+        self._orders["talking"].put(sid, (not speaking, *name))
+        self._orders["audio"].put(
+            sid, (not row["audio_subscribed"], not row["has_audio"], *name)
+        )
+        self._orders["recent"].put(sid, (-self._active_at.get(sid, 0.0), *name))
+        if row["video_subscribed"]:
+            self._video.put(sid, name)
+        else:
+            self._video.discard(sid)
+
+    def view(
+        self,
+        order: str = "name",
+        prefix: str = "",
+        offset: int = 0,
+        limit: int = ROSTER_PAGE_SIZE,
+    ) -> tuple[list[Row], int]:
+        """One page of rows in `order`, filtered by identity prefix, and the total."""
+        index = self._orders.get(order, self._orders["name"])
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            window = index.keys[offset : offset + limit]
+            return [self.rows[key[-1]] for key in window], len(index)
+        names = self._orders["name"].keys
+        lo = bisect.bisect_left(names, (prefix,))
+        hi = bisect.bisect_left(names, (prefix + _END,))
+        if index is self._orders["name"]:
+            window = names[min(hi, lo + offset) : min(hi, lo + offset + limit)]
+        elif (hi - lo) * 8 < len(names):
+            keys = sorted(index.key(sid) for _, sid in names[lo:hi])
+            window = keys[offset : offset + limit]
+        else:
+            matching = (
+                key
+                for key in index.keys
+                if str(self.rows[key[-1]]["identity"]).casefold().startswith(prefix)
+            )
+            window = list(itertools.islice(matching, offset, offset + limit))
+        return [self.rows[key[-1]] for key in window], hi - lo
+
+    def videos(self) -> list[Row]:
+        """Rows with a subscribed camera, by identity."""
+        return [self.rows[key[-1]] for key in self._video.keys]
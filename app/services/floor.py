@@ -0,0 +1,426 @@
+import asyncio
+import itertools
+import logging
+import math
+import os
+import struct
+import time
+from livekit import rtc
+from app.services.stats import LatencyWindow
+
+FLOOR_TOPIC = "ptt.floor"
+FLOOR_VERSION = 2
+FLOOR_GRANT_BUDGET_MS = 250.0
+# How long a joining client waits to hear from the floor clients that were
+# in the room before it, before trusting its own election.
+FLOOR_SETTLE_S = 0.5
+# A pending request is resent this often, and given up once the arbiter has
+# stayed silent for FLOOR_REQUEST_TRIES resends in a row.
+FLOOR_RETRY_S = 1.0
+FLOOR_REQUEST_TRIES = 3
+
+REQUEST = 1
+RELEASE = 2
+GRANT = 3
+ANNOUNCE = 4
+SYNC = 5
+
+# version, kind, seq, identity length; identity bytes follow.
+_HEADER = struct.Struct("!BBIB")
+
+
+def encode_floor(kind: int, seq: int, identity: str) -> bytes:
+    name = identity.encode()[:255]
+    return _HEADER.pack(FLOOR_VERSION, kind, seq, len(name)) + name
+
+
+def decode_floor(data: bytes) -> tuple[int, int, str] | None:
+    """(kind, seq, identity), or None for foreign or truncated packets."""
+    if len(data) < _HEADER.size:
+        return None
+    version, kind, seq, size = _HEADER.unpack_from(data)
+    if version != FLOOR_VERSION or len(data) < _HEADER.size + size:
+        return None
+    name = data[_HEADER.size : _HEADER.size + size].decode(errors="replace")
+    return kind, seq, name
+
+
+def floor_priorities(spec: str) -> dict[str, int]:
+    """Parses "identity=priority,..." as set in PTT_FLOOR_PRIORITIES."""
+    priorities: dict[str, int] = {}
+    for item in spec.split(","):
+        identity, _, value = item.partition("=")
+        try:
+            priority = int(value)
+        except ValueError:
+            continue
+        if identity.strip():
+            priorities[identity.strip()] = max(0, min(priority, 255))
+    return priorities
+
+
+FLOOR_PRIORITIES = floor_priorities(os.environ.get("PTT_FLOOR_PRIORITIES", ""))
+
+
+def _seniority(p: rtc.Participant) -> tuple[float, str]:
+    joined = p.joined_at
+    return (joined.timestamp() if joined else math.inf, p.identity)
+
+
+class FloorControl:
+    """Request/grant/release floor control for PTT over reliable data packets.
+
+    There is no server-side arbiter. Floor clients announce themselves on
+    the floor topic when they join, and every client elects the same one:
+    the floor client that has been in the room longest. Only the arbiter
+    answers requests, and only its grants are believed; its grant numbers
+    never go back. Priorities come from the arbiter's `priorities` table,
+    never from the requester. A free floor goes to the first request that
+    reaches the arbiter; queued requests are served by priority, then
+    arrival, then identity, and a higher priority request preempts the
+    holder. When the holder leaves the floor is freed. When the arbiter
+    leaves the next one takes over, and the others ask it who holds the
+    floor and resend any pending request. A request the arbiter queues is
+    answered with the current holder, and a pending request is resent
+    every `FLOOR_RETRY_S`: a dropped packet is recovered, and an arbiter
+    that stops answering fails the press instead of leaving it waiting.
+    """
+
+    def __init__(self, room: rtc.Room, priorities: dict[str, int] | None = None):
+        self._room = room
+        self.priorities = FLOOR_PRIORITIES if priorities is None else priorities
+        self._members: set[str] = set()
+        self._settled = False
+        self._settle_timer: asyncio.TimerHandle | None = None
+        self._arbiter = ""
+        self.holder = ""
+        self._holder_priority = 0
+        self._grant_seq = 0
+        self._seen_seq = 0
+        self._seq = itertools.count(1)
+        self._arrivals = itertools.count()
+        self._queue: dict[str, tuple[int, int, int]] = {}
+        self._pending: tuple[int, float] | None = None
+        self._waiter: asyncio.Future[bool] | None = None
+        self._retry_timer: asyncio.TimerHandle | None = None
+        self._answered = False
+        self._unanswered = 0
+        self._handlers: list[tuple[str, object]] = []
+        self._changed: set[asyncio.Event] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self.on_revoked = None
+        self.grant_ms = LatencyWindow()
+
+    @property
+    def identity(self) -> str:
+        return self._room.local_participant.identity
+
+    @property
+    def priority(self) -> int:
+        return self.priority_of(self.identity)
+
+    def priority_of(self, identity: str) -> int:
+        return self.priorities.get(identity, 0)
+
+    @property
+    def arbiter(self) -> str:
+        members = [
+            p
+            for p in self._room.remote_participants.values()
+            if p.identity in self._members
+        ]
+        return min([self._room.local_participant, *members], key=_seniority).identity
+
+    @property
+    def busy(self) -> bool:
+        return bool(self.holder) and self.holder != self.identity
+
+    @property
+    def waiting(self) -> bool:
+        """Whether our request is queued behind someone else's transmission."""
+        return self._pending is not None and self.busy
+
+    def attach(self):
+        for event, handler in (
+            ("data_received", self._on_data_received),
+            ("participant_disconnected", self._on_participant_disconnected),
+        ):
+            self._handlers.append((event, self._room.on(event, handler)))
+        self._arbiter = self.identity
+        self._publish(encode_floor(ANNOUNCE, 0, self.identity))
+        if self._unheard():
+            self._settle_timer = asyncio.get_running_loop().call_later(
+                FLOOR_SETTLE_S, self._settle
+            )
+        else:
+            self._settle()
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+        if self._settle_timer is not None:
+            self._settle_timer.cancel()
+            self._settle_timer = None
+
+    def rebind(self, room: rtc.Room):
+        """Follows a replacement room; the floor is re-learned from the arbiter."""
+        self._unbind()
+        self._room = room
+        self._queue.clear()
+        self._members.clear()
+        self._settled = False
+        self._seen_seq = 0
+        self._set_holder("")
+        self.attach()
+
+    def close(self):
+        self._unbind()
+        self._stop_retry()
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(False)
+        for task in self._tasks:
+            task.cancel()
+        self._notify()
+
+    async def updates(self):
+        """Yields the floor holder ("" when free) when it or `waiting` changes."""
+        changed = asyncio.Event()
+        self._changed.add(changed)
+        try:
+            while self._handlers:
+                await changed.wait()
+                changed.clear()
+                yield self.holder
+        finally:
+            self._changed.discard(changed)
+
+    async def acquire(self) -> bool:
+        """Requests the floor and waits for it.
+
+        False if released or closed first, or if the arbiter stops answering.
+        """
+        if self.holder == self.identity:
+            return True
+        if self._waiter is None or self._waiter.done():
+            self._waiter = asyncio.get_running_loop().create_future()
+            self._pending = (next(self._seq), time.perf_counter())
+            self._unanswered = 0
+            if self._settled:
+                self._send_request()
+            self._schedule_retry()
+            self._notify()
+        return await asyncio.shield(self._waiter)
+
+    def release(self):
+        """Gives up the floor, or withdraws a request that is still queued."""
+        self._stop_retry()
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(False)
+        was_pending, self._pending = self._pending, None
+        if was_pending is not None:
+            self._notify()
+        if self.holder != self.identity and was_pending is None:
+            return
+        if not self._settled:
+            return
+        if self.arbiter == self.identity:
+            self._handle(RELEASE, 0, self.identity, self.identity)
+        else:
+            self._publish(encode_floor(RELEASE, 0, self.identity), self.arbiter)
+
+    def _send_request(self):
+        seq, _ = self._pending
+        if self.arbiter == self.identity:
+            self._answered = True
+            self._handle(REQUEST, seq, self.identity, self.identity)
+        else:
+            self._answered = False
+            self._publish(encode_floor(REQUEST, seq, self.identity), self.arbiter)
+
+    def _schedule_retry(self):
+        self._retry_timer = asyncio.get_running_loop().call_later(
+            FLOOR_RETRY_S, self._retry
+        )
+
+    def _stop_retry(self):
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+            self._retry_timer = None
+
+    def _retry(self):
+        """Resends a pending request; gives it up if the arbiter went silent."""
+        self._retry_timer = None
+        if self._pending is None:
+            return
+        if self._settled:
+            self._unanswered = 0 if self._answered else self._unanswered + 1
+            if self._unanswered >= FLOOR_REQUEST_TRIES:
+                logging.warning(f"Floor arbiter {self.arbiter} is not answering")
+                self._pending = None
+                if self._waiter is not None and not self._waiter.done():
+                    self._waiter.set_result(False)
+                self._notify()
+                return
+            self._send_request()
+        self._schedule_retry()
+
+    def _publish(self, packet: bytes, destination: str | None = None):
+        self._track(
+            self._room.local_participant.publish_data(
+                packet,
+                reliable=True,
+                destination_identities=[destination] if destination else [],
+                topic=FLOOR_TOPIC,
+            )
+        )
+
+    def _track(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._sent)
+
+    def _sent(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Floor packet not sent: {task.exception()}")
+
+    def _on_data_received(self, packet: rtc.DataPacket):
+        if packet.topic != FLOOR_TOPIC or packet.participant is None:
+            return
+        message = decode_floor(packet.data)
+        if message is None:
+            return
+        kind, seq, identity = message
+        sender = packet.participant.identity
+        if kind == ANNOUNCE:
+            self._on_announce(sender)
+        else:
+            self._handle(kind, seq, identity, sender)
+
+    def _on_announce(self, sender: str):
+        if sender not in self._members:
+            self._members.add(sender)
+            # Answer so a newcomer learns about us too.
+            self._publish(encode_floor(ANNOUNCE, 0, self.identity), sender)
+        if not self._settled and not self._unheard():
+            self._settle()
+        else:
+            self._elect()
+
+    def _handle(self, kind: int, seq: int, identity: str, sender: str):
+        """Applies one message; REQUEST and RELEASE always act for the sender."""
+        if kind == GRANT:
+            if sender == self.arbiter:
+                self._answered = True
+                if seq >= self._seen_seq:
+                    self._seen_seq = seq
+                    self._set_holder(identity)
+            return
+        if self.arbiter != self.identity:
+            return
+        if kind == SYNC:
+            packet = encode_floor(GRANT, self._grant_seq, self.holder)
+            self._publish(packet, sender)
+        elif kind == REQUEST:
+            priority = self.priority_of(sender)
+            if sender == self.holder:
+                self._grant(sender)
+            elif not self.holder or priority > self._holder_priority:
+                self._queue.pop(sender, None)
+                self._grant(sender)
+            else:
+                # A resent request keeps its place in the queue.
+                if sender not in self._queue:
+                    self._queue[sender] = (-priority, next(self._arrivals), priority)
+                if sender != self.identity:
+                    packet = encode_floor(GRANT, self._grant_seq, self.holder)
+                    self._publish(packet, sender)
+        elif kind == RELEASE:
+            self._queue.pop(sender, None)
+            if sender == self.holder:
+                self._grant_next()
+
+    def _grant(self, identity: str):
+        self._grant_seq = (self._grant_seq + 1) & 0xFFFFFFFF
+        self._set_holder(identity)
+        self._publish(encode_floor(GRANT, self._grant_seq, identity))
+
+    def _grant_next(self):
+        if not self._queue:
+            self._grant("")
+            return
+        identity = min(self._queue, key=lambda name: (*self._queue[name][:2], name))
+        self._queue.pop(identity)
+        self._grant(identity)
+
+    def _set_holder(self, identity: str):
+        previous = self.holder
+        self.holder = identity
+        self._holder_priority = self.priority_of(identity)
+        if identity == self.identity and self._pending is not None:
+            _, requested = self._pending
+            self.grant_ms.record((time.perf_counter() - requested) * 1000)
+            self._pending = None
+            self._stop_retry()
+            if self._waiter is not None and not self._waiter.done():
+                self._waiter.set_result(True)
+        elif previous == self.identity and identity != self.identity:
+            if self.on_revoked is not None:
+                self.on_revoked()
+        if previous != identity:
+            self._notify()
+
+    def _notify(self):
+        for changed in self._changed:
+            changed.set()
+
+    def _unheard(self) -> bool:
+        """True while someone who joined before us might still announce."""
+        mine = _seniority(self._room.local_participant)
+        return any(
+            p.identity not in self._members and _seniority(p) < mine
+            for p in self._room.remote_participants.values()
+        )
+
+    def _settle(self):
+        if self._settled:
+            return
+        self._settled = True
+        if self._settle_timer is not None:
+            self._settle_timer.cancel()
+            self._settle_timer = None
+        self._arbiter = ""
+        self._elect()
+
+    def _on_participant_disconnected(self, p: rtc.RemoteParticipant):
+        self._members.discard(p.identity)
+        self._queue.pop(p.identity, None)
+        if p.identity == self.holder and self.arbiter == self.identity:
+            self._grant_next()
+        if not self._settled and not self._unheard():
+            self._settle()
+        else:
+            self._elect()
+
+    def _elect(self):
+        """Takes over the floor, or asks the new arbiter for it, when it changes."""
+        if not self._settled:
+            return
+        arbiter = self.arbiter
+        if arbiter == self._arbiter:
+            return
+        self._arbiter = arbiter
+        self._seen_seq = 0
+        self._unanswered = 0
+        if arbiter == self.identity:
+            holder_here = self.holder == self.identity or any(
+                p.identity == self.holder
+                for p in self._room.remote_participants.values()
+            )
+            if self.holder and not holder_here:
+                self._grant_next()
+        else:
+            self._publish(encode_floor(SYNC, 0, self.identity), arbiter)
+        if self._pending is not None:
+            self._send_request()
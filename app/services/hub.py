@@ -0,0 +1,167 @@
+import asyncio
+import logging
+from app.services.roster import RosterPatch, RosterTracker
+from app.services.session import RoomSession
+from app.services.tokens import ISSUER, TokenIssuer
+
+SessionKey = tuple[str, str, str]
+
+
+def session_key(url: str, token: str, issuer: TokenIssuer = ISSUER) -> SessionKey:
+    """(url, room, identity) if `issuer` signed the token; else the raw token.
+
+    Joining an existing connection never reaches the LiveKit server, so
+    the claims only count once the signature checks out against our own
+    API secret. Any other token (pasted by hand, signed elsewhere, expired)
+    only shares a connection with browsers that hold the very same string.
+    """
+    claims = issuer.verify(token)
+    if claims is None:
+        return url, "", token
+    return url, *claims
+
+
+class RosterFanout:
+    """Runs one roster update loop for a shared room and fans patches out.
+
+    Each subscriber gets the full roster first, then patches. A subscriber
+    that falls behind has its pending patches merged by sid instead of
+    queued, so a slow browser session never holds up the others.
+    """
+
+    def __init__(self, roster: RosterTracker, mode: str, window: float):
+        self.roster = roster
+        self.mode = mode
+        self._subscribers: dict[asyncio.Event, RosterPatch] = {}
+        self._task = asyncio.create_task(self._pump(window))
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    async def _pump(self, window: float):
+        try:
+            async for patch in self.roster.updates(self.mode, window=window):
+                for changed, pending in self._subscribers.items():
+                    pending.update(patch)
+                    changed.set()
+        except Exception as e:
+            logging.exception(f"Error fanning out roster: {e}")
+        finally:
+            for changed in self._subscribers:
+                changed.set()
+
+    async def subscribe(self):
+        """Yields coalesced patches; `roster.rows` already includes each one."""
+        changed = asyncio.Event()
+        self._subscribers[changed] = {row["sid"]: row for row in self.roster.rows}
+        changed.set()
+        try:
+            while True:
+                await changed.wait()
+                changed.clear()
+                if self._task.done():
+                    return
+                patch, self._subscribers[changed] = self._subscribers[changed], {}
+                yield patch
+        finally:
+            self._subscribers.pop(changed, None)
+
+    def close(self):
+        self._task.cancel()
+
+
+class _HubEntry:
+    __slots__ = ("session", "refs", "ready", "roster_feed")
+
+    def __init__(self, session: RoomSession):
+        self.session = session
+        self.refs = 0
+        self.ready: asyncio.Task | None = None
+        self.roster_feed: RosterFanout | None = None
+
+
+class RoomHub:
+    """Process-wide pool of room connections, one per url/room/identity.
+
+    Browser sessions that join the same room as the same identity share one
+    RoomSession: one WebRTC peer, one decode per remote track and one roster
+    loop. The connection is closed when the last session releases it.
+
+    The roster page, thumbnails and video tile layout are kept per browser.
+    Everything the participant does in the room is shared, as it is one
+    participant: PTT, subscriptions, auto-subscribe, VOX and the noise gate,
+    the busy flag, journaling and the pre-roll chosen by the first browser.
+    A browser that joins takes those over from the session.
+    """
+
+    def __init__(self):
+        self._entries: dict[SessionKey, _HubEntry] = {}
+        self._by_session: dict[int, SessionKey] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refs(self, session: RoomSession) -> int:
+        key = self._by_session.get(id(session))
+        return self._entries[key].refs if key in self._entries else 0
+
+    async def acquire(
+        self,
+        url: str,
+        token: str,
+        preroll_ms: int = 0,
+        session_factory=RoomSession,
+        token_provider=None,
+    ) -> RoomSession:
+        """Returns a connected session for this room, connecting on first use."""
+        key = session_key(url, token)
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                session = session_factory(
+                    url, token, preroll_ms=preroll_ms, token_provider=token_provider
+                )
+                entry = _HubEntry(session)
+                entry.ready = asyncio.create_task(entry.session.connect())
+                self._entries[key] = entry
+                self._by_session[id(entry.session)] = key
+            entry.refs += 1
+        try:
+            await asyncio.shield(entry.ready)
+        except Exception:
+            await self.release(entry.session)
+            raise
+        return entry.session
+
+    def roster_feed(
+        self, session: RoomSession, mode: str = "events", window: float = 0.05
+    ) -> RosterFanout | None:
+        """The shared roster loop of a session; the first caller picks the mode."""
+        entry = self._entries.get(self._by_session.get(id(session)))
+        if entry is None or session.roster is None:
+            return None
+        if entry.roster_feed is None:
+            entry.roster_feed = RosterFanout(session.roster, mode, window)
+        return entry.roster_feed
+
+    async def release(self, session: RoomSession):
+        """Drops one reference; the last one closes the shared connection."""
+        async with self._lock:
+            key = self._by_session.get(id(session))
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[key]
+            del self._by_session[id(session)]
+        if entry.ready is not None and not entry.ready.done():
+            entry.ready.cancel()
+        if entry.roster_feed is not None:
+            entry.roster_feed.close()
+        await session.close()
+
+
+HUB = RoomHub()
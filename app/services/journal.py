@@ -0,0 +1,304 @@
+import asyncio
+import logging
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+from livekit import rtc
+from app.services.roster import ROSTER_EVENTS
+
+JOURNAL_DIR = Path("journal")
+JOURNAL_MAGIC = b"PTJ1"
+JOURNAL_FLUSH_S = 1.0
+
+# Magic, then the wall clock at the start in ms; records follow.
+_START = struct.Struct("!4sQ")
+
+DEFINE = 0
+META = 1
+RESET = 2
+CONNECTED = 3
+DISCONNECTED = 4
+PUBLISHED = 5
+UNPUBLISHED = 6
+SUBSCRIBED = 7
+UNSUBSCRIBED = 8
+MUTED = 9
+UNMUTED = 10
+SPEAKERS = 11
+PTT_PRESS = 12
+PTT_ON_AIR = 13
+PTT_RELEASE = 14
+FLOOR = 15
+
+# Arguments per record code: "s" a string, "i" an integer, "*" any number of
+# strings. DEFINE carries the text of the next string number instead.
+LAYOUTS = {
+    META: "ss",
+    RESET: "",
+    CONNECTED: "ss",
+    DISCONNECTED: "s",
+    PUBLISHED: "ssi",
+    UNPUBLISHED: "ss",
+    SUBSCRIBED: "ss",
+    UNSUBSCRIBED: "ss",
+    MUTED: "ss",
+    UNMUTED: "ss",
+    SPEAKERS: "*",
+    PTT_PRESS: "",
+    PTT_ON_AIR: "",
+    PTT_RELEASE: "",
+    FLOOR: "s",
+}
+
+
+def _varint(out: bytearray, n: int):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+class RoomJournal:
+    """Opt-in append-only log of room and PTT events, for replay.
+
+    Room callbacks only append a few bytes to a buffer: a varint millisecond
+    delta, the record code and varint arguments. Every sid and identity is
+    written once in a DEFINE record and referenced by number after that.
+    The buffer reaches the file in one write per `JOURNAL_FLUSH_S`, made on
+    a worker thread so the disk never stalls the event loop. The
+    journal opens, and every replacement room after a reconnect starts, with
+    a snapshot of the roster, so a replay begins from the same state.
+    """
+
+    def __init__(self, room: rtc.Room, path: Path | None = None):
+        self._room = room
+        self.path = path or JOURNAL_DIR / f"{int(time.time() * 1000)}.ptj"
+        self._strings: dict[str, int] = {}
+        self._buffer = bytearray()
+        # Handed over by the loop, written by whichever flush runs next, so
+        # the file keeps record order whoever does the writing.
+        self._unwritten = bytearray()
+        self._write_lock = threading.Lock()
+        self._started = time.monotonic()
+        self._last_ms = 0
+        self._file = None
+        self._handlers: list[tuple[str, object]] = []
+        self._tasks: list[asyncio.Task] = []
+        self.events = 0
+        self.bytes = 0
+
+    def attach(self, floor=None):
+        """Opens the file and starts recording; `floor` adds holder changes."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._buffer += _START.pack(JOURNAL_MAGIC, int(time.time() * 1000))
+        identity = self._room.local_participant.identity
+        self.record(META, self._room.name or "", identity)
+        self._bind()
+        self._tasks.append(asyncio.create_task(self._flush_forever()))
+        if floor is not None:
+            self._tasks.append(asyncio.create_task(self._watch_floor(floor)))
+
+    def _bind(self):
+        for event in ROSTER_EVENTS:
+            handler = self._room.on(event, getattr(self, f"_on_{event}"))
+            self._handlers.append((event, handler))
+        for p in self._room.remote_participants.values():
+            self.record(CONNECTED, p.sid, p.identity)
+            for pub in p.track_publications.values():
+                self.record(PUBLISHED, p.sid, pub.sid, pub.source)
+                if pub.muted:
+                    self.record(MUTED, p.sid, pub.sid)
+                if pub.subscribed:
+                    self.record(SUBSCRIBED, p.sid, pub.sid)
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def rebind(self, room: rtc.Room):
+        self._unbind()
+        self._room = room
+        self.record(RESET)
+        self._bind()
+
+    def close(self):
+        self._unbind()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        if self._file is not None:
+            self.flush()
+            with self._write_lock:
+                self._file.close()
+                self._file = None
+
+    def record(self, code: int, *args: str | int):
+        """Appends one record; strings are defined on first use."""
+        layout = LAYOUTS[code]
+        if layout == "*":
+            values = [len(args), *(self._intern(text) for text in args)]
+        else:
+            values = [
+                self._intern(arg) if kind == "s" else arg
+                for kind, arg in zip(layout, args, strict=True)
+            ]
+        now_ms = int((time.monotonic() - self._started) * 1000)
+        out = self._buffer
+        _varint(out, now_ms - self._last_ms)
+        self._last_ms = now_ms
+        out.append(code)
+        for value in values:
+            _varint(out, value)
+        self.events += 1
+
+    def _intern(self, text: str) -> int:
+        index = self._strings.get(text)
+        if index is None:
+            index = self._strings[text] = len(self._strings)
+            data = text.encode()
+            self._buffer += bytes((0, DEFINE))
+            _varint(self._buffer, len(data))
+            self._buffer += data
+        return index
+
+    def _hand_over(self) -> bool:
+        """Queues the buffer for the writer; True if there is anything to write."""
+        with self._write_lock:
+            self._unwritten += self._buffer
+            pending = bool(self._unwritten)
+        self._buffer = bytearray()
+        return pending
+
+    def _write(self):
+        with self._write_lock:
+            data, self._unwritten = bytes(self._unwritten), bytearray()
+            if not data or self._file is None:
+                return
+            try:
+                self._file.write(data)
+                self._file.flush()
+            except OSError as e:
+                logging.warning(f"Journal write failed: {e}")
+                return
+            self.bytes += len(data)
+
+    def flush(self):
+        """Writes everything recorded so far on the calling thread."""
+        if self._file is not None and self._hand_over():
+            self._write()
+
+    async def _flush_forever(self):
+        while True:
+            await asyncio.sleep(JOURNAL_FLUSH_S)
+            if self._hand_over():
+                await asyncio.to_thread(self._write)
+
+    async def _watch_floor(self, floor):
+        async for holder in floor.updates():
+            self.record(FLOOR, holder)
+
+    def stats(self) -> dict[str, float | int | str]:
+        return {
+            "path": str(self.path),
+            "events": self.events,
+            "bytes": self.bytes + len(self._unwritten) + len(self._buffer),
+            "bytes_per_event": round(
+                (self.bytes + len(self._unwritten) + len(self._buffer))
+                / max(1, self.events),
+                1,
+            ),
+        }
+
+    def _on_participant_connected(self, p: rtc.RemoteParticipant):
+        self.record(CONNECTED, p.sid, p.identity)
+
+    def _on_participant_disconnected(self, p: rtc.RemoteParticipant):
+        self.record(DISCONNECTED, p.sid)
+
+    def _on_track_published(
+        self, pub: rtc.RemoteTrackPublication, p: rtc.RemoteParticipant
+    ):
+        self.record(PUBLISHED, p.sid, pub.sid, pub.source)
+
+    def _on_track_unpublished(
+        self, pub: rtc.RemoteTrackPublication, p: rtc.RemoteParticipant
+    ):
+        self.record(UNPUBLISHED, p.sid, pub.sid)
+
+    def _on_track_subscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        self.record(SUBSCRIBED, p.sid, pub.sid)
+
+    def _on_track_unsubscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        self.record(UNSUBSCRIBED, p.sid, pub.sid)
+
+    def _on_track_muted(self, p: rtc.Participant, pub: rtc.TrackPublication):
+        self.record(MUTED, p.sid, pub.sid)
+
+    def _on_track_unmuted(self, p: rtc.Participant, pub: rtc.TrackPublication):
+        self.record(UNMUTED, p.sid, pub.sid)
+
+    def _on_active_speakers_changed(self, speakers: list[rtc.Participant]):
+        self.record(SPEAKERS, *(p.sid for p in speakers))
+
+
+def read_journal(path: Path) -> Iterator[tuple[int, int, tuple]]:
+    """(ms since start, code, args) per record, strings resolved.
+
+    A record cut short by a crash mid-write ends the journal there.
+    """
+    data = Path(path).read_bytes()
+    if len(data) < _START.size or data[:4] != JOURNAL_MAGIC:
+        raise ValueError(f"{path} is not a room journal")
+    pos, at = _START.size, 0
+    strings: list[str] = []
+    try:
+        while pos < len(data):
+            delta, pos = _read_varint(data, pos)
+            code = data[pos]
+            pos += 1
+            at += delta
+            if code == DEFINE:
+                size, pos = _read_varint(data, pos)
+                if pos + size > len(data):
+                    return
+                strings.append(data[pos : pos + size].decode(errors="replace"))
+                pos += size
+                continue
+            layout = LAYOUTS.get(code)
+            if layout is None:
+                raise ValueError(f"Unknown journal record {code} at byte {pos - 1}")
+            if layout == "*":
+                count, pos = _read_varint(data, pos)
+                layout = "s" * count
+            args = []
+            for kind in layout:
+                value, pos = _read_varint(data, pos)
+                args.append(strings[value] if kind == "s" else value)
+            yield at, code, tuple(args)
+    except IndexError:
+        logging.warning(f"Journal {path} ends in a truncated record")
@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import time
+import weakref
+from typing import TYPE_CHECKING, Iterator
+from livekit import rtc
+from app.services.stats import LatencyWindow
+
+if TYPE_CHECKING:
+    from app.services.session import RoomSession
+
+RTC_SAMPLE_INTERVAL_S = 10.0
+RTC_SAMPLE_TIMEOUT_S = 2.0
+LOOP_LAG_INTERVAL_S = 0.25
+QUANTILES = (0.5, 0.95, 0.99)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Counter:
+    """Monotonic value per label set, rendered in Prometheus text format."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: dict[Labels, float] = {}
+        REGISTRY.append(self)
+
+    def inc(self, value: float = 1.0, **labels: str):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0.0) + value
+
+    def samples(self) -> Iterator[tuple[str, Labels, float]]:
+        for labels, value in self.values.items():
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str):
+        self.values[tuple(sorted(labels.items()))] = value
+
+    def clear(self):
+        self.values.clear()
+
+
+class Summary:
+    """Exports an existing LatencyWindow (ms) as a Prometheus summary."""
+
+    kind = "summary"
+
+    def __init__(self, name: str, help: str, windows, label: str = ""):
+        self.name = name
+        self.help = help
+        self._windows = windows
+        self._label = label
+        REGISTRY.append(self)
+
+    def samples(self) -> Iterator[tuple[str, Labels, float]]:
+        windows = self._windows() if callable(self._windows) else self._windows
+        if isinstance(windows, LatencyWindow):
+            windows = {"": windows}
+        for key, window in windows.items():
+            base = ((self._label, key),) if self._label else ()
+            for q in QUANTILES:
+                value = window.percentile(q * 100)
+                yield self.name, (*base, ("quantile", str(q))), value
+            yield f"{self.name}_sum", base, window.total
+            yield f"{self.name}_count", base, window.count
+
+
+REGISTRY: list[Counter | Summary] = []
+
+SESSIONS: "weakref.WeakSet[RoomSession]" = weakref.WeakSet()
+
+CONNECTS = Counter("ptt_connects_total", "Room connect attempts by result.")
+RECONNECTS = Counter("ptt_reconnects_total", "Recovered connection losses.")
+TRANSMISSIONS = Counter(
+    "ptt_transmissions_total", "PTT transmissions started, local or remote."
+)
+ERRORS = Counter("ptt_errors_total", "Log records at ERROR or above, by logger.")
+SESSION_GAUGE = Gauge("ptt_sessions", "Room sessions by connection status.")
+SUBSCRIPTIONS = Gauge("ptt_subscriptions", "Subscribed remote tracks by kind.")
+PARTICIPANTS = Gauge(
+    "ptt_remote_participants", "Remote participants seen by each session."
+)
+LOOP_LAG = LatencyWindow(2400)
+Summary("ptt_event_loop_lag_ms", "asyncio event-loop scheduling lag.", LOOP_LAG)
+RTC_RTT = Gauge("ptt_rtc_rtt_ms", "Current ICE round-trip time per session.")
+RTC_JITTER = Gauge("ptt_rtc_jitter_ms", "Worst inbound RTP jitter per session.")
+RTC_LOST = Gauge("ptt_rtc_packets_lost", "Inbound RTP packets lost per session.")
+RTC_LOSS = Gauge(
+    "ptt_rtc_packet_loss_ratio", "Inbound loss over the last sample per session."
+)
+RTC_BITRATE = Gauge("ptt_rtc_bitrate_kbps", "RTP bitrate per session and direction.")
+RTC_GAUGES = (RTC_RTT, RTC_JITTER, RTC_LOST, RTC_LOSS, RTC_BITRATE)
+RTC_SAMPLE_MS = LatencyWindow()
+Summary("ptt_rtc_sample_ms", "Time to fetch and fold one room's stats.", RTC_SAMPLE_MS)
+
+
+class ErrorCounter(logging.Handler):
+    """Counts error log records; every failure path here ends in logging."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+
+    def emit(self, record: logging.LogRecord):
+        ERRORS.inc(logger=record.name)
+
+
+def session_labels(room: rtc.Room) -> tuple[str, str]:
+    """(room, identity) labels of one session; sessions may share a room."""
+    return room.name or "room", room.local_participant.identity
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + ",".join(pairs) + "}"
+
+
+def render() -> str:
+    """Every registered metric in Prometheus text exposition format 0.0.4."""
+    _collect_sessions()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def _collect_sessions():
+    SESSION_GAUGE.clear()
+    SUBSCRIPTIONS.clear()
+    PARTICIPANTS.clear()
+    kinds = {"audio": 0, "video": 0}
+    live = set()
+    for session in list(SESSIONS):
+        SESSION_GAUGE.inc(status=session.status)
+        if session.room is not None:
+            live.add(session_labels(session.room))
+        if session.roster is None or session.room is None:
+            continue
+        room, identity = session_labels(session.room)
+        PARTICIPANTS.set(len(session.roster.registry), room=room, identity=identity)
+        for record in session.roster.registry:
+            for pub in record.publications.values():
+                if pub.subscribed:
+                    kind = "audio" if pub.kind == rtc.TrackKind.KIND_AUDIO else "video"
+                    kinds[kind] += 1
+    for kind, count in kinds.items():
+        SUBSCRIPTIONS.set(count, kind=kind)
+    # Closed sessions keep no label sets behind.
+    for gauge in RTC_GAUGES:
+        for key in list(gauge.values):
+            labels = dict(key)
+            if (labels.get("room"), labels.get("identity")) not in live:
+                del gauge.values[key]
+
+
+class MetricsSampler:
+    """Measures loop lag and polls every room's WebRTC stats in the background.
+
+    Rooms are sampled one at a time with the loop yielded in between, and a
+    room whose PTT lane is busy is skipped until the next round, so a scrape
+    never sits in front of a press.
+    """
+
+    def __init__(self, interval: float = RTC_SAMPLE_INTERVAL_S):
+        self.interval = interval
+        self._tasks: list[asyncio.Task] = []
+        self._previous: dict[tuple[str, str], tuple[float, int, int, int, int]] = {}
+        # Per session: the last inbound video totals, and the rates between
+        # the last two samples, by track sid.
+        self._video_totals: dict[tuple[str, str], tuple[float, dict]] = {}
+        self.video: dict[tuple[str, str], dict[str, dict[str, float]]] = {}
+        self._errors = ErrorCounter()
+        self.skipped = 0
+
+    def start(self):
+        if self._tasks:
+            return
+        logging.getLogger().addHandler(self._errors)
+        self._tasks = [
+            asyncio.create_task(self._watch_loop()),
+            asyncio.create_task(self._sample_forever()),
+        ]
+
+    def stop(self):
+        logging.getLogger().removeHandler(self._errors)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def _watch_loop(self):
+        while True:
+            expected = time.perf_counter() + LOOP_LAG_INTERVAL_S
+            await asyncio.sleep(LOOP_LAG_INTERVAL_S)
+            LOOP_LAG.record(max(0.0, time.perf_counter() - expected) * 1000)
+
+    async def _sample_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.sample_all()
+
+    async def sample_all(self):
+        live = {session_labels(s.room) for s in list(SESSIONS) if s.room is not None}
+        for key in list(self._previous):
+            if key not in live:
+                del self._previous[key]
+        for key in list(self._video_totals):
+            if key not in live:
+                del self._video_totals[key]
+                self.video.pop(key, None)
+        for session in list(SESSIONS):
+            room = session.room
+            if room is None or session.status != "connected":
+                continue
+            if session.ptt.busy:
+                self.skipped += 1
+                continue
+            try:
+                await self.sample(room)
+            except Exception as e:
+                logging.warning(f"RTC stats for {session.room_name} failed: {e}")
+            await asyncio.sleep(0)
+
+    async def sample(self, room: rtc.Room):
+        started = time.perf_counter()
+        stats = await asyncio.wait_for(room.get_rtc_stats(), RTC_SAMPLE_TIMEOUT_S)
+        name, identity = labels = session_labels(room)
+        rtt = jitter = 0.0
+        received = lost = recv_bytes = sent_bytes = 0
+        video: dict[str, tuple[int, int, float, int]] = {}
+        for i, stat in enumerate((*stats.publisher_stats, *stats.subscriber_stats)):
+            if i and i % 200 == 0:
+                await asyncio.sleep(0)
+            which = stat.WhichOneof("stats")
+            if which == "candidate_pair":
+                pair = stat.candidate_pair.candidate_pair
+                if pair.nominated:
+                    rtt = max(rtt, pair.current_round_trip_time * 1000)
+            elif which == "inbound_rtp":
+                rtp = stat.inbound_rtp
+                jitter = max(jitter, rtp.received.jitter * 1000)
+                received += rtp.received.packets_received
+                lost += max(0, rtp.received.packets_lost)
+                recv_bytes += rtp.inbound.bytes_received
+                if rtp.stream.kind == "video":
+                    inbound = rtp.inbound
+                    # WebRTC track ids of LiveKit subscriptions are track sids.
+                    video[inbound.track_identifier] = (
+                        inbound.bytes_received,
+                        inbound.frames_decoded,
+                        inbound.total_decode_time,
+                        inbound.frame_width * inbound.frame_height,
+                    )
+            elif which == "outbound_rtp":
+                sent_bytes += stat.outbound_rtp.sent.bytes_sent
+        RTC_RTT.set(round(rtt, 1), room=name, identity=identity)
+        RTC_JITTER.set(round(jitter, 1), room=name, identity=identity)
+        RTC_LOST.set(lost, room=name, identity=identity)
+        now = time.monotonic()
+        self._fold_video(labels, now, video)
+        previous = self._previous.get(labels)
+        self._previous[labels] = (now, received, lost, recv_bytes, sent_bytes)
+        if previous is not None:
+            seconds = max(1e-3, now - previous[0])
+            got = received - previous[1] + lost - previous[2]
+            RTC_LOSS.set(
+                round((lost - previous[2]) / got, 4) if got > 0 else 0.0,
+                room=name,
+                identity=identity,
+            )
+            for direction, total, before in (
+                ("in", recv_bytes, previous[3]),
+                ("out", sent_bytes, previous[4]),
+            ):
+                kbps = max(0, total - before) * 8 / seconds / 1000
+                RTC_BITRATE.set(
+                    round(kbps, 1), room=name, identity=identity, direction=direction
+                )
+        RTC_SAMPLE_MS.record((time.perf_counter() - started) * 1000)
+
+    def _fold_video(self, labels: tuple[str, str], now: float, totals: dict):
+        previous = self._video_totals.get(labels)
+        self._video_totals[labels] = (now, totals)
+        if previous is None:
+            return
+        seconds = max(1e-3, now - previous[0])
+        rates = {}
+        for track, (got, frames, decode_s, pixels) in totals.items():
+            before = previous[1].get(track)
+            if before is None:
+                continue
+            rates[track] = {
+                "kbps": max(0, got - before[0]) * 8 / seconds / 1000,
+                "fps": max(0, frames - before[1]) / seconds,
+                "pixels": pixels,
+                "decode_ms": max(0.0, decode_s - before[2]) * 1000 / seconds,
+            }
+        self.video[labels] = rates
+
+    def inbound_video(self, room: rtc.Room) -> dict[str, dict[str, float]]:
+        """Measured kbps, decoded fps, frame pixels and decode ms/s per camera sid."""
+        return self.video.get(session_labels(room), {})
+
+
+SAMPLER = MetricsSampler()
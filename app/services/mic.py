@@ -0,0 +1,181 @@
+import asyncio
+import time
+from typing import Callable
+import numpy as np
+from livekit import rtc
+from app.services.devices import MicDevice, mic_device
+
+SAMPLE_RATE = 48000
+NUM_CHANNELS = 1
+FRAME_SAMPLES = SAMPLE_RATE // 100
+DEFAULT_PREROLL_MS = 300
+
+
+class PcmRingBuffer:
+    """Fixed-size int16 ring that keeps only the most recent samples."""
+
+    def __init__(self, capacity: int):
+        self._buf = np.zeros(capacity, dtype=np.int16)
+        self._write = 0
+        self._size = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._buf.nbytes
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, pcm: np.ndarray):
+        capacity = self._buf.size
+        n = pcm.size
+        if n >= capacity:
+            self._buf[:] = pcm[-capacity:]
+            self._write = 0
+            self._size = capacity
+            return
+        end = self._write + n
+        if end <= capacity:
+            self._buf[self._write : end] = pcm
+        else:
+            split = capacity - self._write
+            self._buf[self._write :] = pcm[:split]
+            self._buf[: n - split] = pcm[split:]
+        self._write = end % capacity
+        self._size = min(capacity, self._size + n)
+
+    def drain(self) -> np.ndarray:
+        """Returns the buffered samples oldest first and empties the ring."""
+        capacity = self._buf.size
+        start = (self._write - self._size) % capacity
+        if start + self._size <= capacity:
+            out = self._buf[start : start + self._size].copy()
+        else:
+            out = np.concatenate((self._buf[start:], self._buf[: self._write]))
+        self._size = 0
+        return out
+
+
+class MicPipeline:
+    """Feeds microphone PCM into the published `mic_main` track in 10 ms frames.
+
+    PCM arrives either from the default input device (`open_device`) or from
+    any other producer through `feed`, and is sent from a single task so the
+    PTT path can observe exactly when frames reach the track.
+
+    An `analyzer`, when set, sees every captured block first and returns the
+    PCM to send in its place (VOX detection and noise gating).
+
+    With `preroll_ms` set, nothing is sent while idle: the last `preroll_ms`
+    of audio is kept in a ring buffer instead and goes out first when a
+    transmission begins, so speech during the unmute round trip survives.
+    """
+
+    def __init__(
+        self, name: str = "mic_main", queue_frames: int = 50, preroll_ms: int = 0
+    ):
+        self.source = rtc.AudioSource(SAMPLE_RATE, NUM_CHANNELS)
+        self.track = rtc.LocalAudioTrack.create_audio_track(name, self.source)
+        self._queue: asyncio.Queue[np.ndarray] = asyncio.Queue(maxsize=queue_frames)
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._frame_waiters: list[asyncio.Future[float]] = []
+        self._task: asyncio.Task | None = None
+        self._device: MicDevice | None = None
+        self._preroll = (
+            PcmRingBuffer(SAMPLE_RATE * preroll_ms // 1000) if preroll_ms > 0 else None
+        )
+        self._transmitting = False
+        self.tap: Callable[[np.ndarray], None] | None = None
+        self.analyzer: Callable[[np.ndarray], np.ndarray] | None = None
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+    @property
+    def preroll_bytes(self) -> int:
+        return self._preroll.nbytes if self._preroll is not None else 0
+
+    async def open_device(self):
+        """Routes the default input device, opened once per process, into `feed`."""
+        self._device = await asyncio.to_thread(
+            mic_device, SAMPLE_RATE, NUM_CHANNELS, FRAME_SAMPLES
+        )
+        if self._device is not None:
+            self._device.attach(self.feed)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def feed(self, pcm: np.ndarray):
+        """Queues int16 PCM for sending; drops it if the sender is behind."""
+        try:
+            self._queue.put_nowait(pcm)
+        except asyncio.QueueFull:
+            self.frames_dropped += 1
+
+    def begin_transmission(self):
+        """Marks the start of a PTT transmission and queues the pre-roll audio."""
+        self._transmitting = True
+        if self._preroll is None:
+            return
+        while not self._queue.empty():
+            self._preroll.write(self._queue.get_nowait())
+        if len(self._preroll):
+            self._queue.put_nowait(self._preroll.drain())
+
+    def end_transmission(self):
+        self._transmitting = False
+
+    def next_frame(self) -> asyncio.Future[float]:
+        """Resolves with the perf_counter time the next frame reaches the track."""
+        waiter = asyncio.get_running_loop().create_future()
+        self._frame_waiters.append(waiter)
+        return waiter
+
+    async def _run(self):
+        while True:
+            await self.push(await self._queue.get())
+
+    async def push(self, pcm: np.ndarray):
+        if self.analyzer is not None:
+            pcm = self.analyzer(pcm)
+        if self._preroll is not None and not self._transmitting:
+            self._preroll.write(pcm)
+            return
+        if self._pending.size:
+            pcm = np.concatenate((self._pending, pcm))
+        whole = pcm.size - pcm.size % FRAME_SAMPLES
+        self._pending = pcm[whole:]
+        for start in range(0, whole, FRAME_SAMPLES):
+            await self._capture(pcm[start : start + FRAME_SAMPLES])
+
+    async def _capture(self, samples: np.ndarray):
+        frame = rtc.AudioFrame(
+            samples.tobytes(), SAMPLE_RATE, NUM_CHANNELS, FRAME_SAMPLES
+        )
+        await self.source.capture_frame(frame)
+        self.frames_sent += 1
+        if self.tap is not None:
+            self.tap(samples)
+        if self._frame_waiters:
+            sent = time.perf_counter()
+            for waiter in self._frame_waiters:
+                if not waiter.done():
+                    waiter.set_result(sent)
+            self._frame_waiters.clear()
+
+    async def aclose(self):
+        if self._device is not None:
+            self._device.detach(self.feed)
+            self._device = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for waiter in self._frame_waiters:
+            waiter.cancel()
+        self._frame_waiters.clear()
+        await self.source.aclose()
@@ -0,0 +1,369 @@
+import asyncio
+import collections
+import logging
+import secrets
+import time
+import numpy as np
+from livekit import rtc
+from app.services.stats import LatencyWindow
+
+MIX_SAMPLE_RATE = 16000
+MIX_FRAME_MS = 20
+MIX_FRAME_SAMPLES = MIX_SAMPLE_RATE * MIX_FRAME_MS // 1000
+JITTER_TARGET_MS = 40
+JITTER_MAX_MS = 200
+LIMITER_RELEASE = 0.05
+
+MIXED_SOURCES = (
+    rtc.TrackSource.SOURCE_MICROPHONE,
+    rtc.TrackSource.SOURCE_SCREENSHARE_AUDIO,
+)
+
+MIX_PLAYER_SCRIPT = """
+window.mixPlayer = window.mixPlayer || {
+  start(url) {
+    this.stop();
+    const table = new Float32Array(256);
+    for (let i = 0; i < 256; i++) {
+      const u = ~i & 0xff;
+      const t = (((u & 0x0f) << 3) + 0x84) << ((u & 0x70) >> 4);
+      table[i] = ((u & 0x80) ? 0x84 - t : t - 0x84) / 32768;
+    }
+    const ctx = new AudioContext({sampleRate: %(rate)d});
+    const ws = new WebSocket(url.replace(/^http/, 'ws'));
+    ws.binaryType = 'arraybuffer';
+    let next = 0, underruns = 0;
+    ws.onmessage = (event) => {
+      const bytes = new Uint8Array(event.data);
+      const buffer = ctx.createBuffer(1, bytes.length, %(rate)d);
+      const samples = buffer.getChannelData(0);
+      for (let i = 0; i < bytes.length; i++) samples[i] = table[bytes[i]];
+      if (next < ctx.currentTime) {
+        if (next) underruns++;
+        next = ctx.currentTime + %(target)d / 1000;
+      }
+      const source = ctx.createBufferSource();
+      source.buffer = buffer;
+      source.connect(ctx.destination);
+      source.start(next);
+      next += buffer.duration;
+    };
+    const report = setInterval(() => {
+      if (ws.readyState !== 1) return;
+      const buffered = Math.max(0, next - ctx.currentTime) * 1000;
+      const output = (ctx.outputLatency || ctx.baseLatency || 0) * 1000;
+      ws.send(JSON.stringify({buffered_ms: buffered, output_ms: output, underruns}));
+    }, 1000);
+    this.session = {ctx, ws, report};
+  },
+  stop() {
+    if (!this.session) return;
+    clearInterval(this.session.report);
+    this.session.ws.close();
+    this.session.ctx.close();
+    this.session = null;
+  },
+};
+""" % {
+    "rate": MIX_SAMPLE_RATE,
+    "target": JITTER_TARGET_MS,
+}
+
+
+def mulaw_encode(pcm: np.ndarray) -> bytes:
+    """G.711 mu-law, vectorized; halves int16 PCM with telephone-grade loss."""
+    x = pcm.astype(np.int32) >> 2
+    mask = np.where(x < 0, 0x7F, 0xFF)
+    x = np.minimum(np.abs(x), 8159) + 33
+    segment = np.floor(np.log2(x)).astype(np.int32) - 5
+    mantissa = (x >> (segment + 1)) & 0x0F
+    code = np.where(segment > 7, 0x7F, (segment << 4) | mantissa)
+    return (code ^ mask).astype(np.uint8).tobytes()
+
+
+class JitterBuffer:
+    """Per-talker PCM queue that absorbs arrival jitter before mixing.
+
+    Reads wait until `target` samples are buffered, again after every
+    underrun; anything past `limit` samples is dropped from the front so a
+    burst cannot build up latency.
+    """
+
+    def __init__(self, target: int, limit: int):
+        self.target = target
+        self.limit = limit
+        self._chunks: collections.deque[tuple[np.ndarray, float]] = collections.deque()
+        self._size = 0
+        self._offset = 0
+        self._primed = False
+        self.underruns = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def push(self, pcm: np.ndarray, arrived: float):
+        self._chunks.append((pcm, arrived))
+        self._size += pcm.size
+        while self._size > self.limit:
+            chunk, _ = self._chunks.popleft()
+            self._size -= chunk.size - self._offset
+            self.dropped += chunk.size - self._offset
+            self._offset = 0
+
+    def pop(self, n: int) -> tuple[np.ndarray | None, float | None]:
+        """n samples and the arrival time of the oldest one, or (None, None)."""
+        if not self._primed:
+            if self._size < self.target:
+                return None, None
+            self._primed = True
+        if self._size < n:
+            self._primed = False
+            self.underruns += 1
+            return None, None
+        out = np.empty(n, dtype=np.int16)
+        arrived = self._chunks[0][1]
+        filled = 0
+        while filled < n:
+            chunk, _ = self._chunks[0]
+            take = min(n - filled, chunk.size - self._offset)
+            out[filled : filled + take] = chunk[self._offset : self._offset + take]
+            filled += take
+            self._offset += take
+            if self._offset == chunk.size:
+                self._chunks.popleft()
+                self._offset = 0
+        self._size -= n
+        return out, arrived
+
+
+class MixerInput:
+    """One subscribed remote audio track feeding the mixer."""
+
+    def __init__(self, track: rtc.Track, identity: str):
+        self.identity = identity
+        self.buffer = JitterBuffer(
+            MIX_SAMPLE_RATE * JITTER_TARGET_MS // 1000,
+            MIX_SAMPLE_RATE * JITTER_MAX_MS // 1000,
+        )
+        self._stream = rtc.AudioStream(
+            track,
+            sample_rate=MIX_SAMPLE_RATE,
+            num_channels=1,
+            frame_size_ms=MIX_FRAME_MS,
+        )
+        self._task = asyncio.create_task(self._read())
+
+    async def _read(self):
+        async for event in self._stream:
+            pcm = np.frombuffer(event.frame.data, dtype=np.int16)
+            self.buffer.push(pcm, time.perf_counter())
+
+    async def aclose(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        await self._stream.aclose()
+
+
+def mix(
+    frames: np.ndarray, gains: np.ndarray, limiter: float
+) -> tuple[np.ndarray, float]:
+    """Sums (talkers, samples) int16 frames with per-talker gain and a peak limiter.
+
+    Returns the int16 mix and the limiter gain to carry into the next frame:
+    it drops instantly to keep the peak in range and recovers slowly, so
+    overlapping talkers get quieter instead of clipping.
+    """
+    mixed = gains @ frames.astype(np.float32)
+    peak = float(np.abs(mixed).max()) if mixed.size else 0.0
+    if peak * limiter > 32767:
+        limiter = 32767 / peak
+    mixed *= limiter
+    limiter = min(1.0, limiter + LIMITER_RELEASE)
+    return np.clip(mixed, -32768, 32767).astype(np.int16), limiter
+
+
+MIXERS: dict[str, "AudioMixer"] = {}
+
+
+class AudioMixer:
+    """Mixes every subscribed remote audio track into one mu-law stream.
+
+    Each track is read at 16 kHz into its own jitter buffer; every 20 ms the
+    buffered talkers are mixed with NumPy and the mu-law frame is handed to
+    each listener. Listeners that fall behind lose their oldest frames.
+    Tracks are only decoded and mixed while someone is listening; until
+    then the mixer just remembers which ones are subscribed.
+    """
+
+    def __init__(self, room: rtc.Room):
+        self.id = secrets.token_urlsafe(8)
+        self._room = room
+        self.tracks: dict[str, tuple[rtc.Track, str]] = {}
+        self.inputs: dict[str, MixerInput] = {}
+        self.gains: dict[str, float] = {}
+        self._listeners: set[asyncio.Queue[bytes]] = set()
+        self._handlers: list[tuple[str, object]] = []
+        self._task: asyncio.Task | None = None
+        self._limiter = 1.0
+        self.mix_us = LatencyWindow(512)
+        self.latency_ms = LatencyWindow(512)
+        self.client: dict[str, float] = {}
+        self.frames = 0
+        self.listener_drops = 0
+
+    def attach(self):
+        for event, handler in (
+            ("track_subscribed", self._on_track_subscribed),
+            ("track_unsubscribed", self._on_track_unsubscribed),
+        ):
+            self._handlers.append((event, self._room.on(event, handler)))
+        for p in self._room.remote_participants.values():
+            for pub in p.track_publications.values():
+                if pub.track is not None and pub.subscribed:
+                    self._on_track_subscribed(pub.track, pub, p)
+        MIXERS[self.id] = self
+
+    def _on_track_subscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        if pub.source in MIXED_SOURCES and pub.sid not in self.tracks:
+            self.tracks[pub.sid] = (track, p.identity)
+            if self._listeners:
+                self._open(pub.sid)
+
+    def _on_track_unsubscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        self.tracks.pop(pub.sid, None)
+        self._drop(pub.sid)
+
+    def _open(self, sid: str):
+        if sid not in self.inputs:
+            self.inputs[sid] = MixerInput(*self.tracks[sid])
+
+    def _drop(self, sid: str):
+        source = self.inputs.pop(sid, None)
+        if source is not None:
+            asyncio.create_task(source.aclose())
+
+    def rebind(self, room: rtc.Room):
+        """Follows a replacement room; listeners stay connected."""
+        self._unbind()
+        self.tracks.clear()
+        for sid in list(self.inputs):
+            self._drop(sid)
+        self._room = room
+        self.attach()
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def set_gain(self, identity: str, gain: float):
+        self.gains[identity] = max(0.0, min(gain, 4.0))
+
+    def listen(self, depth: int = 10) -> asyncio.Queue[bytes]:
+        queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=depth)
+        self._listeners.add(queue)
+        if self._task is None:
+            for sid in self.tracks:
+                self._open(sid)
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unlisten(self, queue: asyncio.Queue[bytes]):
+        self._listeners.discard(queue)
+        if not self._listeners and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            for sid in list(self.inputs):
+                self._drop(sid)
+
+    def report(self, client: dict[str, float]):
+        """Playout numbers sent back by the browser player."""
+        self.client = client
+
+    async def _run(self):
+        frame_s = MIX_FRAME_MS / 1000
+        next_tick = time.perf_counter()
+        while True:
+            next_tick += frame_s
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -frame_s * 5:
+                next_tick = time.perf_counter()
+            try:
+                self._tick()
+            except Exception as e:
+                logging.exception(f"Audio mix failed: {e}")
+
+    def _tick(self):
+        started = time.perf_counter()
+        frames, gains, oldest = [], [], started
+        for source in self.inputs.values():
+            pcm, arrived = source.buffer.pop(MIX_FRAME_SAMPLES)
+            if pcm is None:
+                continue
+            frames.append(pcm)
+            gains.append(self.gains.get(source.identity, 1.0))
+            oldest = min(oldest, arrived)
+        if frames:
+            mixed, self._limiter = mix(
+                np.stack(frames), np.asarray(gains, dtype=np.float32), self._limiter
+            )
+        else:
+            mixed = np.zeros(MIX_FRAME_SAMPLES, dtype=np.int16)
+        payload = mulaw_encode(mixed)
+        for queue in self._listeners:
+            if queue.full():
+                queue.get_nowait()
+                self.listener_drops += 1
+            queue.put_nowait(payload)
+        done = time.perf_counter()
+        self.frames += 1
+        self.mix_us.record((done - started) * 1e6)
+        if frames:
+            self.latency_ms.record((done - oldest) * 1000)
+
+    def stats(self) -> dict:
+        server = self.latency_ms.summary()
+        client_ms = self.client.get("buffered_ms", 0.0) + self.client.get(
+            "output_ms", 0.0
+        )
+        return {
+            "talkers": len(self.tracks),
+            "listeners": len(self._listeners),
+            "frames": self.frames,
+            "mix_us": self.mix_us.summary(),
+            "server_latency_ms": server,
+            "end_to_end_ms": round(server["p50"] + client_ms, 1),
+            "jitter_underruns": sum(s.buffer.underruns for s in self.inputs.values()),
+            "jitter_dropped": sum(s.buffer.dropped for s in self.inputs.values()),
+            "client_underruns": self.client.get("underruns", 0),
+            "listener_drops": self.listener_drops,
+        }
+
+    def close(self):
+        """Stops mixing; listeners get an empty frame telling them to hang up."""
+        self._unbind()
+        MIXERS.pop(self.id, None)
+        for queue in self._listeners:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(b"")
+        self._listeners.clear()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.tracks.clear()
+        for sid in list(self.inputs):
+            self._drop(sid)
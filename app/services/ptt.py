@@ -0,0 +1,110 @@
+import asyncio
+import time
+from livekit import rtc
+from app.services.metrics import Summary
+from app.services.stats import LatencyWindow
+
+PTT_STAGES = ("floor_granted", "lock_acquired", "unmuted", "first_frame")
+
+
+class PttTrace:
+    """perf_counter timestamps of one PTT press, from event to first frame."""
+
+    __slots__ = (
+        "received",
+        "floor_granted",
+        "lock_acquired",
+        "unmuted",
+        "first_frame",
+        "frame_waiter",
+    )
+
+    def __init__(self):
+        self.received = time.perf_counter()
+        self.floor_granted: float | None = None
+        self.lock_acquired: float | None = None
+        self.unmuted: float | None = None
+        self.first_frame: float | None = None
+        self.frame_waiter: asyncio.Future[float] | None = None
+
+
+class PttLatency:
+    """Per-stage press latency, measured from the moment the event arrived."""
+
+    def __init__(self, size: int = 1024):
+        self.stages = {stage: LatencyWindow(size) for stage in PTT_STAGES}
+
+    def record(self, trace: PttTrace):
+        for stage in PTT_STAGES:
+            stamp = getattr(trace, stage)
+            if stamp is not None:
+                self.stages[stage].record((stamp - trace.received) * 1000)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        return {stage: window.summary() for stage, window in self.stages.items()}
+
+
+GLOBAL_PTT_LATENCY = PttLatency(size=8192)
+Summary(
+    "ptt_press_latency_ms",
+    "PTT press latency per stage, from the press event.",
+    GLOBAL_PTT_LATENCY.stages,
+    label="stage",
+)
+
+
+class PttLane:
+    """Applies PTT press/release on its own lock, apart from the Reflex state.
+
+    Only the latest request matters: a press that is overtaken by a release
+    while it waits for the lane is dropped instead of briefly opening the mic.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._desired = False
+        self.transmitting = False
+        self.queue_delay = LatencyWindow()
+        self.latency = PttLatency()
+
+    @property
+    def busy(self) -> bool:
+        """True while a press or release is being applied."""
+        return self._lock.locked()
+
+    async def set_talking(
+        self,
+        track: rtc.LocalTrack,
+        talking: bool,
+        trace: PttTrace | None = None,
+    ) -> bool:
+        if trace is None:
+            requested = time.perf_counter()
+        else:
+            requested = trace.floor_granted or trace.received
+        self._desired = talking
+        async with self._lock:
+            acquired = time.perf_counter()
+            self.queue_delay.record((acquired - requested) * 1000)
+            if trace:
+                trace.lock_acquired = acquired
+            if self._desired != talking or self.transmitting == talking:
+                return self.transmitting
+            if talking:
+                track.unmute()
+            else:
+                track.mute()
+            if trace:
+                trace.unmuted = time.perf_counter()
+            self.transmitting = talking
+            return talking
+
+    async def finish_trace(self, trace: PttTrace, timeout: float = 1.0):
+        """Waits for the first mic frame after unmute and records the press."""
+        if trace.frame_waiter is not None and trace.unmuted is not None:
+            try:
+                trace.first_frame = await asyncio.wait_for(trace.frame_waiter, timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.latency.record(trace)
+        GLOBAL_PTT_LATENCY.record(trace)
@@ -0,0 +1,109 @@
+from livekit import rtc
+
+TRACK_SOURCES: dict[str, rtc.TrackSource.ValueType] = {
+    "audio": rtc.TrackSource.SOURCE_MICROPHONE,
+    "video": rtc.TrackSource.SOURCE_CAMERA,
+    "screen": rtc.TrackSource.SOURCE_SCREENSHARE,
+    "screen_audio": rtc.TrackSource.SOURCE_SCREENSHARE_AUDIO,
+}
+
+
+class ParticipantRecord:
+    """Registry entry for one remote participant and its publications."""
+
+    __slots__ = ("sid", "identity", "sources", "publications")
+
+    def __init__(self, sid: str, identity: str):
+        self.sid = sid
+        self.identity = identity
+        self.sources: dict[int, rtc.RemoteTrackPublication] = {}
+        self.publications: dict[str, rtc.RemoteTrackPublication] = {}
+
+    def publication(
+        self, source: rtc.TrackSource.ValueType
+    ) -> rtc.RemoteTrackPublication | None:
+        return self.sources.get(source)
+
+    def row(self) -> dict[str, str | bool]:
+        audio = self.sources.get(rtc.TrackSource.SOURCE_MICROPHONE)
+        video = self.sources.get(rtc.TrackSource.SOURCE_CAMERA)
+        screen = self.sources.get(rtc.TrackSource.SOURCE_SCREENSHARE)
+        return {
+            "sid": self.sid,
+            "identity": self.identity,
+            "has_audio": audio is not None,
+            "audio_subscribed": audio is not None and audio.subscribed,
+            "has_video": video is not None,
+            "video_subscribed": video is not None and video.subscribed,
+            "video_track": video.sid if video is not None else "",
+            "has_screen": screen is not None,
+            "screen_subscribed": screen is not None and screen.subscribed,
+        }
+
+
+class TrackRegistry:
+    """Participant sid -> track source -> publication index for a room."""
+
+    def __init__(self):
+        self._records: dict[str, ParticipantRecord] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def get(self, sid: str) -> ParticipantRecord | None:
+        return self._records.get(sid)
+
+    def publication(
+        self, sid: str, source: rtc.TrackSource.ValueType
+    ) -> rtc.RemoteTrackPublication | None:
+        record = self._records.get(sid)
+        return record.sources.get(source) if record else None
+
+    def load(self, room: rtc.Room):
+        self._records.clear()
+        for p in room.remote_participants.values():
+            self.add_participant(p)
+
+    def add_participant(self, p: rtc.RemoteParticipant) -> ParticipantRecord:
+        record = self._records.get(p.sid)
+        if record is None:
+            record = ParticipantRecord(p.sid, p.identity or "Unknown")
+            self._records[p.sid] = record
+        for pub in p.track_publications.values():
+            self._index(record, pub)
+        return record
+
+    def remove_participant(self, sid: str) -> ParticipantRecord | None:
+        return self._records.pop(sid, None)
+
+    def add_publication(
+        self, p: rtc.RemoteParticipant, pub: rtc.RemoteTrackPublication
+    ) -> ParticipantRecord:
+        record = self._records.get(p.sid)
+        if record is None:
+            return self.add_participant(p)
+        self._index(record, pub)
+        return record
+
+    def remove_publication(
+        self, p: rtc.RemoteParticipant, pub: rtc.RemoteTrackPublication
+    ) -> ParticipantRecord | None:
+        record = self._records.get(p.sid)
+        if record is None:
+            return None
+        record.publications.pop(pub.sid, None)
+        if record.sources.get(pub.source) is pub:
+            del record.sources[pub.source]
+            for other in record.publications.values():
+                if other.source == pub.source:
+                    record.sources[pub.source] = other
+                    break
+        return record
+
+    @staticmethod
+    def _index(record: ParticipantRecord, pub: rtc.RemoteTrackPublication):
+        record.publications[pub.sid] = pub
+        record.sources.setdefault(pub.source, pub)
@@ -0,0 +1,260 @@
+import asyncio
+import json
+import time
+from livekit import rtc
+from app.services.directory import RosterDirectory
+from app.services.registry import ParticipantRecord, TrackRegistry
+from app.services.stats import LatencyWindow
+from app.services.telemetry import NO_STATUS, UnitStatus
+
+ROSTER_EVENTS = (
+    "participant_connected",
+    "participant_disconnected",
+    "track_published",
+    "track_unpublished",
+    "track_subscribed",
+    "track_unsubscribed",
+    "track_muted",
+    "track_unmuted",
+    "active_speakers_changed",
+)
+
+RosterPatch = dict[str, dict[str, str | bool] | None]
+
+
+def patch_size(patch: RosterPatch) -> int:
+    """Serialized size in bytes of a roster patch or row list."""
+    return len(json.dumps(patch, separators=(",", ":")))
+
+
+def apply_patch(
+    rows: list[dict[str, str | bool]], index: dict[str, int], patch: RosterPatch
+):
+    """Applies a sid-keyed patch to a roster list, keeping `index` in sync."""
+    removed = False
+    for sid, row in patch.items():
+        pos = index.get(sid)
+        if row is None:
+            if pos is not None:
+                del index[sid]
+                removed = True
+        elif pos is None:
+            index[sid] = len(rows)
+            rows.append(row)
+        else:
+            rows[pos] = row
+    if removed:
+        rows[:] = [row for row in rows if row["sid"] in index]
+        index.clear()
+        index.update((row["sid"], i) for i, row in enumerate(rows))
+
+
+class RosterTracker:
+    """Keeps the remote participant roster in sync with room events.
+
+    Room callbacks update the track registry for the affected participant and
+    mark it dirty; consumers iterate `updates()` and get coalesced patches
+    holding only the rows that actually changed. Every yielded patch is also
+    applied to `directory` for paged, sorted and searched views. Unit
+    telemetry passed to `set_status` and thumbnail ETags passed to
+    `set_thumbnail` are folded into the same rows.
+    """
+
+    def __init__(self, room: rtc.Room):
+        self._room = room
+        self.registry = TrackRegistry()
+        self._rows: dict[str, dict[str, str | bool]] = {}
+        self._index: dict[str, int] = {}
+        self.rows: list[dict[str, str | bool]] = []
+        self.directory = RosterDirectory()
+        self._speaking: set[str] = set()
+        self._status: dict[str, dict[str, str | bool]] = {}
+        self._thumbs: dict[str, str] = {}
+        self._dirty: set[str] = set()
+        self._changed = asyncio.Event()
+        self._closed = False
+        self._pending_since: float | None = None
+        self._inflight_since: float | None = None
+        self._handlers: list[tuple[str, object]] = []
+        self.latency = LatencyWindow()
+
+    def attach(self):
+        self.rebuild()
+        self._bind()
+
+    def _bind(self):
+        for event in ROSTER_EVENTS:
+            handler = self._room.on(event, getattr(self, f"_on_{event}"))
+            self._handlers.append((event, handler))
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def rebind(self, room: rtc.Room):
+        """Follows a replacement room after a reconnect, diffing against the old roster."""
+        self._unbind()
+        self._room = room
+        self.registry.load(room)
+        self._status.clear()
+        self._thumbs.clear()
+        for sid in [*self._rows, *(record.sid for record in self.registry)]:
+            self._mark(sid)
+        self._bind()
+
+    def close(self):
+        self._closed = True
+        self._unbind()
+        self._changed.set()
+
+    def _mark(self, sid: str):
+        self._dirty.add(sid)
+        if self._pending_since is None:
+            self._pending_since = time.perf_counter()
+        self._changed.set()
+
+    def _on_participant_connected(self, p: rtc.RemoteParticipant):
+        self.registry.add_participant(p)
+        self._mark(p.sid)
+
+    def _on_participant_disconnected(self, p: rtc.RemoteParticipant):
+        self.registry.remove_participant(p.sid)
+        self._status.pop(p.sid, None)
+        self._thumbs.pop(p.sid, None)
+        self._mark(p.sid)
+
+    def _on_track_published(
+        self, pub: rtc.RemoteTrackPublication, p: rtc.RemoteParticipant
+    ):
+        self.registry.add_publication(p, pub)
+        self._mark(p.sid)
+
+    def _on_track_unpublished(
+        self, pub: rtc.RemoteTrackPublication, p: rtc.RemoteParticipant
+    ):
+        self.registry.remove_publication(p, pub)
+        self._mark(p.sid)
+
+    def _on_track_subscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        self._mark(p.sid)
+
+    _on_track_unsubscribed = _on_track_subscribed
+
+    def _on_track_muted(self, p: rtc.Participant, pub: rtc.TrackPublication):
+        self._mark(p.sid)
+
+    _on_track_unmuted = _on_track_muted
+
+    def _on_active_speakers_changed(self, speakers: list[rtc.Participant]):
+        speaking = {p.sid for p in speakers}
+        for sid in speaking ^ self._speaking:
+            self._mark(sid)
+        self._speaking = speaking
+
+    def set_status(self, sid: str, status: UnitStatus):
+        """Telemetry callback; marks the row only when a shown value changed."""
+        row = status.row()
+        if self._status.get(sid) != row:
+            self._status[sid] = row
+            self._mark(sid)
+
+    def set_thumbnail(self, sid: str, etag: str):
+        """Thumbnail callback; a new ETag changes the row's image URL."""
+        if self._thumbs.get(sid) != etag:
+            self._thumbs[sid] = etag
+            self._mark(sid)
+
+    def _row(self, record: ParticipantRecord) -> dict[str, str | bool]:
+        return {
+            **record.row(),
+            "speaking": record.sid in self._speaking,
+            **self._status.get(record.sid, NO_STATUS),
+            "thumb": self._thumbs.get(record.sid, ""),
+        }
+
+    def _take_pending(self):
+        self._inflight_since = self._pending_since
+        self._pending_since = None
+
+    def _apply_dirty(self) -> RosterPatch:
+        patch: RosterPatch = {}
+        for sid in self._dirty:
+            record = self.registry.get(sid)
+            if record is None:
+                if self._rows.pop(sid, None) is not None:
+                    patch[sid] = None
+                continue
+            row = self._row(record)
+            if self._rows.get(sid) != row:
+                self._rows[sid] = row
+                patch[sid] = row
+        self._dirty.clear()
+        return patch
+
+    def rebuild(self) -> RosterPatch:
+        """Reloads the registry from the room and diffs every row (legacy polling)."""
+        self.registry.load(self._room)
+        rows = {record.sid: self._row(record) for record in self.registry}
+        patch: RosterPatch = {sid: None for sid in self._rows if sid not in rows}
+        for sid, row in rows.items():
+            if self._rows.get(sid) != row:
+                patch[sid] = row
+        self._rows = rows
+        self._dirty.clear()
+        return patch
+
+    def delivered(self):
+        """Records event-to-UI latency once a patch has reached the state."""
+        if self._inflight_since is not None:
+            self.latency.record((time.perf_counter() - self._inflight_since) * 1000)
+            self._inflight_since = None
+
+    def _publish(self, patch: RosterPatch) -> RosterPatch:
+        apply_patch(self.rows, self._index, patch)
+        self.directory.apply(patch)
+        return patch
+
+    async def updates(
+        self, mode: str = "events", interval: float = 0.5, window: float = 0.05
+    ):
+        """Yields roster patches keyed by sid; a None row means the participant left.
+
+        The first patch always carries the full roster. In events mode changes
+        arriving within `window` seconds of each other are merged into one patch.
+        `rows` reflects every patch yielded so far, in join order.
+        """
+        self.rows = []
+        self._index = {}
+        self.directory.clear()
+        yield self._publish(dict(self._rows))
+        if mode == "poll":
+            while not self._closed:
+                await asyncio.sleep(interval)
+                if self._closed:
+                    break
+                self._take_pending()
+                patch = self.rebuild()
+                if patch:
+                    yield self._publish(patch)
+                else:
+                    self._inflight_since = None
+            return
+        while not self._closed:
+            await self._changed.wait()
+            if window > 0:
+                await asyncio.sleep(window)
+            self._changed.clear()
+            if self._closed:
+                break
+            self._take_pending()
+            patch = self._apply_dirty()
+            if patch:
+                yield self._publish(patch)
+            else:
+                self._inflight_since = None
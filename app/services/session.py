@@ -0,0 +1,630 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable
+from livekit import rtc
+from app.services.archive import LOCAL, TransmissionRecorder
+from app.services.autosub import AutoSubscriber
+from app.services.camera import CameraGovernor
+from app.services.devices import (
+    CAMERA_HEIGHT,
+    CAMERA_WIDTH,
+    CameraDevice,
+    camera_device,
+)
+from app.services.floor import FloorControl
+from app.services.journal import PTT_ON_AIR, PTT_PRESS, PTT_RELEASE, RoomJournal
+from app.services.metrics import (
+    CONNECTS,
+    RECONNECTS,
+    SAMPLER,
+    SESSIONS,
+    Summary,
+)
+from app.services.mic import SAMPLE_RATE, MicPipeline
+from app.services.mixer import AudioMixer
+from app.services.ptt import PttLane, PttTrace
+from app.services.registry import TRACK_SOURCES
+from app.services.roster import RosterTracker
+from app.services.stats import LatencyWindow
+from app.services.telemetry import TelemetryChannel
+from app.services.thumbnails import ThumbnailExchange
+from app.services.video import VideoFeeds
+from app.services.viewport import ViewportController
+from app.services.vox import VOX_HANG_MS, VoxController
+
+RECONNECT_BACKOFF = (0.25, 8.0)
+RECONNECT_ATTEMPTS = 12
+# The server or another client ended this participant's stay on purpose;
+# connecting again would undo a kick or recreate a deleted room.
+FINAL_DISCONNECTS = frozenset(
+    (
+        rtc.DisconnectReason.CLIENT_INITIATED,
+        rtc.DisconnectReason.DUPLICATE_IDENTITY,
+        rtc.DisconnectReason.PARTICIPANT_REMOVED,
+        rtc.DisconnectReason.ROOM_DELETED,
+        rtc.DisconnectReason.ROOM_CLOSED,
+    )
+)
+
+# Optional per-session services. Browser sessions run all of them; headless
+# load clients leave them off so a run measures PTT and nothing else.
+SESSION_FEATURES = frozenset(("mixer", "recorder", "telemetry", "thumbnails"))
+
+GLOBAL_RECOVERY_MS = LatencyWindow()
+Summary(
+    "ptt_recovery_ms", "Connection loss to a usable room again.", GLOBAL_RECOVERY_MS
+)
+
+# Connect-to-ready breakdown. "mic_ready" and "camera_ready" are measured from
+# the start of setup_media, "ready" from the start of connect.
+STARTUP_PHASES = (
+    "connect",
+    "mic_open",
+    "mic_publish",
+    "mic_ready",
+    "camera_open",
+    "camera_publish",
+    "camera_ready",
+    "ready",
+)
+
+GLOBAL_STARTUP_MS = {phase: LatencyWindow() for phase in STARTUP_PHASES}
+Summary(
+    "ptt_startup_ms",
+    "Connect-to-ready time per startup phase.",
+    GLOBAL_STARTUP_MS,
+    label="phase",
+)
+
+
+class RoomSession:
+    """One LiveKit room connection with its local media, roster and PTT lane.
+
+    Kept free of Reflex so the same connect/publish/PTT logic can back a
+    browser session or run headless. When the room drops, the session
+    reconnects with backoff on a fresh `rtc.Room`, republishes the same local
+    track objects and restores the subscriptions the user had chosen.
+    `features` picks which of SESSION_FEATURES are started on connect.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        preroll_ms: int = 0,
+        token_provider: Callable[[], Awaitable[str]] | None = None,
+        features: frozenset[str] = SESSION_FEATURES,
+    ):
+        unknown = set(features) - SESSION_FEATURES
+        if unknown:
+            raise ValueError(f"Unknown session features: {sorted(unknown)}")
+        self.url = url
+        self.token = token
+        self.preroll_ms = preroll_ms
+        self._token_provider = token_provider
+        self.features = frozenset(features)
+        self.room: rtc.Room | None = None
+        self.roster: RosterTracker | None = None
+        self.video_feeds: VideoFeeds | None = None
+        self.viewport = ViewportController()
+        self.autosub: AutoSubscriber | None = None
+        self.floor: FloorControl | None = None
+        self.mixer: AudioMixer | None = None
+        self.recorder: TransmissionRecorder | None = None
+        self.camera: CameraGovernor | None = None
+        self.telemetry: TelemetryChannel | None = None
+        self.thumbnails: ThumbnailExchange | None = None
+        self.journal: RoomJournal | None = None
+        self._press = 0
+        self.ptt = PttLane()
+        self.mic: MicPipeline | None = None
+        self.vox: VoxController | None = None
+        self.audio_track: rtc.LocalAudioTrack | None = None
+        self.video_track: rtc.LocalVideoTrack | None = None
+        self.audio_publication: rtc.LocalTrackPublication | None = None
+        self.video_publication: rtc.LocalTrackPublication | None = None
+        self.startup: dict[str, float] = {}
+        self._camera: CameraDevice | None = None
+        self._video_source: rtc.VideoSource | None = None
+        self._camera_task: asyncio.Task | None = None
+        self._media_task: asyncio.Task | None = None
+        self._connect_started: float | None = None
+        self.status = "disconnected"
+        self.status_message = "Ready to connect"
+        self.recovery_ms = LatencyWindow()
+        self._wanted: set[tuple[str, int]] = set()
+        self._handlers: list[tuple[str, object]] = []
+        self._status_waiters: set[asyncio.Event] = set()
+        self._lost_at: float | None = None
+        self._reconnect_task: asyncio.Task | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._closing = False
+
+    @property
+    def room_name(self) -> str:
+        return self.room.name if self.room and self.room.name else "Unknown Room"
+
+    def _set_status(self, status: str, message: str):
+        self.status = status
+        self.status_message = message
+        for waiter in self._status_waiters:
+            waiter.set()
+
+    async def status_updates(self):
+        """Yields (status, message) every time the connection status changes."""
+        changed = asyncio.Event()
+        self._status_waiters.add(changed)
+        try:
+            while not self._closing:
+                await changed.wait()
+                changed.clear()
+                yield self.status, self.status_message
+        finally:
+            self._status_waiters.discard(changed)
+
+    async def _fresh_token(self) -> str:
+        if self._token_provider is not None:
+            self.token = await self._token_provider()
+        return self.token
+
+    async def _open_room(self) -> rtc.Room:
+        room = rtc.Room()
+        options = rtc.RoomOptions(auto_subscribe=False, dynacast=True)
+        try:
+            await room.connect(self.url, await self._fresh_token(), options=options)
+        except Exception:
+            try:
+                await room.disconnect()
+            except Exception as e:
+                logging.exception(f"Error disconnecting after failed connection: {e}")
+            raise
+        return room
+
+    def _bind(self, room: rtc.Room):
+        for event, handler in (
+            ("reconnecting", self._on_reconnecting),
+            ("reconnected", self._on_reconnected),
+            ("disconnected", self._on_disconnected),
+            ("track_published", self._on_track_published),
+        ):
+            self._handlers.append((event, room.on(event, handler)))
+
+    def _unbind(self):
+        if self.room is not None:
+            for event, handler in self._handlers:
+                self.room.off(event, handler)
+        self._handlers.clear()
+
+    def _phase(self, phase: str, started: float):
+        ms = (time.perf_counter() - started) * 1000
+        self.startup[phase] = round(ms, 1)
+        GLOBAL_STARTUP_MS[phase].record(ms)
+
+    async def _timed(self, phase: str, aw: Awaitable):
+        started = time.perf_counter()
+        result = await aw
+        self._phase(phase, started)
+        return result
+
+    async def connect(self):
+        self._set_status("connecting", "Establishing connection...")
+        self._connect_started = time.perf_counter()
+        try:
+            self.room = await self._timed("connect", self._open_room())
+        except Exception:
+            CONNECTS.inc(result="error")
+            raise
+        CONNECTS.inc(result="ok")
+        SESSIONS.add(self)
+        SAMPLER.start()
+        self._bind(self.room)
+        self.roster = RosterTracker(self.room)
+        self.roster.attach()
+        self.video_feeds = VideoFeeds(self.room)
+        self.video_feeds.attach()
+        if "mixer" in self.features:
+            self.mixer = AudioMixer(self.room)
+            self.mixer.attach()
+        if "recorder" in self.features:
+            self.recorder = TransmissionRecorder(self.room)
+            self.recorder.attach()
+        self.floor = FloorControl(self.room)
+        self.floor.on_revoked = self._on_floor_revoked
+        self.floor.attach()
+        if "telemetry" in self.features:
+            self.telemetry = TelemetryChannel(self.room)
+            self.telemetry.on_status = self.roster.set_status
+            self.telemetry.attach()
+        if "thumbnails" in self.features:
+            self.thumbnails = ThumbnailExchange(self.room, self.roster.registry)
+            self.thumbnails.on_thumbnail = self.roster.set_thumbnail
+            self.thumbnails.attach()
+        self._set_status("connected", f"Connected to room: {self.room_name}")
+
+    async def setup_media(self, camera: bool = True, devices: bool = True):
+        """Brings up the mic and camera concurrently; returns once PTT is usable.
+
+        The camera keeps coming up in the background, see `camera_ready`.
+        Sessions shared through the hub run this once; later callers just wait.
+        Without `devices` the mic track is published but only carries what is
+        passed to `mic.feed`, as headless clients do.
+        """
+        if self.room is None:
+            return
+        if self._media_task is None:
+            self._media_task = asyncio.create_task(self._setup_media(camera, devices))
+        await asyncio.shield(self._media_task)
+
+    async def _setup_media(self, camera: bool, devices: bool):
+        started = time.perf_counter()
+        if camera:
+            self._camera_task = asyncio.create_task(self._setup_camera(started))
+        self.mic = MicPipeline(preroll_ms=self.preroll_ms)
+        self.mic.tap = self._record_local
+        self.mic.start()
+        self.audio_track = self.mic.track
+        if devices:
+            await asyncio.gather(
+                self._timed("mic_open", self.mic.open_device()), self._publish_mic()
+            )
+        else:
+            await self._publish_mic()
+        self._phase("mic_ready", started)
+        if self._connect_started is not None:
+            self._phase("ready", self._connect_started)
+
+    async def _publish_mic(self):
+        self.audio_publication = await self._timed(
+            "mic_publish", self.room.local_participant.publish_track(self.audio_track)
+        )
+        self.audio_track.mute()
+
+    async def _setup_camera(self, started: float) -> bool:
+        try:
+            source = rtc.VideoSource(CAMERA_WIDTH, CAMERA_HEIGHT)
+            self._video_source = source
+            self.video_track = rtc.LocalVideoTrack.create_video_track(
+                "camera_main", source
+            )
+            self._camera, self.video_publication = await asyncio.gather(
+                self._timed("camera_open", asyncio.to_thread(camera_device)),
+                self._timed(
+                    "camera_publish",
+                    self.room.local_participant.publish_track(self.video_track),
+                ),
+            )
+        except Exception as e:
+            logging.exception(f"Camera setup failed: {e}")
+            return False
+        if self._camera is not None:
+            self._camera.attach(source)
+            if self.thumbnails is not None:
+                self.thumbnails.camera = self._camera
+        self.camera = CameraGovernor(self, self._camera)
+        self.camera.attach()
+        self._phase("camera_ready", started)
+        return True
+
+    async def camera_ready(self) -> bool:
+        """Waits for the camera started by `setup_media`; True once it is live."""
+        if self._camera_task is None:
+            return False
+        return await asyncio.shield(self._camera_task)
+
+    async def start_talking(self, trace: PttTrace) -> bool:
+        """PTT press: takes the floor, unmutes the mic and arms first-frame tracing.
+
+        Waits while someone else holds the floor; a release in the meantime
+        withdraws the request and nothing is unmuted.
+        """
+        if self.audio_publication is None:
+            return False
+        self._journal(PTT_PRESS)
+        self._press += 1
+        press = self._press
+        if self.floor is not None:
+            if not await self.floor.acquire() or press != self._press:
+                return False
+            trace.floor_granted = time.perf_counter()
+        talking = await self.ptt.set_talking(self.audio_track, True, trace)
+        self._report_talking()
+        if trace.unmuted is not None:
+            self._journal(PTT_ON_AIR)
+        if self.mic is not None and trace.unmuted is not None:
+            if self.recorder is not None:
+                identity = self.room.local_participant.identity
+                self.recorder.begin(LOCAL, identity, SAMPLE_RATE)
+            trace.frame_waiter = self.mic.next_frame()
+            self.mic.begin_transmission()
+        return talking
+
+    async def stop_talking(self) -> bool:
+        """PTT release: gives up the floor, stops mic audio and mutes the track."""
+        self._journal(PTT_RELEASE)
+        self._press += 1
+        if self.floor is not None:
+            self.floor.release()
+        return await self._mute()
+
+    def _on_floor_revoked(self):
+        """Preempted by a higher priority talker: go quiet without a release."""
+        self._spawn(self._mute())
+
+    def _spawn(self, coro: Awaitable):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Session task failed: {task.exception()}")
+
+    def _record_local(self, pcm):
+        if self.recorder is not None:
+            self.recorder.write(LOCAL, pcm)
+
+    async def _mute(self) -> bool:
+        if self.mic is not None:
+            self.mic.end_transmission()
+        if self.recorder is not None:
+            self.recorder.end(LOCAL)
+        if self.audio_publication is None:
+            return False
+        talking = await self.ptt.set_talking(self.audio_track, False)
+        self._report_talking()
+        return talking
+
+    def _journal(self, code: int):
+        if self.journal is not None:
+            self.journal.record(code)
+
+    def _report_talking(self):
+        if self.telemetry is not None:
+            self.telemetry.update(talking=self.ptt.transmitting)
+
+    def toggle_subscription(self, sid: str, track_type: str) -> bool | None:
+        """Flips a remote track subscription and remembers the choice by identity."""
+        record = self.roster.registry.get(sid) if self.roster else None
+        if record is None:
+            logging.warning(f"Participant {sid} not found.")
+            return None
+        source = TRACK_SOURCES.get(track_type)
+        pub = record.publication(source) if source is not None else None
+        if pub is None:
+            logging.warning(f"No {track_type} track for {record.identity}.")
+            return None
+        subscribed = not pub.subscribed
+        pub.set_subscribed(subscribed)
+        if subscribed:
+            self._wanted.add((record.identity, pub.source))
+        else:
+            self._wanted.discard((record.identity, pub.source))
+        logging.info(
+            f"Set subscription for {record.identity} {track_type} to {subscribed}"
+        )
+        return subscribed
+
+    def set_autosub(self, enabled: bool) -> bool:
+        """Hands remote mic subscriptions to the active-speaker auto-subscriber."""
+        if enabled and self.autosub is None and self.roster is not None:
+            self.autosub = AutoSubscriber(self.room, self.roster.registry)
+            self.autosub.attach()
+        elif not enabled and self.autosub is not None:
+            self.autosub.close()
+            self.autosub = None
+        return self.autosub is not None
+
+    def set_journal(self, enabled: bool) -> bool:
+        """Starts or stops journaling room and PTT events for later replay."""
+        if enabled and self.journal is None and self.room is not None:
+            self.journal = RoomJournal(self.room)
+            self.journal.attach(self.floor)
+        elif not enabled and self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        return self.journal is not None
+
+    def set_vox(
+        self, vox: bool, gate: bool = False, hang_ms: int = VOX_HANG_MS
+    ) -> bool:
+        """Turns voice-operated transmit and/or the mic noise gate on or off."""
+        if self.vox is not None:
+            previous, self.vox = self.vox, None
+            if previous.keyed:
+                self._spawn(self.stop_talking())
+            previous.close()
+            if self.mic is not None:
+                self.mic.analyzer = None
+        if (vox or gate) and self.mic is not None:
+            self.vox = VoxController(self, vox, gate, hang_ms)
+            self.mic.analyzer = self.vox.process
+        return self.vox is not None and self.vox.vox
+
+    def _on_track_published(
+        self, pub: rtc.RemoteTrackPublication, p: rtc.RemoteParticipant
+    ):
+        if (p.identity, pub.source) in self._wanted and not pub.subscribed:
+            pub.set_subscribed(True)
+
+    def _on_reconnecting(self):
+        self._lost_at = time.perf_counter()
+        self._set_status("reconnecting", "Connection lost, resuming...")
+
+    def _on_reconnected(self):
+        self._recovered("Resumed")
+
+    def _on_disconnected(self, reason=None):
+        if self._closing or self._reconnect_task is not None:
+            return
+        if reason in FINAL_DISCONNECTS:
+            name = rtc.DisconnectReason.Name(reason)
+            logging.warning(f"Room disconnected ({name}); not reconnecting.")
+            self._lost_at = None
+            self._set_status("disconnected", f"Left the room ({name})")
+            return
+        if self._lost_at is None:
+            self._lost_at = time.perf_counter()
+        logging.warning(f"Room disconnected ({reason}); reconnecting.")
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    def _recovered(self, verb: str):
+        lost_at, self._lost_at = self._lost_at, None
+        if lost_at is None:
+            self._set_status("connected", f"Connected to room: {self.room_name}")
+            return
+        ms = (time.perf_counter() - lost_at) * 1000
+        RECONNECTS.inc()
+        self.recovery_ms.record(ms)
+        GLOBAL_RECOVERY_MS.record(ms)
+        self._set_status("connected", f"{verb} in {ms:.0f} ms")
+
+    async def _reconnect(self):
+        delay, max_delay = RECONNECT_BACKOFF
+        attempt = 0
+        try:
+            while not self._closing:
+                attempt += 1
+                if attempt > RECONNECT_ATTEMPTS:
+                    logging.warning(f"Giving up after {RECONNECT_ATTEMPTS} attempts.")
+                    self._lost_at = None
+                    self._set_status(
+                        "error", f"Connection lost after {RECONNECT_ATTEMPTS} retries"
+                    )
+                    return
+                self._set_status("reconnecting", f"Reconnecting (attempt {attempt})...")
+                try:
+                    room = await self._open_room()
+                except Exception as e:
+                    logging.warning(f"Reconnect attempt {attempt} failed: {e}")
+                    await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+                    delay = min(delay * 2, max_delay)
+                    continue
+                if self._closing:
+                    await room.disconnect()
+                    return
+                await self._adopt(room)
+                self._recovered("Reconnected")
+                return
+        finally:
+            self._reconnect_task = None
+
+    async def _adopt(self, room: rtc.Room):
+        """Moves roster, feeds and local tracks over to a freshly connected room."""
+        self._unbind()
+        old, self.room = self.room, room
+        self._bind(room)
+        if self.roster is not None:
+            self.roster.rebind(room)
+        if self.video_feeds is not None:
+            self.video_feeds.rebind(room)
+        if self.autosub is not None:
+            self.autosub.rebind(room)
+        if self.floor is not None:
+            self.floor.rebind(room)
+        if self.mixer is not None:
+            self.mixer.rebind(room)
+        if self.recorder is not None:
+            self.recorder.rebind(room)
+        if self.camera is not None:
+            self.camera.rebind(room)
+        if self.telemetry is not None:
+            self.telemetry.rebind(room)
+        if self.thumbnails is not None:
+            self.thumbnails.rebind(room)
+        if self.journal is not None:
+            self.journal.rebind(room)
+        if old is not None:
+            # Every service has let go of it, so its last events go nowhere.
+            try:
+                await old.disconnect()
+            except Exception as e:
+                logging.warning(f"Error disconnecting the lost room: {e}")
+        await asyncio.gather(self._republish_audio(room), self._republish_video(room))
+        for p in room.remote_participants.values():
+            for pub in p.track_publications.values():
+                self._on_track_published(pub, p)
+
+    async def _republish_audio(self, room: rtc.Room):
+        if self.audio_track is None:
+            return
+        self.audio_publication = await room.local_participant.publish_track(
+            self.audio_track
+        )
+        if not self.ptt.transmitting:
+            self.audio_track.mute()
+
+    async def _republish_video(self, room: rtc.Room):
+        if self.video_track is None:
+            return
+        self.video_publication = await room.local_participant.publish_track(
+            self.video_track
+        )
+
+    async def close(self):
+        self._closing = True
+        SESSIONS.discard(self)
+        for waiter in self._status_waiters:
+            waiter.set()
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        for task in self._tasks:
+            task.cancel()
+        if self._media_task is not None:
+            self._media_task.cancel()
+        if self._camera_task is not None:
+            self._camera_task.cancel()
+        if self._camera is not None and self._video_source is not None:
+            self._camera.detach(self._video_source)
+        if self.roster is not None:
+            self.roster.close()
+        if self.video_feeds is not None:
+            self.video_feeds.close()
+        if self.autosub is not None:
+            self.autosub.close()
+            self.autosub = None
+        if self.floor is not None:
+            self.floor.close()
+        if self.mixer is not None:
+            self.mixer.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.vox is not None:
+            self.vox.close()
+            self.vox = None
+        if self.camera is not None:
+            self.camera.close()
+            self.camera = None
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
+        if self.thumbnails is not None:
+            self.thumbnails.close()
+            self.thumbnails = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+        self._unbind()
+        if self.room is not None:
+            try:
+                await self.room.disconnect()
+            except Exception as e:
+                logging.exception(f"Error during disconnect: {e}")
+        if self.mic is not None:
+            await self.mic.aclose()
+        if self._video_source is not None:
+            await self._video_source.aclose()
+        self.room = None
+        self.mic = None
+        self.audio_publication = None
+        self.video_publication = None
+        self.audio_track = None
+        self.video_track = None
+        self._camera = None
+        self._video_source = None
+        self._camera_task = None
+        self._media_task = None
+        self.status = "disconnected"
+        self.status_message = "Disconnected"
@@ -0,0 +1,49 @@
+import collections
+import math
+
+
+class LatencyWindow:
+    """Bounded window of latency samples in milliseconds."""
+
+    def __init__(self, size: int = 1024):
+        self._samples: collections.deque[float] = collections.deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+    def record(self, ms: float):
+        self._samples.append(ms)
+        self.count += 1
+        self.total += ms
+        self.last = ms
+
+    def reset(self):
+        self._samples.clear()
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+
+    def samples(self) -> list[float]:
+        return list(self._samples)
+
+    def percentile(self, p: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return ordered[index]
+
+    def mean(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(self._samples) / len(self._samples)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "last": round(self.last, 3),
+            "mean": round(self.mean(), 3),
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3),
+        }
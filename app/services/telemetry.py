@@ -0,0 +1,373 @@
+import asyncio
+import logging
+import math
+import struct
+import time
+from collections import deque
+from livekit import rtc
+from app.services.metrics import Counter
+
+TELEMETRY_TOPIC = "ptt.telemetry"
+TELEMETRY_VERSION = 1
+# Minimum spacing between packets from one unit; status flag changes go sooner.
+TELEMETRY_INTERVAL_S = 1.0
+TELEMETRY_FLAGS_S = 0.2
+# Packets per second each unit should receive at most: in large rooms every
+# sender stretches its interval so the fleet as a whole stays under it.
+TELEMETRY_INBOUND_PPS = 100
+# Full state is resent this often, so lost lossy packets heal on their own.
+TELEMETRY_REFRESH_S = 15.0
+TELEMETRY_RATE_MARKS = 10
+
+TELEMETRY_BYTES = Counter(
+    "ptt_telemetry_bytes_total", "Telemetry payload bytes by direction."
+)
+
+POSITION = 0x01
+BATTERY = 0x02
+FLAGS = 0x04
+
+TALKING = 0x01
+BUSY = 0x02
+
+# version, field mask, seq; the fields in the mask follow in bit order.
+_HEADER = struct.Struct("!BBH")
+# Latitude and longitude in 1e-7 degree fixed point (about 1 cm).
+_POSITION = struct.Struct("!ii")
+_BYTE = struct.Struct("!B")
+
+TELEMETRY_SCRIPT = """
+Promise.all([
+  navigator.getBattery
+    ? navigator.getBattery().then((b) => Math.round(b.level * 100), () => null)
+    : null,
+  new Promise((resolve) => navigator.geolocation
+    ? navigator.geolocation.getCurrentPosition(
+        (p) => resolve([p.coords.latitude, p.coords.longitude]),
+        () => resolve(null),
+        {maximumAge: 5000, timeout: 4000})
+    : resolve(null)),
+]).then(([battery, position]) => ({battery, position}))
+"""
+
+
+class UnitStatus:
+    """Latest telemetry of one unit; None means never reported."""
+
+    __slots__ = ("position", "battery", "talking", "busy", "seqs", "updated")
+
+    def __init__(self):
+        self.position: tuple[float, float] | None = None
+        self.battery: int | None = None
+        self.talking = False
+        self.busy = False
+        # Seq of the packet each field was last taken from, by field bit.
+        self.seqs: dict[int, int] = {}
+        self.updated = 0.0
+
+    @property
+    def mask(self) -> int:
+        """Fields worth sending in a full refresh."""
+        mask = FLAGS
+        if self.position is not None:
+            mask |= POSITION
+        if self.battery is not None:
+            mask |= BATTERY
+        return mask
+
+    def fresher(self, seq: int, mask: int) -> int:
+        """The fields in `mask` that `seq` is newer for.
+
+        Reliable flag packets and lossy position packets share one sequence
+        but can arrive out of order, so each field keeps its own last seq.
+        """
+        fresh = 0
+        for field in (POSITION, BATTERY, FLAGS):
+            if mask & field:
+                last = self.seqs.get(field)
+                if last is None or newer(seq, last):
+                    fresh |= field
+        return fresh
+
+    def merge(self, mask: int, other: "UnitStatus"):
+        if mask & POSITION:
+            self.position = other.position
+        if mask & BATTERY:
+            self.battery = other.battery
+        if mask & FLAGS:
+            self.talking = other.talking
+            self.busy = other.busy
+
+    def row(self) -> dict[str, str | bool]:
+        """Roster columns; the position is rounded so GPS jitter stays quiet."""
+        return {
+            "battery": "" if self.battery is None else f"{self.battery}%",
+            "position": (
+                ""
+                if self.position is None
+                else f"{self.position[0]:.4f}, {self.position[1]:.4f}"
+            ),
+            "on_air": self.talking,
+            "busy": self.busy,
+        }
+
+
+NO_STATUS = UnitStatus().row()
+
+
+def encode_telemetry(seq: int, mask: int, status: UnitStatus) -> bytes:
+    parts = [_HEADER.pack(TELEMETRY_VERSION, mask, seq)]
+    if mask & POSITION:
+        lat, lon = status.position
+        parts.append(_POSITION.pack(round(lat * 1e7), round(lon * 1e7)))
+    if mask & BATTERY:
+        parts.append(_BYTE.pack(status.battery))
+    if mask & FLAGS:
+        parts.append(_BYTE.pack(TALKING * status.talking | BUSY * status.busy))
+    return b"".join(parts)
+
+
+def decode_telemetry(data: bytes) -> tuple[int, int, UnitStatus] | None:
+    """(seq, mask, status), or None for foreign or truncated packets."""
+    if len(data) < _HEADER.size:
+        return None
+    version, mask, seq = _HEADER.unpack_from(data)
+    size = (
+        _HEADER.size
+        + _POSITION.size * bool(mask & POSITION)
+        + _BYTE.size * (bool(mask & BATTERY) + bool(mask & FLAGS))
+    )
+    if version != TELEMETRY_VERSION or len(data) < size:
+        return None
+    status = UnitStatus()
+    offset = _HEADER.size
+    if mask & POSITION:
+        lat, lon = _POSITION.unpack_from(data, offset)
+        status.position = (lat / 1e7, lon / 1e7)
+        offset += _POSITION.size
+    if mask & BATTERY:
+        (status.battery,) = _BYTE.unpack_from(data, offset)
+        offset += _BYTE.size
+    if mask & FLAGS:
+        (flags,) = _BYTE.unpack_from(data, offset)
+        status.talking = bool(flags & TALKING)
+        status.busy = bool(flags & BUSY)
+    return seq, mask, status
+
+
+def newer(seq: int, last: int) -> bool:
+    """Serial number comparison for the 16-bit packet sequence."""
+    return 0 < (seq - last) & 0xFFFF < 0x8000
+
+
+class TelemetryChannel:
+    """Unit status (GPS position, battery, talking/busy) over data packets.
+
+    Local updates only mark fields dirty; the latest value of each is sent
+    at most once per `spacing`, all dirty fields together in one compact
+    packet (4 to 14 bytes), and repeats of an unchanged value are dropped.
+    `spacing` is `interval` until the room is large enough for the fleet to
+    exceed `TELEMETRY_INBOUND_PPS` at every receiver, then grows with it.
+    Status flag changes go out after `TELEMETRY_FLAGS_S` and reliably, the
+    rest lossy, with a full refresh every `TELEMETRY_REFRESH_S` and a direct
+    one to every newcomer. Received packets older than the last one seen
+    from that unit are discarded field by field, so a late lossy position
+    packet never masks a newer flag change; `on_status` gets (sid, status)
+    when any field was taken.
+    """
+
+    def __init__(self, room: rtc.Room, interval: float = TELEMETRY_INTERVAL_S):
+        self._room = room
+        self.interval = interval
+        self.local = UnitStatus()
+        self.units: dict[str, UnitStatus] = {}
+        self.on_status = None
+        self._seq = 0
+        self._pending = 0
+        self._sent_at = -math.inf
+        self._flush_at = math.inf
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._handlers: list[tuple[str, object]] = []
+        self._tasks: set[asyncio.Task] = set()
+        self.updates = 0
+        self.sent_packets = 0
+        self.sent_bytes = 0
+        self.received_packets = 0
+        self.received_bytes = 0
+        self.stale = 0
+        self._marks: deque[tuple[float, int, int]] = deque(maxlen=TELEMETRY_RATE_MARKS)
+
+    @property
+    def spacing(self) -> float:
+        fleet = len(self._room.remote_participants)
+        return max(self.interval, fleet / TELEMETRY_INBOUND_PPS)
+
+    def attach(self):
+        for event, handler in (
+            ("data_received", self._on_data_received),
+            ("participant_connected", self._on_participant_connected),
+            ("participant_disconnected", self._on_participant_disconnected),
+        ):
+            self._handlers.append((event, self._room.on(event, handler)))
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_forever())
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def rebind(self, room: rtc.Room):
+        """Follows a replacement room; remote units re-send to the newcomer."""
+        self._unbind()
+        self._room = room
+        self.units.clear()
+        self.attach()
+        if self._seq:
+            self._pending |= self.local.mask
+            self._schedule(0.0)
+
+    def close(self):
+        self._unbind()
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        for task in self._tasks:
+            task.cancel()
+
+    def update(
+        self,
+        position: tuple[float, float] | None = None,
+        battery: int | None = None,
+        talking: bool | None = None,
+        busy: bool | None = None,
+    ):
+        """Sets local values; only changed ones are queued for the next packet."""
+        self.updates += 1
+        local = self.local
+        mask = 0
+        if position is not None and position != local.position:
+            local.position = position
+            mask |= POSITION
+        if battery is not None:
+            battery = max(0, min(int(battery), 100))
+            if battery != local.battery:
+                local.battery = battery
+                mask |= BATTERY
+        if talking is not None and talking != local.talking:
+            local.talking = talking
+            mask |= FLAGS
+        if busy is not None and busy != local.busy:
+            local.busy = busy
+            mask |= FLAGS
+        if not mask:
+            return
+        self._pending |= mask
+        self._schedule(TELEMETRY_FLAGS_S if self._pending & FLAGS else self.spacing)
+
+    def _schedule(self, spacing: float):
+        loop = asyncio.get_running_loop()
+        at = max(self._sent_at + spacing, loop.time())
+        if self._flush_handle is not None:
+            if at >= self._flush_at:
+                return
+            self._flush_handle.cancel()
+        self._flush_at = at
+        self._flush_handle = loop.call_at(at, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        self._flush_at = math.inf
+        mask, self._pending = self._pending, 0
+        if mask and self._handlers:
+            self._send(mask)
+
+    def _send(self, mask: int, destination: str | None = None):
+        if destination is None:
+            self._seq = (self._seq + 1) & 0xFFFF or 1
+            self._sent_at = asyncio.get_running_loop().time()
+        packet = encode_telemetry(self._seq, mask, self.local)
+        self.sent_packets += 1
+        self.sent_bytes += len(packet)
+        TELEMETRY_BYTES.inc(len(packet), direction="sent")
+        self._track(
+            self._room.local_participant.publish_data(
+                packet,
+                reliable=bool(mask & FLAGS),
+                destination_identities=[destination] if destination else [],
+                topic=TELEMETRY_TOPIC,
+            )
+        )
+
+    def _track(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._sent)
+
+    def _sent(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Telemetry packet not sent: {task.exception()}")
+
+    async def _refresh_forever(self):
+        while True:
+            await asyncio.sleep(TELEMETRY_REFRESH_S)
+            if self._seq:
+                self._pending |= self.local.mask
+                self._schedule(self.spacing)
+
+    def _on_data_received(self, packet: rtc.DataPacket):
+        if packet.topic != TELEMETRY_TOPIC or packet.participant is None:
+            return
+        self.received_packets += 1
+        self.received_bytes += len(packet.data)
+        TELEMETRY_BYTES.inc(len(packet.data), direction="received")
+        message = decode_telemetry(packet.data)
+        if message is None:
+            return
+        seq, mask, status = message
+        p = packet.participant
+        unit = self.units.get(p.identity)
+        if unit is None:
+            unit = self.units[p.identity] = UnitStatus()
+        fresh = unit.fresher(seq, mask)
+        if not fresh:
+            self.stale += 1
+            return
+        unit.merge(fresh, status)
+        for field in (POSITION, BATTERY, FLAGS):
+            if fresh & field:
+                unit.seqs[field] = seq
+        unit.updated = time.monotonic()
+        if self.on_status is not None:
+            self.on_status(p.sid, unit)
+
+    def _on_participant_connected(self, p: rtc.RemoteParticipant):
+        if self._seq:
+            self._send(self.local.mask, p.identity)
+
+    def _on_participant_disconnected(self, p: rtc.RemoteParticipant):
+        self.units.pop(p.identity, None)
+
+    def stats(self) -> dict[str, float | int]:
+        """Packet counts and payload bytes per second over the last ~10 s."""
+        now = time.monotonic()
+        if not self._marks or now - self._marks[-1][0] >= 1.0:
+            self._marks.append((now, self.sent_bytes, self.received_bytes))
+        since, sent, received = self._marks[0]
+        seconds = now - since
+        return {
+            "units": len(self.units),
+            "sent_bps": round((self.sent_bytes - sent) / seconds, 1) if seconds else 0,
+            "received_bps": (
+                round((self.received_bytes - received) / seconds, 1) if seconds else 0
+            ),
+            "sent_packets": self.sent_packets,
+            "received_packets": self.received_packets,
+            "coalesced": max(0, self.updates - self.sent_packets),
+            "stale": self.stale,
+        }
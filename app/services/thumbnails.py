@@ -0,0 +1,347 @@
+import asyncio
+import collections
+import hashlib
+import logging
+import struct
+import time
+import numpy as np
+from livekit import rtc
+from app.services.devices import CameraDevice
+from app.services.registry import TrackRegistry
+from app.services.stats import LatencyWindow
+from app.services.video import ENCODER_POOL, decimate, encode_jpeg
+
+THUMB_TOPIC = "ptt.thumb"
+THUMB_VERSION = 1
+THUMB_WIDTH = 128
+THUMB_HEIGHT = 72
+# How often a shown thumbnail is asked for, and the most often one is encoded.
+THUMB_INTERVAL_S = 5.0
+# Requests arriving this close together are answered with one encode and packet.
+THUMB_BATCH_S = 0.05
+# How long a paused camera gets to deliver a still frame.
+THUMB_STILL_WAIT_S = 0.3
+# A new still replaces the thumbnail only if some cell of a 16x9 luma grid
+# moved by more than this many 8-bit levels since the one last sent.
+THUMB_CHANGE_LEVELS = 12.0
+# Reliable data packets above ~15 KiB are rejected by the SFU.
+THUMB_MAX_BYTES = 15000
+THUMB_CACHE_BYTES = 4 * 1024 * 1024
+
+REQUEST = 0
+FRAME = 1
+
+# version, kind, thumbnail version (the one held for REQUEST); FRAME adds the JPEG.
+_HEADER = struct.Struct("!BBI")
+
+
+def signature(rgb: np.ndarray) -> np.ndarray:
+    """16x9 grid of mean brightness, averaged over blocks so noise stays quiet."""
+    small = decimate(rgb, 32, 18).astype(np.float32).mean(axis=2)
+    h, w = small.shape[0] // 9 * 9, small.shape[1] // 16 * 16
+    return small[:h, :w].reshape(9, h // 9, 16, w // 16).mean(axis=(1, 3))
+
+
+def changed(old: np.ndarray | None, new: np.ndarray) -> bool:
+    if old is None or old.shape != new.shape:
+        return True
+    return float(np.abs(new - old).max()) > THUMB_CHANGE_LEVELS
+
+
+def thumb_key(room: str, sid: str) -> str:
+    """Cache key of a camera's still; sids are only looked up within a room."""
+    return f"{room}/{sid}"
+
+
+class Thumbnail:
+    __slots__ = ("jpeg", "etag", "updated")
+
+    def __init__(self, jpeg: bytes, etag: str):
+        self.jpeg = jpeg
+        self.etag = etag
+        self.updated = time.time()
+
+
+class ThumbnailCache:
+    """Thumbnail JPEGs by `thumb_key`, least recently used out first.
+
+    Bounded by payload bytes rather than entries. Each entry's ETag is a
+    hash of its JPEG, so a resent but unchanged still keeps its validator.
+    """
+
+    def __init__(self, max_bytes: int = THUMB_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: collections.OrderedDict[str, Thumbnail] = (
+            collections.OrderedDict()
+        )
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, key: str, jpeg: bytes) -> str:
+        """Stores a thumbnail and returns its ETag (without quotes)."""
+        etag = hashlib.blake2b(jpeg, digest_size=8).hexdigest()
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old.jpeg)
+            if old.etag == etag:
+                jpeg = old.jpeg
+        self._entries[key] = Thumbnail(jpeg, etag)
+        self.bytes += len(jpeg)
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted.jpeg)
+            self.evictions += 1
+        return etag
+
+    def lookup(
+        self, key: str, if_none_match: str = ""
+    ) -> tuple[Thumbnail | None, bool]:
+        """(thumbnail, still current in the browser) for one HTTP request."""
+        thumb = self._entries.get(key)
+        if thumb is None:
+            self.misses += 1
+            return None, False
+        self._entries.move_to_end(key)
+        self.hits += 1
+        fresh = f'"{thumb.etag}"' in if_none_match or if_none_match.strip() == "*"
+        self.not_modified += fresh
+        return thumb, fresh
+
+    def stats(self) -> dict[str, float | int]:
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "kb": round(self.bytes / 1024, 1),
+            "max_kb": round(self.max_bytes / 1024),
+            "hit_rate": round(100 * self.hits / requests, 1) if requests else 0,
+            "not_modified_pct": (
+                round(100 * self.not_modified / self.hits, 1) if self.hits else 0
+            ),
+            "evictions": self.evictions,
+        }
+
+
+THUMBNAILS = ThumbnailCache()
+
+
+class ThumbnailExchange:
+    """Occasional camera stills for the roster, asked for over data packets.
+
+    Viewers never subscribe to a camera for its thumbnail. Every
+    `THUMB_INTERVAL_S` they ask each unit on their visible roster page for
+    it, naming the version they already hold; the unit answers from the
+    newest captured frame (waking a paused camera for one still) and only
+    to those holding an older version. A unit encodes at most once per
+    interval however many viewers ask, and keeps the previous JPEG while
+    the picture has not visibly changed. Received stills go to the shared
+    `THUMBNAILS` cache under the room's name, and `on_thumbnail` gets
+    (sid, version) for the roster, the ETag plus a suffix once the still
+    had to be fetched again after an eviction.
+    """
+
+    def __init__(self, room: rtc.Room, registry: TrackRegistry):
+        self._room = room
+        self._registry = registry
+        self.camera: CameraDevice | None = None
+        self.on_thumbnail = None
+        self._wanted: dict[str, set[str]] = {}
+        self._held: dict[str, int] = {}
+        self._reloads: dict[str, int] = {}
+        self._version = 0
+        self._jpeg = b""
+        self._signature: np.ndarray | None = None
+        self._encoded_at = -THUMB_INTERVAL_S
+        self._requesters: dict[str, int] = {}
+        self._answer_task: asyncio.Task | None = None
+        self._poll_task: asyncio.Task | None = None
+        self._handlers: list[tuple[str, object]] = []
+        self._tasks: set[asyncio.Task] = set()
+        self.encode_ms = LatencyWindow(256)
+        self.requests_sent = 0
+        self.requests_received = 0
+        self.frames_sent = 0
+        self.frames_received = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.encodes = 0
+        self.unchanged = 0
+
+    def attach(self):
+        self._handlers.append(
+            ("data_received", self._room.on("data_received", self._on_data_received))
+        )
+        if self._poll_task is None:
+            self._poll_task = asyncio.create_task(self._poll_forever())
+
+    def _unbind(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+
+    def rebind(self, room: rtc.Room):
+        self._unbind()
+        self._room = room
+        self._held.clear()
+        self._reloads.clear()
+        self.attach()
+
+    def close(self):
+        self._unbind()
+        for task in (self._poll_task, self._answer_task, *self._tasks):
+            if task is not None:
+                task.cancel()
+        self._poll_task = self._answer_task = None
+
+    def want(self, viewer: str, sids: list[str]):
+        """Roster rows `viewer` is showing; newly shown ones are asked at once."""
+        shown = set(sids)
+        before = set().union(*self._wanted.values())
+        if shown:
+            self._wanted[viewer] = shown
+        else:
+            self._wanted.pop(viewer, None)
+        for sid in shown - before:
+            self._request(sid)
+
+    def _request(self, sid: str):
+        record = self._registry.get(sid)
+        pub = record.publication(rtc.TrackSource.SOURCE_CAMERA) if record else None
+        if pub is None:
+            return
+        key = thumb_key(self._room.name, pub.sid)
+        held = self._held.get(pub.sid, 0) if key in THUMBNAILS else 0
+        self.requests_sent += 1
+        self._send(_HEADER.pack(THUMB_VERSION, REQUEST, held), [record.identity])
+
+    async def _poll_forever(self):
+        while True:
+            await asyncio.sleep(THUMB_INTERVAL_S)
+            for sid in set().union(*self._wanted.values()):
+                self._request(sid)
+
+    def _send(self, packet: bytes, destinations: list[str]):
+        task = asyncio.create_task(
+            self._room.local_participant.publish_data(
+                packet,
+                reliable=True,
+                destination_identities=destinations,
+                topic=THUMB_TOPIC,
+            )
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._sent)
+
+    def _sent(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Thumbnail packet not sent: {task.exception()}")
+
+    def _on_data_received(self, packet: rtc.DataPacket):
+        if packet.topic != THUMB_TOPIC or packet.participant is None:
+            return
+        if len(packet.data) < _HEADER.size:
+            return
+        version, kind, number = _HEADER.unpack_from(packet.data)
+        if version != THUMB_VERSION:
+            return
+        if kind == REQUEST:
+            self._on_request(packet.participant.identity, number)
+        elif kind == FRAME:
+            self._on_frame(packet.participant, number, packet.data[_HEADER.size :])
+
+    def _on_request(self, identity: str, held: int):
+        if self.camera is None:
+            return
+        self.requests_received += 1
+        self._requesters[identity] = held
+        if self._answer_task is None:
+            self._answer_task = asyncio.create_task(self._answer())
+
+    def _on_frame(self, p: rtc.RemoteParticipant, number: int, jpeg: bytes):
+        self.frames_received += 1
+        self.bytes_received += len(jpeg)
+        pub = self._registry.publication(p.sid, rtc.TrackSource.SOURCE_CAMERA)
+        if pub is None or not jpeg:
+            return
+        key = thumb_key(self._room.name, pub.sid)
+        if pub.sid in self._held and key not in THUMBNAILS:
+            # Evicted and sent again: a browser may have cached a 404 for the
+            # old URL, and the same bytes would give the same ETag.
+            self._reloads[pub.sid] = self._reloads.get(pub.sid, 0) + 1
+        etag = THUMBNAILS.put(key, jpeg)
+        self._held[pub.sid] = number
+        reloads = self._reloads.get(pub.sid)
+        if self.on_thumbnail is not None:
+            self.on_thumbnail(p.sid, f"{etag}-{reloads}" if reloads else etag)
+
+    async def _answer(self):
+        try:
+            await asyncio.sleep(THUMB_BATCH_S)
+            if time.monotonic() - self._encoded_at >= THUMB_INTERVAL_S:
+                await self._refresh()
+        except Exception as e:
+            logging.exception(f"Thumbnail capture failed: {e}")
+        finally:
+            self._answer_task = None
+        requesters, self._requesters = self._requesters, {}
+        stale = [who for who, held in requesters.items() if held != self._version]
+        if not self._jpeg or not stale:
+            return
+        self.frames_sent += len(stale)
+        self.bytes_sent += len(self._jpeg) * len(stale)
+        header = _HEADER.pack(THUMB_VERSION, FRAME, self._version)
+        self._send(header + self._jpeg, stale)
+
+    async def _refresh(self):
+        """Encodes the newest camera frame, unless it looks like the last one."""
+        camera = self.camera
+        if camera.paused or camera.latest is None:
+            camera.still()
+            await asyncio.sleep(THUMB_STILL_WAIT_S)
+        bgr = camera.latest
+        if bgr is None:
+            return
+        self._encoded_at = time.monotonic()
+        rgb = bgr[:, :, ::-1]
+        grid = signature(rgb)
+        if self._jpeg and not changed(self._signature, grid):
+            self.unchanged += 1
+            return
+        started = time.perf_counter()
+        jpeg = await asyncio.get_running_loop().run_in_executor(
+            ENCODER_POOL,
+            encode_jpeg,
+            decimate(rgb, THUMB_WIDTH, THUMB_HEIGHT),
+            THUMB_WIDTH,
+            THUMB_HEIGHT,
+        )
+        self.encode_ms.record((time.perf_counter() - started) * 1000)
+        self.encodes += 1
+        if len(jpeg) + _HEADER.size > THUMB_MAX_BYTES:
+            logging.warning(f"Thumbnail of {len(jpeg)} bytes is too large to send.")
+            return
+        self._jpeg = jpeg
+        self._signature = grid
+        self._version = (self._version + 1) & 0xFFFFFFFF or 1
+
+    def stats(self) -> dict[str, float | int]:
+        return {
+            "requests_sent": self.requests_sent,
+            "requests_received": self.requests_received,
+            "frames_sent": self.frames_sent,
+            "frames_received": self.frames_received,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "encodes": self.encodes,
+            "unchanged": self.unchanged,
+            "encode_ms": self.encode_ms.summary(),
+        }
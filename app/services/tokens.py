@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+import time
+import weakref
+from datetime import timedelta
+from livekit import api
+from app.services.floor import FLOOR_PRIORITIES
+from app.services.metrics import Counter, Summary
+from app.services.stats import LatencyWindow
+
+TOKEN_TTL_S = 6 * 3600
+# Re-mint a cached token once it has less than this left.
+TOKEN_REFRESH_S = 15 * 60
+
+# Stands for "any identity" in an allow-listed room.
+ANY_IDENTITY = "*"
+
+TOKENS = Counter("ptt_tokens_total", "Access token requests by cache result.")
+MINT_US = LatencyWindow()
+Summary("ptt_token_mint_us", "Time to sign one access token.", MINT_US)
+
+
+def token_allow_list(spec: str) -> dict[str, frozenset[str]]:
+    """Parses "room,room/identity,..." as set in LIVEKIT_TOKEN_ROOMS.
+
+    A bare room (or room/*) allows any identity in it and is stored as
+    ANY_IDENTITY; room/identity entries allow the identities listed for
+    that room, and are the only way to allow a reserved identity.
+    """
+    listed: dict[str, set[str]] = {}
+    for item in spec.split(","):
+        room, _, identity = item.partition("/")
+        room, identity = room.strip(), identity.strip()
+        if room:
+            listed.setdefault(room, set()).add(identity or ANY_IDENTITY)
+    return {room: frozenset(identities) for room, identities in listed.items()}
+
+
+class TokenLease:
+    """A session's token provider for one room and identity.
+
+    Passed as `RoomSession(token_provider=...)`; while it is alive the
+    issuer keeps its token refreshed, so a reconnect reads it from memory.
+    """
+
+    def __init__(self, issuer: "TokenIssuer", room: str, identity: str):
+        self.issuer = issuer
+        self.key = (room, identity)
+
+    async def __call__(self) -> str:
+        return self.issuer.token(*self.key)
+
+
+class TokenIssuer:
+    """Mints LiveKit access tokens in process and caches them until near expiry.
+
+    Tokens are cached per (room, identity). A background task re-signs the
+    ones held by live leases `refresh_s` before they expire, so connects and
+    reconnects are a dict lookup; a token nobody holds is dropped at expiry.
+    With an `allowed` list (see `token_allow_list`) only those rooms and
+    identities get a token; without one the issuer signs whatever it is
+    asked for, which only trusted callers such as the headless runner do.
+    `reserved` identities, by default the ones with floor priority, never
+    come from an open room: they need their own room/identity entry.
+    """
+
+    def __init__(
+        self,
+        api_key: str = "",
+        api_secret: str = "",
+        ttl_s: float = TOKEN_TTL_S,
+        refresh_s: float = TOKEN_REFRESH_S,
+        allowed: dict[str, frozenset[str]] | None = None,
+        reserved: frozenset[str] = frozenset(),
+    ):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.allowed = allowed
+        self.reserved = reserved
+        self.ttl_s = ttl_s
+        self.refresh_s = min(refresh_s, ttl_s / 2)
+        self._cache: dict[tuple[str, str], tuple[str, float]] = {}
+        self._leases: "weakref.WeakSet[TokenLease]" = weakref.WeakSet()
+        self._task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshed = 0
+        self.denied = 0
+
+    @classmethod
+    def from_env(cls) -> "TokenIssuer":
+        rooms = os.environ.get("LIVEKIT_TOKEN_ROOMS", "")
+        return cls(
+            os.environ.get("LIVEKIT_API_KEY", ""),
+            os.environ.get("LIVEKIT_API_SECRET", ""),
+            allowed=token_allow_list(rooms) if rooms.strip() else None,
+            reserved=frozenset(FLOOR_PRIORITIES),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
+    @property
+    def restricted(self) -> bool:
+        """Whether only allow-listed rooms and identities get tokens."""
+        return self.allowed is not None
+
+    def permits(self, room: str, identity: str) -> bool:
+        if self.allowed is None:
+            return True
+        identities = self.allowed.get(room, frozenset())
+        if identity in identities:
+            return True
+        return ANY_IDENTITY in identities and identity not in self.reserved
+
+    def _check(self, room: str, identity: str):
+        if not self.configured:
+            raise RuntimeError("LIVEKIT_API_KEY and LIVEKIT_API_SECRET are not set")
+        if not self.permits(room, identity):
+            self.denied += 1
+            TOKENS.inc(result="denied")
+            raise PermissionError(f"No token is issued for {identity} in {room}")
+
+    def verify(self, token: str) -> tuple[str, str] | None:
+        """(room, identity) of a token signed with our key, unexpired, or None."""
+        if not self.configured:
+            return None
+        try:
+            claims = api.TokenVerifier(self.api_key, self.api_secret).verify(token)
+        except Exception:
+            return None
+        room = claims.video.room if claims.video else ""
+        if not room or not claims.identity:
+            return None
+        return room, claims.identity
+
+    def _mint(self, room: str, identity: str) -> str:
+        started = time.perf_counter()
+        token = (
+            api.AccessToken(self.api_key, self.api_secret)
+            .with_identity(identity)
+            .with_name(identity)
+            .with_ttl(timedelta(seconds=self.ttl_s))
+            .with_grants(api.VideoGrants(room_join=True, room=room))
+            .to_jwt()
+        )
+        self._cache[(room, identity)] = (token, time.time() + self.ttl_s)
+        MINT_US.record((time.perf_counter() - started) * 1e6)
+        return token
+
+    def token(self, room: str, identity: str) -> str:
+        """A signed join token, from the cache unless it is close to expiry."""
+        self._check(room, identity)
+        cached = self._cache.get((room, identity))
+        if cached is not None and cached[1] - time.time() > self.refresh_s:
+            self.hits += 1
+            TOKENS.inc(result="hit")
+            return cached[0]
+        self.misses += 1
+        TOKENS.inc(result="miss")
+        return self._mint(room, identity)
+
+    def lease(self, room: str, identity: str) -> TokenLease:
+        self._check(room, identity)
+        lease = TokenLease(self, room, identity)
+        self._leases.add(lease)
+        self.start()
+        return lease
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh_forever())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _refresh_forever(self):
+        while True:
+            await asyncio.sleep(self.refresh_s / 4)
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.exception(f"Token refresh failed: {e}")
+
+    def refresh(self):
+        """Re-signs leased tokens nearing expiry and drops expired, unleased ones."""
+        now = time.time()
+        leased = {lease.key for lease in self._leases}
+        for key in leased:
+            cached = self._cache.get(key)
+            if cached is None or cached[1] - now <= self.refresh_s * 2:
+                self._mint(*key)
+                self.refreshed += 1
+                TOKENS.inc(result="refresh")
+        for key, (_, expires) in list(self._cache.items()):
+            if key not in leased and expires <= now:
+                del self._cache[key]
+
+    def stats(self) -> dict[str, float]:
+        requests = self.hits + self.misses
+        return {
+            "cached": len(self._cache),
+            "leases": len(self._leases),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshed": self.refreshed,
+            "denied": self.denied,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+            "mint_us": MINT_US.summary(),
+        }
+
+
+ISSUER = TokenIssuer.from_env()
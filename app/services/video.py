@@ -0,0 +1,225 @@
+import asyncio
+import collections
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from livekit import rtc
+from app.services.stats import LatencyWindow
+
+TILE_WIDTH = 480
+TILE_HEIGHT = 270
+MAX_FPS = 24.0
+MIN_FPS = 2.0
+JPEG_QUALITY = 70
+
+ENCODER_POOL = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 2), thread_name_prefix="video-encode"
+)
+
+
+def frame_array(frame: rtc.VideoFrame) -> np.ndarray:
+    """Views an RGB24 frame as a (height, width, 3) array without copying."""
+    return np.frombuffer(frame.data, dtype=np.uint8).reshape(
+        frame.height, frame.width, 3
+    )
+
+
+def decimate(rgb: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Strided view that keeps at most twice the target size in each dimension."""
+    step_y = max(1, rgb.shape[0] // (height * 2))
+    step_x = max(1, rgb.shape[1] // (width * 2))
+    return rgb[::step_y, ::step_x]
+
+
+def encode_jpeg(rgb: np.ndarray, width: int, height: int) -> bytes:
+    from PIL import Image
+
+    image = Image.fromarray(np.ascontiguousarray(rgb), "RGB")
+    image.thumbnail((width, height), Image.Resampling.BILINEAR)
+    out = io.BytesIO()
+    image.save(out, format="JPEG", quality=JPEG_QUALITY)
+    return out.getvalue()
+
+
+class VideoFeed:
+    """Turns one subscribed camera track into JPEG frames for a grid tile.
+
+    Only the newest decoded frame is kept; anything older is dropped before
+    it is encoded. The frame rate follows the fastest viewer: it backs off
+    when no viewer read the last encoded frame and creeps back up once one
+    keeps up. Slower viewers skip frames rather than hold the others back.
+    """
+
+    def __init__(
+        self,
+        track: rtc.Track,
+        width: int = TILE_WIDTH,
+        height: int = TILE_HEIGHT,
+        stream: rtc.VideoStream | None = None,
+    ):
+        self.width = width
+        self.height = height
+        self._stream = stream or rtc.VideoStream(
+            track, capacity=1, format=rtc.VideoBufferType.RGB24
+        )
+        self._latest: rtc.VideoFrame | None = None
+        self._frame_ready = asyncio.Event()
+        self._encoded = asyncio.Condition()
+        self.jpeg = b""
+        self.seq = 0
+        self._read_seq = 0
+        self.viewers = 0
+        self.target_fps = MAX_FPS
+        self.encode_ms = LatencyWindow(256)
+        self.frames_decoded = 0
+        self.frames_dropped = 0
+        self.frames_delivered = 0
+        self._delivered_window: collections.deque[float] = collections.deque()
+        self.paused = False
+        self._tasks = [
+            asyncio.create_task(self._read()),
+            asyncio.create_task(self._encode()),
+        ]
+
+    async def _read(self):
+        async for event in self._stream:
+            self.frames_decoded += 1
+            if self._latest is not None:
+                self.frames_dropped += 1
+            self._latest = event.frame
+            self._frame_ready.set()
+
+    async def _encode(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._frame_ready.wait()
+            self._frame_ready.clear()
+            frame, self._latest = self._latest, None
+            if frame is None:
+                continue
+            if self.paused or self.viewers == 0:
+                self.frames_dropped += 1
+                continue
+            if self.seq and self._read_seq < self.seq:
+                self.target_fps = max(MIN_FPS, self.target_fps * 0.8)
+            else:
+                self.target_fps = min(MAX_FPS, self.target_fps + 1)
+            started = time.perf_counter()
+            rgb = decimate(frame_array(frame), self.width, self.height)
+            try:
+                jpeg = await loop.run_in_executor(
+                    ENCODER_POOL, encode_jpeg, rgb, self.width, self.height
+                )
+            except Exception as e:
+                logging.exception(f"Failed to encode video frame: {e}")
+                continue
+            encode_s = time.perf_counter() - started
+            self.encode_ms.record(encode_s * 1000)
+            async with self._encoded:
+                self.jpeg = jpeg
+                self.seq += 1
+                self._encoded.notify_all()
+            await asyncio.sleep(max(0.0, 1 / self.target_fps - encode_s))
+
+    async def frames(self):
+        """Yields each newly encoded frame; a slow viewer simply skips frames."""
+        last = 0
+        self.viewers += 1
+        try:
+            while True:
+                async with self._encoded:
+                    await self._encoded.wait_for(lambda last=last: self.seq > last)
+                    last = self.seq
+                    jpeg = self.jpeg
+                self._read_seq = max(self._read_seq, last)
+                self._mark_delivered()
+                yield jpeg
+        finally:
+            self.viewers -= 1
+
+    def _mark_delivered(self):
+        now = time.monotonic()
+        self.frames_delivered += 1
+        self._delivered_window.append(now)
+        while self._delivered_window and now - self._delivered_window[0] > 1.0:
+            self._delivered_window.popleft()
+
+    def stats(self) -> dict:
+        return {
+            "encode_ms": self.encode_ms.summary(),
+            "delivered_fps": len(self._delivered_window),
+            "target_fps": round(self.target_fps, 1),
+            "decoded": self.frames_decoded,
+            "delivered": self.frames_delivered,
+            "dropped": self.frames_dropped,
+            "viewers": self.viewers,
+        }
+
+    async def aclose(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._stream.aclose()
+
+
+class VideoFeeds:
+    """Starts and stops a VideoFeed for every subscribed remote camera track.
+
+    Feeds belong to the session's own subscriptions: another session
+    subscribed to the same track gets its own feed, and unsubscribing here
+    never closes it.
+    """
+
+    def __init__(self, room: rtc.Room):
+        self._room = room
+        self.publications: dict[str, rtc.RemoteTrackPublication] = {}
+        self.feeds: dict[str, VideoFeed] = {}
+        self._handlers: list[tuple[str, object]] = []
+
+    def attach(self):
+        for event, handler in (
+            ("track_subscribed", self._on_track_subscribed),
+            ("track_unsubscribed", self._on_track_unsubscribed),
+        ):
+            self._handlers.append((event, self._room.on(event, handler)))
+
+    def _on_track_subscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        if pub.source != rtc.TrackSource.SOURCE_CAMERA or pub.sid in self.feeds:
+            return
+        self.feeds[pub.sid] = VideoFeed(track)
+        self.publications[pub.sid] = pub
+
+    def _on_track_unsubscribed(
+        self,
+        track: rtc.Track,
+        pub: rtc.RemoteTrackPublication,
+        p: rtc.RemoteParticipant,
+    ):
+        self._stop(pub.sid)
+
+    def _stop(self, sid: str):
+        self.publications.pop(sid, None)
+        feed = self.feeds.pop(sid, None)
+        if feed is not None:
+            asyncio.create_task(feed.aclose())
+
+    def rebind(self, room: rtc.Room):
+        """Drops feeds of the old room and follows subscriptions on a new one."""
+        self.close()
+        self._room = room
+        self.attach()
+
+    def close(self):
+        for event, handler in self._handlers:
+            self._room.off(event, handler)
+        self._handlers.clear()
+        for sid in list(self.publications):
+            self._stop(sid)
@@ -0,0 +1,130 @@
+import logging
+from livekit import rtc
+from app.services.video import TILE_HEIGHT, TILE_WIDTH, VideoFeeds
+
+LOW = rtc.VideoQuality.VIDEO_QUALITY_LOW
+MEDIUM = rtc.VideoQuality.VIDEO_QUALITY_MEDIUM
+HIGH = rtc.VideoQuality.VIDEO_QUALITY_HIGH
+
+# Typical 720p simulcast ladder: (height, kbps) per layer. Only the layer
+# choice and the savings estimates use it; what arrives is measured.
+LAYERS = {LOW: (180, 150), MEDIUM: (360, 500), HIGH: (720, 1700)}
+
+VIEWPORT_SCRIPT = """
+Array.from(document.querySelectorAll('[data-video-track]')).map((el) => {
+  const r = el.getBoundingClientRect();
+  const dpr = window.devicePixelRatio || 1;
+  return {
+    track: el.dataset.videoTrack,
+    width: Math.round(r.width * dpr),
+    height: Math.round(r.height * dpr),
+    visible: !document.hidden && r.width > 0 && r.bottom > 0 && r.right > 0
+      && r.top < window.innerHeight && r.left < window.innerWidth,
+  };
+})
+"""
+
+
+def quality_for(height: int, visible: bool) -> int:
+    """Lowest simulcast layer that still covers the rendered tile height."""
+    if not visible or height <= LAYERS[LOW][0]:
+        return LOW
+    if height <= LAYERS[MEDIUM][0]:
+        return MEDIUM
+    return HIGH
+
+
+class ViewportController:
+    """Matches each subscribed camera's layer and feed size to its rendered tiles.
+
+    Every browser watching the session reports its own tiles. A camera gets
+    the layer and feed size of its largest visible tile; one that no viewer
+    shows (off screen, background tab, not rendered) drops to the lowest
+    layer and its feed stops encoding.
+    """
+
+    def __init__(self):
+        self._layers: dict[str, int] = {}
+        self._visible: dict[str, bool] = {}
+        self._tiles: dict[str, dict[str, dict]] = {}
+
+    def apply(self, feeds: VideoFeeds, tiles: list[dict], viewer: str = ""):
+        """Records one viewer's tiles and applies what all viewers need together."""
+        before = self._tiles.get(viewer, {})
+        after = {tile.get("track"): tile for tile in tiles if tile.get("track")}
+        self._tiles[viewer] = after
+        changed = {
+            sid
+            for sid in before.keys() | after.keys()
+            if before.get(sid) != after.get(sid)
+        }
+        self._update(feeds, changed)
+
+    def forget(self, feeds: VideoFeeds, viewer: str):
+        """Drops a viewer that stopped watching."""
+        tiles = self._tiles.pop(viewer, None)
+        if tiles:
+            self._update(feeds, set(tiles))
+
+    def _update(self, feeds: VideoFeeds, changed: set[str]):
+        """Re-applies the cameras whose tiles changed, and any new ones."""
+        publications = feeds.publications
+        for sid in self._layers.keys() - publications.keys():
+            del self._layers[sid]
+            self._visible.pop(sid, None)
+        for sid in changed | (publications.keys() - self._layers.keys()):
+            pub = publications.get(sid)
+            if pub is None:
+                continue
+            shown = [
+                tiles[sid]
+                for tiles in self._tiles.values()
+                if sid in tiles and tiles[sid].get("visible")
+            ]
+            visible = bool(shown)
+            width = max((int(tile.get("width") or 0) for tile in shown), default=0)
+            height = max((int(tile.get("height") or 0) for tile in shown), default=0)
+            layer = quality_for(height, visible)
+            if self._layers.get(sid) != layer:
+                try:
+                    pub.set_video_quality(layer)
+                except ValueError:
+                    pass
+                except Exception as e:
+                    logging.exception(f"Failed to set video quality: {e}")
+                self._layers[sid] = layer
+            self._visible[sid] = visible
+            feed = feeds.feeds.get(sid)
+            if feed is not None:
+                feed.paused = not visible
+                if visible:
+                    feed.width = min(max(width, 160), TILE_WIDTH * 2)
+                    feed.height = min(max(height, 90), TILE_HEIGHT * 2)
+
+    def savings(
+        self, measured: dict[str, dict[str, float]] | None = None
+    ) -> dict[str, float]:
+        """Measured inbound video, and estimated savings against the top layer.
+
+        `measured` is MetricsSampler.inbound_video for the room: `kbps` and
+        `decode_ms` (decoder time per second) add up what the subscribed
+        cameras really cost. The `_est` fields price each camera's layer at
+        the nominal LAYERS ladder against all of them at the top one.
+        """
+        measured = measured or {}
+        rates = [measured[sid] for sid in self._layers if sid in measured]
+        tracks = len(self._layers)
+        full_kbps = tracks * LAYERS[HIGH][1]
+        used_kbps = sum(LAYERS[layer][1] for layer in self._layers.values())
+        full_pixels = tracks * LAYERS[HIGH][0] ** 2
+        used_pixels = sum(LAYERS[layer][0] ** 2 for layer in self._layers.values())
+        return {
+            "tracks": tracks,
+            "paused": sum(1 for visible in self._visible.values() if not visible),
+            "kbps": round(sum(rate["kbps"] for rate in rates), 1),
+            "decode_ms": round(sum(rate["decode_ms"] for rate in rates), 1),
+            "saved_kbps_est": full_kbps - used_kbps,
+            "decode_saved_pct_est": (
+                round(100 * (1 - used_pixels / full_pixels), 1) if full_pixels else 0.0
+            ),
+        }
@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+import numpy as np
+from app.services.mic import FRAME_SAMPLES, SAMPLE_RATE
+from app.services.ptt import PttTrace
+from app.services.stats import LatencyWindow
+
+VOX_HANG_MS = 800
+VOX_ATTACK_FRAMES = 2
+VOX_MARGIN_DB = 9.0
+VOX_MIN_DB = -55.0
+VOX_MAX_ZCR = 0.35
+GATE_MARGIN_DB = 6.0
+GATE_FLOOR_DB = -24.0
+# Opus voice at LiveKit's default mic bitrate; a muted track sends nothing.
+MIC_KBPS = 32
+
+
+def frame_levels(pcm: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Per 10 ms frame: RMS level in dBFS and zero-crossing rate."""
+    frames = pcm[: pcm.size - pcm.size % FRAME_SAMPLES].reshape(-1, FRAME_SAMPLES)
+    x = frames.astype(np.float32) / 32768.0
+    rms = np.sqrt(np.mean(x * x, axis=1))
+    db = 20.0 * np.log10(rms + 1e-9)
+    zcr = np.mean(np.signbit(x[:, 1:]) != np.signbit(x[:, :-1]), axis=1)
+    return db, zcr
+
+
+class VoiceDetector:
+    """Energy-over-noise-floor VAD with attack and hang time.
+
+    A frame counts as voice when it is `VOX_MARGIN_DB` above the tracked
+    noise floor, above `VOX_MIN_DB` and not hiss-like (high zero-crossing
+    rate). The detector opens after `VOX_ATTACK_FRAMES` voiced frames in a
+    row and closes after `hang_ms` without voice, so pauses between words
+    do not chop the transmission.
+    """
+
+    def __init__(self, hang_ms: int = VOX_HANG_MS):
+        self.hang_frames = max(1, hang_ms // 10)
+        self.floor_db = -60.0
+        self.open = False
+        self._voiced_run = 0
+        self._quiet_run = 0
+
+    def update(self, db: np.ndarray, zcr: np.ndarray) -> np.ndarray:
+        """Feeds frame levels in order; returns the voiced mask."""
+        voiced = (db > self.floor_db + VOX_MARGIN_DB) & (db > VOX_MIN_DB)
+        voiced &= zcr < VOX_MAX_ZCR
+        for level, is_voice in zip(db.tolist(), voiced.tolist(), strict=True):
+            if is_voice:
+                self.floor_db += (level - self.floor_db) * 0.001
+                self._voiced_run += 1
+                self._quiet_run = 0
+                if self._voiced_run >= VOX_ATTACK_FRAMES:
+                    self.open = True
+            else:
+                rate = 0.3 if level < self.floor_db else 0.05
+                self.floor_db += (level - self.floor_db) * rate
+                self._voiced_run = 0
+                self._quiet_run += 1
+                if self._quiet_run >= self.hang_frames:
+                    self.open = False
+        return voiced
+
+
+class NoiseGate:
+    """Attenuates frames near the noise floor, ramping gain across each frame."""
+
+    def __init__(self):
+        self._gain = 1.0
+        self._closed_gain = 10 ** (GATE_FLOOR_DB / 20)
+
+    def apply(self, pcm: np.ndarray, db: np.ndarray, floor_db: float) -> np.ndarray:
+        if not db.size:
+            return pcm
+        targets = np.where(db > floor_db + GATE_MARGIN_DB, 1.0, self._closed_gain)
+        starts = np.concatenate(([self._gain], targets[:-1]))
+        self._gain = float(targets[-1])
+        if (starts == targets).all():
+            if self._gain == 1.0:
+                return pcm
+            gains = np.repeat(targets.astype(np.float32), FRAME_SAMPLES)
+        else:
+            ramps = np.linspace(starts, targets, FRAME_SAMPLES, axis=1)
+            gains = ramps.astype(np.float32).reshape(-1)
+        whole = gains.size
+        out = pcm.astype(np.float32)
+        out[:whole] *= gains
+        return out.astype(np.int16)
+
+
+class VoxController:
+    """Voice-operated transmit and noise gating on the captured mic PCM.
+
+    Installed as the mic pipeline's analyzer, so it sees every captured
+    block before pre-roll and publishing. With `vox` on, a voice onset goes
+    through the same floor/PTT path as a button press and the hang timeout
+    through the same release; the gate, when on, only shapes the audio.
+    The attack frames and unmute round trip are recovered by the pre-roll
+    buffer when the session has one. Presses and releases in flight are
+    cancelled by `close`; `keyed` tells the session a release is still owed.
+    """
+
+    def __init__(
+        self,
+        session,
+        vox: bool = True,
+        gate: bool = False,
+        hang_ms: int = VOX_HANG_MS,
+    ):
+        self._session = session
+        self.vox = vox
+        self.gate = NoiseGate() if gate else None
+        self.detector = VoiceDetector(hang_ms)
+        self.talking = False
+        # Set when the floor turned VOX down; cleared once the voice stops,
+        # so one utterance asks for the floor once.
+        self.denied = False
+        self._changed: set[asyncio.Event] = set()
+        self._tasks: set[asyncio.Task] = set()
+        # Per process() call, which gets however many frames the mic block had.
+        self.process_us = LatencyWindow()
+        self.total_us = 0.0
+        self.frames = 0
+        self.voiced_frames = 0
+        self.open_frames = 0
+        self.transmissions = 0
+
+    def process(self, pcm: np.ndarray) -> np.ndarray:
+        started = time.perf_counter()
+        db, zcr = frame_levels(pcm)
+        voiced = self.detector.update(db, zcr)
+        if self.gate is not None:
+            pcm = self.gate.apply(pcm, db, self.detector.floor_db)
+        self.frames += db.size
+        self.voiced_frames += int(voiced.sum())
+        if self._session.ptt.transmitting:
+            self.open_frames += db.size
+        if not self.detector.open:
+            self.denied = False
+        if self.vox and not self.denied and self.detector.open != self.talking:
+            self._switch(self.detector.open)
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        self.process_us.record(elapsed_us)
+        self.total_us += elapsed_us
+        return pcm
+
+    @property
+    def keyed(self) -> bool:
+        """Whether VOX has the mic open, or is still opening or closing it."""
+        return self.talking or bool(self._tasks)
+
+    def _switch(self, talking: bool):
+        self.talking = talking
+        if talking:
+            self.transmissions += 1
+            self._spawn(self._start())
+        else:
+            self._spawn(self._stop())
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _start(self):
+        try:
+            trace = PttTrace()
+            if await self._session.start_talking(trace):
+                self._notify()
+                await self._session.ptt.finish_trace(trace)
+            else:
+                self.talking = False
+                self.denied = True
+        except Exception as e:
+            self.talking = False
+            logging.exception(f"VOX failed to open the mic: {e}")
+
+    async def _stop(self):
+        try:
+            await self._session.stop_talking()
+        except Exception as e:
+            logging.exception(f"VOX failed to close the mic: {e}")
+        self._notify()
+
+    def _notify(self):
+        for changed in self._changed:
+            changed.set()
+
+    async def updates(self):
+        """Yields whether the mic is open every time VOX opens or closes it."""
+        changed = asyncio.Event()
+        self._changed.add(changed)
+        try:
+            while self._session.vox is self:
+                await changed.wait()
+                changed.clear()
+                yield self._session.ptt.transmitting
+        finally:
+            self._changed.discard(changed)
+
+    def close(self):
+        self.talking = False
+        for task in self._tasks:
+            task.cancel()
+        self._notify()
+
+    def stats(self) -> dict[str, float]:
+        frames = max(1, self.frames)
+        open_ratio = self.open_frames / frames
+        per_frame_us = self.total_us / frames
+        return {
+            "cpu_us_per_frame": round(per_frame_us, 1),
+            "cpu_pct": round(
+                per_frame_us / (FRAME_SAMPLES / SAMPLE_RATE * 1e6) * 100, 3
+            ),
+            "voiced_pct": round(100 * self.voiced_frames / frames, 1),
+            "open_pct": round(100 * open_ratio, 1),
+            "saved_kbps": round(MIC_KBPS * (1 - open_ratio), 1),
+            "transmissions": self.transmissions,
+            "noise_floor_db": round(self.detector.floor_db, 1),
+        }
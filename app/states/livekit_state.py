@@ -1,7 +1,32 @@
 import reflex as rx
 import logging
-import asyncio
-from livekit import rtc
+from reflex.utils import format
+from app.services.access import MEDIA_KEYS
+from app.services.directory import (
+    ROSTER_ORDERS,
+    ROSTER_PAGE_SIZE,
+    has_next_page,
+    last_page,
+    page_bounds,
+)
+from app.services.mic import DEFAULT_PREROLL_MS
+from app.services.hub import HUB
+from app.services.metrics import SAMPLER
+from app.services.mixer import MIX_PLAYER_SCRIPT
+from app.services.ptt import PttTrace
+from app.services.session import RoomSession
+from app.services.telemetry import TELEMETRY_SCRIPT
+from app.services.thumbnails import THUMBNAILS
+from app.services.tokens import ISSUER
+from app.services.viewport import VIEWPORT_SCRIPT
+from app.services.vox import VOX_HANG_MS
+
+# The visible roster page lives in one var per slot, and a row keeps its slot
+# while it stays on the page, so a push re-sends the rows that changed and
+# the slot order instead of the whole page.
+ROSTER_SLOTS = tuple(f"roster_row_{i}" for i in range(ROSTER_PAGE_SIZE))
+# All a video card shows; speaking and telemetry flips leave the grid alone.
+VIDEO_FIELDS = ("sid", "identity", "video_track", "audio_subscribed")
 
 
 class LiveKitState(rx.State):
@@ -9,31 +34,113 @@ class LiveKitState(rx.State):
 
     livekit_url: str = ""
     token: str = ""
+    room_name: str = ""
+    identity: str = ""
+    # Browsers only get minted tokens for the rooms in LIVEKIT_TOKEN_ROOMS,
+    # and for a floor-priority identity only where it is listed by name.
+    token_issuer: bool = ISSUER.configured and ISSUER.restricted
     connection_status: str = "disconnected"
     status_message: str = "Ready to connect"
     is_talking: bool = False
     camera_active: bool = False
-    remote_participants: list[dict[str, str | bool]] = []
+    camera_stats: dict[str, float | str] = {}
+    roster_slots: list[int] = []
+    video_participants: list[dict[str, str | bool]] = []
+    roster_query: str = ""
+    roster_order: str = "name"
+    roster_offset: int = 0
+    roster_total: int = 0
+    roster_mode: str = "events"
+    roster_latency: dict[str, float] = {}
+    roster_flush_ms: int = 50
+    roster_push: dict[str, int] = {}
+    ptt_queue_delay: dict[str, float] = {}
+    ptt_latency: dict[str, dict[str, float]] = {}
+    preroll_ms: int = 0
+    viewport_savings: dict[str, float] = {}
+    recovery_ms: dict[str, float] = {}
+    startup_ms: dict[str, float] = {}
+    autosub: bool = False
+    autosub_stats: dict[str, float] = {}
+    pinned: list[str] = []
+    local_identity: str = ""
+    floor_holder: str = ""
+    floor_waiting: bool = False
+    floor_grant_ms: dict[str, float] = {}
+    listening: bool = False
+    mix_stats: dict[str, float] = {}
+    vox: bool = False
+    noise_gate: bool = False
+    vox_hang_ms: int = VOX_HANG_MS
+    vox_stats: dict[str, float] = {}
+    busy: bool = False
+    telemetry_stats: dict[str, float] = {}
+    journal: bool = False
+    journal_stats: dict[str, float | str] = {}
+    thumbnail_stats: dict[str, float] = {}
+    media_key: str = ""
     _monitoring: bool = False
-    _room: rtc.Room | None = None
-    _audio_publication: rtc.LocalTrackPublication | None = None
-    _video_publication: rtc.LocalTrackPublication | None = None
-    _audio_track: rtc.LocalAudioTrack | None = None
-    _video_track: rtc.LocalVideoTrack | None = None
+    _roster_pushes: int = 0
+    _row_slots: dict[str, int] = {}
+    _session: RoomSession | None = None
 
     @rx.var
     def is_connected(self) -> bool:
-        return self.connection_status == "connected"
+        return self.connection_status in ("connected", "reconnecting")
+
+    @rx.var
+    def is_reconnecting(self) -> bool:
+        return self.connection_status == "reconnecting"
 
     @rx.var
     def is_connecting(self) -> bool:
         return self.connection_status == "connecting"
 
+    @rx.var
+    def floor_busy(self) -> bool:
+        return self.floor_holder not in ("", self.local_identity)
+
+    @rx.var
+    def ptt_latency_label(self) -> str:
+        first_frame = self.ptt_latency.get("first_frame")
+        if not first_frame or not first_frame.get("count"):
+            return ""
+        return (
+            f"Press to audio: p50 {first_frame['p50']:.0f} ms"
+            f" · p95 {first_frame['p95']:.0f} ms"
+        )
+
+    @rx.var
+    def startup_label(self) -> str:
+        if "ready" not in self.startup_ms:
+            return ""
+        label = (
+            f"Ready in {self.startup_ms['ready']:.0f} ms"
+            f" (connect {self.startup_ms.get('connect', 0):.0f}"
+            f" · mic {self.startup_ms.get('mic_ready', 0):.0f}"
+        )
+        if "camera_ready" in self.startup_ms:
+            label += f" · camera {self.startup_ms['camera_ready']:.0f}"
+        return label + ")"
+
+    @rx.var
+    def roster_range(self) -> str:
+        first, last = page_bounds(self.roster_offset, self.roster_total)
+        return f"{first}-{last} of {self.roster_total}" if first else ""
+
+    @rx.var
+    def roster_has_prev(self) -> bool:
+        return self.roster_offset > 0
+
+    @rx.var
+    def roster_has_next(self) -> bool:
+        return has_next_page(self.roster_offset, self.roster_total)
+
     @rx.var
     def status_color(self) -> str:
         if self.connection_status == "connected":
             return "bg-emerald-500"
-        elif self.connection_status == "connecting":
+        elif self.connection_status in ("connecting", "reconnecting"):
             return "bg-yellow-500"
         elif self.connection_status == "error":
             return "bg-red-500"
@@ -48,172 +155,540 @@ class LiveKitState(rx.State):
     def set_token(self, token: str):
         self.token = token
 
+    @rx.event
+    def set_room_name(self, room_name: str):
+        self.room_name = room_name.strip()
+
+    @rx.event
+    def set_identity(self, identity: str):
+        self.identity = identity.strip()
+
+    @rx.event
+    def toggle_preroll(self):
+        self.preroll_ms = 0 if self.preroll_ms else DEFAULT_PREROLL_MS
+
+    @rx.event
+    def set_roster_mode(self, mode: str):
+        self.roster_mode = "poll" if mode == "poll" else "events"
+
+    @rx.event
+    def set_roster_query(self, query: str):
+        self.roster_query = query
+        self.roster_offset = 0
+        self._refresh_window()
+
+    @rx.event
+    def set_roster_order(self, order: str):
+        self.roster_order = order if order in ROSTER_ORDERS else "name"
+        self.roster_offset = 0
+        self._refresh_window()
+
+    @rx.event
+    def roster_page(self, step: int):
+        offset = self.roster_offset + step * ROSTER_PAGE_SIZE
+        self.roster_offset = max(0, min(offset, last_page(self.roster_total)))
+        self._refresh_window()
+
+    def _refresh_window(self) -> int:
+        """Sends the rows of the visible page that changed; returns how many."""
+        roster = self._session.roster if self._session else None
+        if roster is None:
+            return 0
+        directory = roster.directory
+        rows, total = directory.view(
+            self.roster_order, self.roster_query, self.roster_offset
+        )
+        if not rows and self.roster_offset and total:
+            self.roster_offset = last_page(total)
+            rows, total = directory.view(
+                self.roster_order, self.roster_query, self.roster_offset
+            )
+        sent = self._show_page(rows)
+        if total != self.roster_total:
+            self.roster_total = total
+        if self._session.thumbnails:
+            self._session.thumbnails.want(
+                self.router.session.client_token,
+                [row["sid"] for row in rows if row["has_video"]],
+            )
+        videos = [
+            {field: row[field] for field in VIDEO_FIELDS} for row in directory.videos()
+        ]
+        if videos != self.video_participants:
+            self.video_participants = videos
+        return sent
+
+    def _show_page(self, rows: list[dict[str, str | bool]]) -> int:
+        slots = self._row_slots
+        on_page = {row["sid"] for row in rows}
+        for sid in [sid for sid in slots if sid not in on_page]:
+            del slots[sid]
+        taken = set(slots.values())
+        free = (slot for slot in range(len(ROSTER_SLOTS)) if slot not in taken)
+        order, sent = [], 0
+        for row in rows:
+            slot = slots.get(row["sid"])
+            if slot is None:
+                slot = slots[row["sid"]] = next(free)
+            order.append(slot)
+            if getattr(self, ROSTER_SLOTS[slot]) != row:
+                setattr(self, ROSTER_SLOTS[slot], row)
+                sent += 1
+        if order != self.roster_slots:
+            self.roster_slots = order
+        return sent
+
+    @rx.event
+    def set_roster_flush_ms(self, value: str):
+        try:
+            self.roster_flush_ms = max(0, int(value))
+        except ValueError:
+            pass
+
+    @rx.event
+    def toggle_autosub(self):
+        """Switches remote audio between manual toggles and active-speaker mode."""
+        self.autosub = not self.autosub
+        if self._session:
+            self.autosub = self._session.set_autosub(self.autosub)
+        self._refresh_autosub()
+
+    @rx.event
+    def toggle_pin(self, identity: str):
+        """Keeps a participant's mic subscribed regardless of who is talking."""
+        if not self._session or not self._session.autosub:
+            return
+        self._session.autosub.toggle_pin(identity)
+        self._refresh_autosub()
+
+    @rx.event
+    def toggle_journal(self):
+        """Starts or stops recording room and PTT events for replay."""
+        self.journal = not self.journal
+        if self._session:
+            self.journal = self._session.set_journal(self.journal)
+        self.refresh_journal_stats()
+
+    @rx.event
+    def refresh_journal_stats(self, _tick: str = ""):
+        journal = self._session.journal if self._session else None
+        stats = journal.stats() if journal else {}
+        if stats != self.journal_stats:
+            self.journal_stats = stats
+
+    @rx.event
+    def refresh_thumbnail_stats(self, _tick: str = ""):
+        thumbnails = self._session.thumbnails if self._session else None
+        stats = THUMBNAILS.stats() if thumbnails else {}
+        if stats != self.thumbnail_stats:
+            self.thumbnail_stats = stats
+
+    def _refresh_autosub(self):
+        autosub = self._session.autosub if self._session else None
+        stats = autosub.stats() if autosub else {}
+        pinned = sorted(autosub.pinned) if autosub else []
+        if stats != self.autosub_stats:
+            self.autosub_stats = stats
+        if pinned != self.pinned:
+            self.pinned = pinned
+
+    @rx.event
+    def refresh_camera_stats(self, _tick: str = ""):
+        camera = self._session.camera if self._session else None
+        stats = camera.stats() if camera else {}
+        if stats != self.camera_stats:
+            self.camera_stats = stats
+
+    @rx.event
+    def toggle_vox(self):
+        """Switches between hold-to-talk and voice-operated transmit."""
+        self.vox = not self.vox
+        return self._apply_vox()
+
+    @rx.event
+    def toggle_noise_gate(self):
+        self.noise_gate = not self.noise_gate
+        return self._apply_vox()
+
+    @rx.event
+    def set_vox_hang_ms(self, value: str):
+        try:
+            self.vox_hang_ms = max(100, int(value))
+        except ValueError:
+            return
+        return self._apply_vox()
+
+    def _apply_vox(self):
+        if not self._session or self._session.mic is None:
+            return
+        self.vox = self._session.set_vox(self.vox, self.noise_gate, self.vox_hang_ms)
+        self._refresh_vox()
+        if self.vox:
+            return LiveKitState.watch_vox
+
+    @rx.event
+    def refresh_vox_stats(self, _tick: str = ""):
+        self._refresh_vox()
+
+    def _refresh_vox(self):
+        vox = self._session.vox if self._session else None
+        self.vox_stats = vox.stats() if vox else {}
+
+    @rx.event
+    def toggle_busy(self):
+        """Marks this unit busy, or available again, in everyone's roster."""
+        self.busy = not self.busy
+        telemetry = self._session.telemetry if self._session else None
+        if telemetry:
+            telemetry.update(busy=self.busy)
+
+    @rx.event
+    def sync_telemetry(self, _tick: str = ""):
+        """Refreshes telemetry stats and asks the browser for position and battery."""
+        telemetry = self._session.telemetry if self._session else None
+        stats = telemetry.stats() if telemetry else {}
+        if stats != self.telemetry_stats:
+            self.telemetry_stats = stats
+        if telemetry:
+            return rx.call_script(
+                TELEMETRY_SCRIPT, callback=LiveKitState.apply_telemetry
+            )
+
+    @rx.event
+    def apply_telemetry(self, report: dict):
+        telemetry = self._session.telemetry if self._session else None
+        if not telemetry or not report:
+            return
+        position = report.get("position")
+        telemetry.update(
+            position=(float(position[0]), float(position[1])) if position else None,
+            battery=report.get("battery"),
+        )
+
+    @rx.event(background=True)
+    async def watch_vox(self):
+        """Background task mirroring VOX opening and closing the mic into the UI."""
+        async with self:
+            session = self._session
+        if not session or not session.vox:
+            return
+        async for talking in session.vox.updates():
+            async with self:
+                if self._session is not session:
+                    break
+                self.is_talking = talking
+                self._refresh_vox()
+                self.ptt_latency = session.ptt.latency.summary()
+
     @rx.event
     async def connect_to_room(self):
         """Connects to the LiveKit room using the provided credentials."""
-        if not self.livekit_url or not self.token:
+        issue = not self.token and ISSUER.configured and ISSUER.restricted
+        if not self.livekit_url or not (
+            self.token or (issue and self.room_name and self.identity)
+        ):
             self.connection_status = "error"
-            self.status_message = "URL and Token are required."
+            self.status_message = (
+                "URL and a token, or room and identity, are required."
+                if self.token_issuer
+                else "URL and Token are required."
+            )
             return
         self.connection_status = "connecting"
         self.status_message = "Establishing connection..."
         yield
         try:
-            if self._room is None:
-                self._room = rtc.Room()
-            options = rtc.RoomOptions(auto_subscribe=False)
             logging.info(f"Connecting to {self.livekit_url}...")
-            await self._room.connect(self.livekit_url, self.token, options=options)
-            self.connection_status = "connected"
-            room_name = (
-                self._room.name if self._room and self._room.name else "Unknown Room"
+            token, provider = self.token, None
+            if issue:
+                provider = ISSUER.lease(self.room_name, self.identity)
+                token = await provider()
+            session = await HUB.acquire(
+                self.livekit_url,
+                token,
+                preroll_ms=self.preroll_ms,
+                token_provider=provider,
+            )
+            logging.info(
+                f"Connected to LiveKit room ({HUB.refs(session)} sessions sharing it)."
             )
-            self.status_message = f"Connected to room: {room_name}"
-            logging.info("Successfully connected to LiveKit room.")
-            self._monitoring = True
-            yield LiveKitState.monitor_room
-            yield LiveKitState.setup_media
         except Exception as e:
             logging.exception(f"Failed to connect to LiveKit: {e}")
             self.connection_status = "error"
             self.status_message = f"Connection failed: {str(e)}"
-            if self._room:
-                try:
-                    await self._room.disconnect()
-                except Exception as e:
-                    logging.exception(
-                        f"Error disconnecting after failed connection: {e}"
-                    )
-                self._room = None
+            return
+        self._session = session
+        self.media_key = MEDIA_KEYS.grant(session)
+        self.connection_status = session.status
+        self.status_message = session.status_message
+        self._monitoring = True
+        self.local_identity = session.room.local_participant.identity
+        self.floor_holder = session.floor.holder
+        # Room settings belong to the shared session: a browser's own choice
+        # turns them on, and a session that already has them wins.
+        self.preroll_ms = session.preroll_ms
+        self.autosub = session.set_autosub(self.autosub or session.autosub is not None)
+        self.journal = session.set_journal(self.journal or session.journal is not None)
+        if session.telemetry:
+            if self.busy:
+                session.telemetry.update(busy=True)
+            self.busy = session.telemetry.local.busy
+        yield LiveKitState.monitor_room
+        yield LiveKitState.watch_session
+        yield LiveKitState.watch_floor
+        yield LiveKitState.setup_media
 
     @rx.event
     async def setup_media(self):
         """Sets up local media tracks after connection."""
-        if not self._room or not self.is_connected:
+        if not self._session or not self.is_connected:
             return
         try:
             self.status_message = "Setting up media devices..."
-            self._audio_track = rtc.LocalAudioTrack.create_from_microphone(
-                name="mic_main"
-            )
-            self._audio_publication = await self._room.local_participant.publish_track(
-                self._audio_track
-            )
-            await self._audio_publication.mute()
-            self._video_track = rtc.LocalVideoTrack.create_from_camera(
-                name="camera_main"
-            )
-            self._video_publication = await self._room.local_participant.publish_track(
-                self._video_track
-            )
-            self.camera_active = True
+            await self._session.setup_media()
+            self.startup_ms = dict(self._session.startup)
             self.status_message = "Connected & Ready"
+            logging.info(f"Media startup (ms): {self.startup_ms}")
         except Exception as e:
             logging.exception(f"Media setup failed: {e}")
             self.status_message = f"Media Error: {e}"
+            return
+        vox = self._session.vox
+        if vox is not None and not (self.vox or self.noise_gate):
+            self.vox, self.noise_gate = vox.vox, vox.gate is not None
+            self.vox_hang_ms = vox.detector.hang_frames * 10
+        watch_vox = self._apply_vox() if self.vox or self.noise_gate else None
+        if watch_vox:
+            return [LiveKitState.watch_camera, watch_vox]
+        return LiveKitState.watch_camera
 
-    @rx.event
+    @rx.event(background=True)
+    async def watch_camera(self):
+        """Background task that flips the camera on once it finishes coming up."""
+        session = self._session
+        if not session:
+            return
+        ready = await session.camera_ready()
+        async with self:
+            if self._session is not session:
+                return
+            self.camera_active = ready
+            self.startup_ms = dict(session.startup)
+
+    @rx.event(background=True)
     async def start_talking(self):
         """Enables the microphone track (PTT Press)."""
-        if self._audio_publication:
-            try:
-                await self._audio_publication.unmute()
-                self.is_talking = True
-            except Exception as e:
-                logging.exception(f"Failed to unmute: {e}")
+        trace = PttTrace()
+        session = self._session
+        if not session:
+            return
+        try:
+            talking = await session.start_talking(trace)
+        except Exception as e:
+            logging.exception(f"Failed to unmute: {e}")
+            return
+        async with self:
+            self.is_talking = talking
+            self.floor_waiting = False
+            self.ptt_queue_delay = session.ptt.queue_delay.summary()
+            if session.floor:
+                self.floor_grant_ms = session.floor.grant_ms.summary()
+        if not talking:
+            return
+        await session.ptt.finish_trace(trace)
+        async with self:
+            self.ptt_latency = session.ptt.latency.summary()
 
-    @rx.event
+    @rx.event(background=True)
     async def stop_talking(self):
         """Disables the microphone track (PTT Release)."""
-        if self._audio_publication:
+        session = self._session
+        talking = False
+        if session:
             try:
-                await self._audio_publication.mute()
+                talking = await session.stop_talking()
             except Exception as e:
                 logging.exception(f"Failed to mute: {e}")
-        self.is_talking = False
+        async with self:
+            self.is_talking = talking
+            self.floor_waiting = False
+            if session:
+                self.ptt_queue_delay = session.ptt.queue_delay.summary()
 
     @rx.event
     async def disconnect_from_room(self):
         """Disconnects from the current room."""
         self.is_talking = False
         self.camera_active = False
+        self.camera_stats = {}
+        self.floor_holder = ""
+        self.floor_waiting = False
+        listening, self.listening = self.listening, False
+        self.mix_stats = {}
+        self.vox_stats = {}
+        self.telemetry_stats = {}
+        self.journal_stats = {}
+        self.thumbnail_stats = {}
         self._monitoring = False
-        self.remote_participants = []
-        if self._room:
-            try:
-                await self._room.disconnect()
-            except Exception as e:
-                logging.exception(f"Error during disconnect: {e}")
-            finally:
-                self._room = None
-                self._audio_publication = None
-                self._video_publication = None
-                self._audio_track = None
-                self._video_track = None
+        self.roster_slots = []
+        self._row_slots = {}
+        self.video_participants = []
+        self.roster_total = 0
+        self.roster_offset = 0
+        self.viewport_savings = {}
+        self.startup_ms = {}
+        self.autosub_stats = {}
+        self.pinned = []
+        session, self._session = self._session, None
+        MEDIA_KEYS.revoke(self.media_key)
+        self.media_key = ""
+        if session:
+            viewer = self.router.session.client_token
+            if session.video_feeds:
+                session.viewport.forget(session.video_feeds, viewer)
+            if session.thumbnails:
+                session.thumbnails.want(viewer, [])
+            await HUB.release(session)
         self.connection_status = "disconnected"
         self.status_message = "Disconnected"
+        if listening:
+            return rx.call_script("window.mixPlayer && window.mixPlayer.stop()")
 
     @rx.event(background=True)
     async def monitor_room(self):
-        """Background task to monitor remote participants and tracks."""
-        while self.is_connected and self._monitoring:
+        """Background task to keep the remote participant roster up to date."""
+        async with self:
+            session = self._session
+            if not session:
+                return
+            feed = HUB.roster_feed(
+                session, self.roster_mode, window=self.roster_flush_ms / 1000
+            )
+            if feed is None:
+                return
+            roster = feed.roster
+        try:
+            async for _ in feed.subscribe():
+                async with self:
+                    if not self._monitoring or self._session is not session:
+                        break
+                    self._push_roster(roster)
+        except Exception as e:
+            logging.exception(f"Error monitoring room: {e}")
+
+    def _push_roster(self, roster):
+        """Folds the roster's latest patch into the vars that go to the browser.
+
+        `roster_push` records the rows re-sent and the size of Reflex's
+        delta for this push, which is what leaves on the websocket.
+        """
+        sent = self._refresh_window()
+        roster.delivered()
+        self._roster_pushes += 1
+        self.roster_latency = roster.latency.summary()
+        self._refresh_autosub()
+        self.roster_push = {
+            "pushes": self._roster_pushes,
+            "rows": sent,
+            "delta_bytes": len(format.json_dumps(self.get_delta())),
+        }
+
+    @rx.event(background=True)
+    async def watch_session(self):
+        """Background task mirroring reconnects and recovery time into the badge."""
+        async with self:
+            session = self._session
+        if not session:
+            return
+        async for status, message in session.status_updates():
             async with self:
-                if not self._room:
+                if self._session is not session:
                     break
-                try:
-                    new_participants = []
-                    for sid, p in self._room.remote_participants.items():
-                        has_audio = False
-                        audio_sub = False
-                        for pub in p.track_publications.values():
-                            if pub.source == rtc.TrackSource.SOURCE_MICROPHONE:
-                                has_audio = True
-                                audio_sub = pub.subscribed
-                                break
-                        has_video = False
-                        video_sub = False
-                        for pub in p.track_publications.values():
-                            if pub.source == rtc.TrackSource.SOURCE_CAMERA:
-                                has_video = True
-                                video_sub = pub.subscribed
-                                break
-                        new_participants.append(
-                            {
-                                "sid": sid,
-                                "identity": p.identity or "Unknown",
-                                "has_audio": has_audio,
-                                "audio_subscribed": audio_sub,
-                                "has_video": has_video,
-                                "video_subscribed": video_sub,
-                            }
-                        )
-                    self.remote_participants = new_participants
-                except Exception as e:
-                    logging.exception(f"Error monitoring room: {e}")
-            await asyncio.sleep(0.5)
-
-    @rx.event
-    async def toggle_subscription(self, sid: str, track_type: str):
-        """Toggles subscription for a specific remote track."""
-        if not self._room:
-            return
-        p = self._room.remote_participants.get(sid)
-        if not p:
-            logging.warning(f"Participant {sid} not found.")
+                self.connection_status = status
+                self.status_message = message
+                self.recovery_ms = session.recovery_ms.summary()
+
+    @rx.event(background=True)
+    async def watch_floor(self):
+        """Background task mirroring the floor holder and a queued press into the UI."""
+        async with self:
+            session = self._session
+        if not session or not session.floor:
             return
-        target_source = (
-            rtc.TrackSource.SOURCE_MICROPHONE
-            if track_type == "audio"
-            else rtc.TrackSource.SOURCE_CAMERA
+        async for holder in session.floor.updates():
+            async with self:
+                if self._session is not session:
+                    break
+                self.floor_holder = holder
+                self.floor_waiting = session.floor.waiting
+                if holder != self.local_identity:
+                    self.is_talking = False
+
+    @rx.event
+    def toggle_listening(self):
+        """Starts or stops the mixed remote audio in the browser."""
+        mixer = self._session.mixer if self._session else None
+        if self.listening or mixer is None:
+            self.listening = False
+            return rx.call_script("window.mixPlayer && window.mixPlayer.stop()")
+        self.listening = True
+        url = (
+            f"{rx.config.get_config().api_url}/api/audio/{mixer.id}"
+            f"?key={self.media_key}"
         )
-        for pub in p.track_publications.values():
-            if pub.source == target_source:
-                try:
-                    new_state = not pub.subscribed
-                    await pub.set_subscribed(new_state)
-                    logging.info(
-                        f"Set subscription for {p.identity} {track_type} to {new_state}"
-                    )
-                except Exception as e:
-                    logging.exception(f"Failed to toggle subscription: {e}")
-                break
\ No newline at end of file
+        return rx.call_script(f"{MIX_PLAYER_SCRIPT}\nwindow.mixPlayer.start('{url}')")
+
+    @rx.event
+    def refresh_mix_stats(self, _tick: str = ""):
+        mixer = self._session.mixer if self._session else None
+        if mixer is None:
+            return
+        stats = mixer.stats()
+        self.mix_stats = {
+            "talkers": stats["talkers"],
+            "mix_us": stats["mix_us"]["p50"],
+            "end_to_end_ms": stats["end_to_end_ms"],
+            "underruns": stats["jitter_underruns"] + stats["client_underruns"],
+        }
+
+    @rx.event
+    def set_gain(self, identity: str, value: str):
+        """Per-participant mix gain, from a 0-200 % slider."""
+        if not self._session or not self._session.mixer:
+            return
+        try:
+            self._session.mixer.set_gain(identity, float(value) / 100)
+        except ValueError:
+            pass
+
+    @rx.event
+    def sync_viewport(self, _tick: str = ""):
+        """Asks the browser where each remote video tile is rendered."""
+        feeds = self._session.video_feeds if self._session else None
+        if feeds and feeds.publications:
+            return rx.call_script(VIEWPORT_SCRIPT, callback=LiveKitState.apply_viewport)
+
+    @rx.event
+    def apply_viewport(self, tiles: list[dict]):
+        """Requests the simulcast layer that fits each tile's size and visibility."""
+        feeds = self._session.video_feeds if self._session else None
+        if not feeds:
+            return
+        viewport = self._session.viewport
+        viewport.apply(feeds, tiles or [], self.router.session.client_token)
+        savings = viewport.savings(SAMPLER.inbound_video(self._session.room))
+        if savings != self.viewport_savings:
+            self.viewport_savings = savings
+
+    @rx.event
+    def toggle_subscription(self, sid: str, track_type: str):
+        """Toggles subscription for a specific remote track."""
+        if not self._session:
+            return
+        try:
+            self._session.toggle_subscription(sid, track_type)
+        except Exception as e:
+            logging.exception(f"Failed to toggle subscription: {e}")
+
+for _slot in ROSTER_SLOTS:
+    LiveKitState.add_var(_slot, dict[str, str | bool], {})
@@ -0,0 +1,128 @@
+"""Sustained transmission recording, index lookups and mapped playback.
+
+N talkers each key up for 3 s at a time and push 20 ms frames of 16 kHz
+PCM, first as fast as the loop allows (the writer's capacity; the capped
+spool drops the excess) and then paced at real time (a busy channel). Then the index is padded to ~100k rows and queried by identity and
+time range, and one transmission is streamed back through the memory map.
+
+Run with: python -m benchmarks.archive_throughput [talkers] [seconds_of_audio]
+"""
+
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+from app.services.archive import (
+    ARCHIVE_SAMPLE_RATE,
+    TransmissionArchive,
+)
+
+FRAME_SAMPLES = ARCHIVE_SAMPLE_RATE // 50
+TRANSMISSION_FRAMES = 150
+INDEX_ROWS = 100_000
+LOOKUPS = 1000
+
+
+def record(
+    archive: TransmissionArchive, talkers: int, seconds: int, paced: bool
+) -> float:
+    frame = np.random.default_rng(1).integers(
+        -8000, 8000, FRAME_SAMPLES, dtype=np.int16
+    )
+    handles = [None] * talkers
+    sent = [0] * talkers
+    started = time.perf_counter()
+    for tick in range(seconds * 50):
+        if paced:
+            time.sleep(max(0.0, started + tick / 50 - time.perf_counter()))
+        for talker in range(talkers):
+            if handles[talker] is None:
+                handles[talker] = archive.open("bench", f"unit-{talker:04d}", 16000)
+            archive.write(handles[talker], frame)
+            sent[talker] += 1
+            if sent[talker] % TRANSMISSION_FRAMES == 0:
+                archive.close(handles[talker])
+                handles[talker] = None
+    for handle in handles:
+        if handle is not None:
+            archive.close(handle)
+    archive.flush(timeout=120)
+    return time.perf_counter() - started
+
+
+def pad_index(archive: TransmissionArchive, talkers: int):
+    rng = random.Random(3)
+    now = int(time.time() * 1000)
+    rows = []
+    for _ in range(INDEX_ROWS):
+        started = now - rng.randrange(30 * 86_400_000)
+        identity = f"unit-{rng.randrange(talkers):04d}"
+        rows.append(("bench", identity, started, started + 3000, 16000, 48000, "-"))
+    with archive._connect() as db:
+        db.executemany(
+            "INSERT INTO transmissions"
+            " (room, identity, started_ms, ended_ms, sample_rate, frames, path)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+
+def report(label: str, archive: TransmissionArchive, elapsed: float):
+    stats = archive.stats()
+    mb = stats["written_bytes"] / 1e6
+    print(
+        f"{label}: {mb:.1f} MB in {elapsed:.2f} s ({mb / elapsed:.1f} MB/s),"
+        f" {stats['transmissions']} files, peak spool"
+        f" {stats['peak_bytes'] / 1e6:.2f} MB,"
+        f" dropped {stats['dropped_bytes'] / 1e6:.2f} MB"
+    )
+    return stats
+
+
+def main(talkers: int, seconds: int):
+    with tempfile.TemporaryDirectory() as root:
+        archive = TransmissionArchive(f"{root}/flat-out")
+        elapsed = record(archive, talkers, seconds, paced=False)
+        stats = report(f"{talkers} talkers, flat out", archive, elapsed)
+        capacity = stats["written_bytes"] / elapsed / (ARCHIVE_SAMPLE_RATE * 2)
+        print(f"  writer capacity ~{capacity:.0f} concurrent talkers")
+
+        archive = TransmissionArchive(f"{root}/paced")
+        bench_started = int(time.time() * 1000)
+        elapsed = record(archive, talkers, seconds, paced=True)
+        stats = report(f"{talkers} talkers, real time", archive, elapsed)
+
+        pad_index(archive, talkers)
+        rng = random.Random(4)
+        now = int(time.time() * 1000)
+        for _ in range(LOOKUPS):
+            since = now - rng.randrange(30 * 86_400_000)
+            archive.search(
+                identity=f"unit-{rng.randrange(talkers):04d}",
+                since_ms=since,
+                until_ms=since + 3_600_000,
+            )
+        lookup = archive.stats()["lookup_ms"]
+        print(
+            f"index ({INDEX_ROWS + stats['transmissions']} rows): identity + 1 h"
+            f" window p50 {lookup['p50']:.3f} ms p95 {lookup['p95']:.3f} ms"
+        )
+
+        recorded = archive.search(room="bench", since_ms=bench_started, limit=1000)
+        longest = max(recorded, key=lambda row: row["duration_ms"])
+        started = time.perf_counter()
+        size = max_chunk = 0
+        for chunk in archive.read(longest["id"]):
+            size += len(chunk)
+            max_chunk = max(max_chunk, len(chunk))
+        ms = (time.perf_counter() - started) * 1000
+        print(
+            f"playback: {size / 1024:.0f} KiB in {ms:.2f} ms,"
+            f" at most {max_chunk / 1024:.0f} KiB held at once"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*(args or [100, 10]))
@@ -0,0 +1,82 @@
+"""Server-side audio mix cost and jitter-buffer behaviour.
+
+Times one 20 ms mix + mu-law encode for N synthetic talkers, then feeds a
+jitter buffer with frames whose arrival is jittered and reports underruns
+and the latency the buffer adds.
+
+Run with: python -m benchmarks.audio_mixer [jitter_ms]
+"""
+
+import sys
+import time
+import numpy as np
+from app.services.mixer import (
+    JITTER_MAX_MS,
+    JITTER_TARGET_MS,
+    MIX_FRAME_MS,
+    MIX_FRAME_SAMPLES,
+    MIX_SAMPLE_RATE,
+    JitterBuffer,
+    mix,
+    mulaw_encode,
+)
+
+ROUNDS = 2000
+FRAMES = 3000
+
+
+def mix_cost(talkers: int) -> float:
+    """Microseconds per mixed frame."""
+    rng = np.random.default_rng(talkers)
+    frames = rng.integers(-12000, 12000, (talkers, MIX_FRAME_SAMPLES), dtype=np.int16)
+    gains = np.ones(talkers, dtype=np.float32)
+    limiter = 1.0
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        mixed, limiter = mix(frames, gains, limiter)
+        mulaw_encode(mixed)
+    return (time.perf_counter() - started) / ROUNDS * 1e6
+
+
+def jitter_run(jitter_ms: float) -> tuple[int, float]:
+    """(underruns, mean buffered ms) over a simulated stream."""
+    rng = np.random.default_rng(7)
+    buffer = JitterBuffer(
+        MIX_SAMPLE_RATE * JITTER_TARGET_MS // 1000,
+        MIX_SAMPLE_RATE * JITTER_MAX_MS // 1000,
+    )
+    frame = np.zeros(MIX_FRAME_SAMPLES, dtype=np.int16)
+    arrivals = np.arange(FRAMES) * MIX_FRAME_MS + rng.exponential(jitter_ms, FRAMES)
+    arrivals.sort()
+    waits = []
+    pending = 0
+    for tick in range(FRAMES):
+        now = tick * MIX_FRAME_MS
+        while pending < FRAMES and arrivals[pending] <= now:
+            buffer.push(frame, arrivals[pending])
+            pending += 1
+        pcm, arrived = buffer.pop(MIX_FRAME_SAMPLES)
+        if pcm is not None:
+            waits.append(now - arrived)
+    return buffer.underruns, float(np.mean(waits)) if waits else 0.0
+
+
+def main(jitter_ms: float):
+    budget = MIX_FRAME_MS * 1000
+    for talkers in (1, 4, 8, 16):
+        cost = mix_cost(talkers)
+        print(
+            f"{talkers:>2} talkers: {cost:6.1f} us/frame"
+            f" ({cost / budget:.2%} of one core, {cost / talkers:5.1f} us/talker)"
+        )
+    for jitter in (0.0, jitter_ms / 2, jitter_ms):
+        underruns, wait = jitter_run(jitter)
+        print(
+            f"jitter {jitter:4.0f} ms: {underruns} underruns in {FRAMES} frames,"
+            f" {wait:.0f} ms buffered"
+        )
+    print(f"wire: {MIX_SAMPLE_RATE * 8 // 1000} kbps mu-law per listener")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 20.0)
@@ -0,0 +1,62 @@
+"""Live audio subscriptions with active-speaker auto-subscription vs. everyone.
+
+Simulated talk bursts (1-2 concurrent talkers out of N participants) drive
+active_speakers_changed on a fake room whose subscriptions complete after a
+fixed signalling delay.
+
+Run with: python -m benchmarks.autosub_budget [participants] [seconds]
+"""
+
+import asyncio
+import random
+import sys
+from app.services.autosub import AutoSubscriber
+from app.services.registry import TrackRegistry
+from benchmarks.fake_room import FakeRoom
+
+SUBSCRIBE_DELAY_S = 0.04
+AUDIO_KBPS = 32
+
+
+def signalled(room: FakeRoom):
+    """Makes set_subscribed complete asynchronously, like a real SFU round trip."""
+    loop = asyncio.get_running_loop()
+    for p in room.remote_participants.values():
+        for pub in p.track_publications.values():
+            pub.set_subscribed = lambda value, p=p, pub=pub: loop.call_later(
+                SUBSCRIBE_DELAY_S, room.set_subscribed, p, pub, value
+            )
+
+
+async def main(participants: int, seconds: int):
+    room = FakeRoom()
+    units = room.populate(participants)
+    signalled(room)
+    registry = TrackRegistry()
+    registry.load(room)
+    autosub = AutoSubscriber(room, registry, grace=3.0)
+    autosub.attach()
+    autosub.toggle_pin(units[0].identity)
+    rng = random.Random(5)
+    samples = []
+    for _ in range(seconds * 4):
+        talkers = rng.sample(units, rng.choice((0, 1, 1, 2)))
+        room.emit("active_speakers_changed", talkers)
+        await asyncio.sleep(0.25)
+        samples.append(autosub.stats()["subscribed"])
+    autosub.close()
+    stats = autosub.stats()
+    average = sum(samples) / len(samples)
+    print(f"subscribe all: {participants} live, {participants * AUDIO_KBPS} kbps")
+    print(
+        f"auto (cap {autosub.max_audio} + 1 pin): avg {average:.1f} live,"
+        f" peak {max(samples)}, ~{average * AUDIO_KBPS:.0f} kbps,"
+        f" evictions {stats['evictions']},"
+        f" subscribe p50 {stats['subscribe_p50']:.0f} ms"
+        f" p95 {stats['subscribe_p95']:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args or [50, 30])))
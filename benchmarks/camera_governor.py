@@ -0,0 +1,134 @@
+"""Camera capture cost per profile and what the governor saves per session.
+
+First pushes synthetic 640x480 RGBA frames through the same downscale and
+`rtc.VideoSource.capture_frame` path the capture thread uses, at each
+profile's scale and frame rate, and measures the process CPU that costs per
+second of video. Then replays a simulated session (viewers coming and
+going, PTT transmissions, CPU and network pressure episodes) through
+CameraGovernor.step at its poll interval and weighs the measured costs by
+the time spent in each profile. Encoder CPU is not included here: without
+an SFU nothing is encoded, but it scales with the same pixel rate.
+
+Run with: python -m benchmarks.camera_governor [minutes]
+"""
+
+import asyncio
+import random
+import sys
+import time
+import numpy as np
+from livekit import rtc
+from app.services.camera import (
+    CAMERA_POLL_S,
+    CAMERA_PROFILES,
+    CameraGovernor,
+    CameraSignals,
+)
+from app.services.devices import CAMERA_HEIGHT, CAMERA_WIDTH
+from app.services.session import RoomSession
+
+FRAMES = 300
+
+
+async def capture_cost() -> dict[str, float]:
+    """CPU milliseconds per second of camera video, per profile."""
+    source = rtc.VideoSource(CAMERA_WIDTH, CAMERA_HEIGHT)
+    rng = np.random.default_rng(0)
+    full = rng.integers(0, 2**32, (CAMERA_HEIGHT, CAMERA_WIDTH), dtype=np.uint32)
+    costs = {}
+    # The first pass over "high" only warms the FFI path up.
+    for profile in (CAMERA_PROFILES[0], *CAMERA_PROFILES):
+        cpu = time.process_time()
+        for _ in range(FRAMES):
+            # Stand-in for cv2.resize: one RGBA pixel per uint32.
+            rgba = full[:: profile.scale, :: profile.scale]
+            frame = rtc.VideoFrame(
+                rgba.shape[1], rgba.shape[0], rtc.VideoBufferType.RGBA, rgba.tobytes()
+            )
+            source.capture_frame(frame)
+        await asyncio.sleep(0)
+        per_frame_ms = (time.process_time() - cpu) / FRAMES * 1000
+        costs[profile.name] = per_frame_ms * profile.fps
+    await source.aclose()
+    return costs
+
+
+def episodes(rng: random.Random, seconds: float, busy: float, mean_s: float):
+    """Sorted (start, end) spans covering about `busy` of the time."""
+    spans, at = [], 0.0
+    while at < seconds:
+        at += rng.expovariate(busy / (mean_s * (1 - busy)))
+        length = rng.expovariate(1 / mean_s)
+        spans.append((at, at + length))
+        at += length
+    return spans
+
+
+def inside(spans, t: float) -> bool:
+    return any(start <= t < end for start, end in spans)
+
+
+def simulate(seconds: float, seed: int = 4) -> tuple[CameraGovernor, int, float]:
+    rng = random.Random(seed)
+    watched = episodes(rng, seconds, 0.35, 60)
+    talking = episodes(rng, seconds, 0.2, 4)
+    cpu = episodes(rng, seconds, 0.05, 20)
+    network = episodes(rng, seconds, 0.05, 15)
+    session = RoomSession("ws://benchmark", "")
+    governor = CameraGovernor(session, None)
+    start = governor._last_step
+    resumes, resume_wait = 0, 0.0
+    was_watched = False
+    t = 0.0
+    while t < seconds:
+        t += CAMERA_POLL_S
+        now_watched = inside(watched, t)
+        if now_watched and not was_watched:
+            resumes += 1
+            # A viewer arriving between polls waits for the next one.
+            resume_wait += rng.uniform(0, CAMERA_POLL_S)
+        was_watched = now_watched
+        governor.step(
+            CameraSignals(
+                subscribed=now_watched,
+                cpu=inside(cpu, t),
+                network=inside(network, t),
+                talking=inside(talking, t),
+            ),
+            now=start + t,
+        )
+    return governor, resumes, resume_wait / max(1, resumes)
+
+
+async def main(minutes: float):
+    costs = await capture_cost()
+    full = CAMERA_PROFILES[0]
+    for profile in CAMERA_PROFILES:
+        print(
+            f"{profile.name:<8} {CAMERA_WIDTH // profile.scale}x"
+            f"{CAMERA_HEIGHT // profile.scale} @ {profile.fps:>4.0f} fps:"
+            f" capture {costs[profile.name]:6.2f} ms CPU/s,"
+            f" {profile.pixel_rate / full.pixel_rate:6.1%} of the pixels,"
+            f" ~{profile.kbps} kbps"
+        )
+    governor, resumes, resume_s = simulate(minutes * 60)
+    total = sum(governor.seconds.values())
+    shares = {name: seconds / total for name, seconds in governor.seconds.items()}
+    cpu = sum(shares[p.name] * costs[p.name] for p in CAMERA_PROFILES)
+    stats = governor.stats()
+    print(
+        f"{minutes:.0f} min session: "
+        + ", ".join(f"{name} {share:.0%}" for name, share in shares.items())
+    )
+    print(
+        f"capture CPU {cpu:.2f} vs {costs[full.name]:.2f} ms/s always-on"
+        f" ({1 - cpu / costs[full.name]:.0%} saved),"
+        f" pixels {stats['pixels_saved_pct']}% saved,"
+        f" uplink ~{stats['kbps_saved_est']} of {full.kbps} kbps saved (nominal),"
+        f" {governor.steps} profile steps, {resumes} resumes"
+        f" (mean wait {resume_s * 1000:.0f} ms + keyframe)"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 10.0))
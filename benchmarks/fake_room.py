@@ -0,0 +1,186 @@
+import asyncio
+import itertools
+from datetime import datetime, timezone
+from livekit import rtc
+
+_ids = itertools.count(1)
+
+
+class FakePublication:
+    """Stand-in for rtc.RemoteTrackPublication."""
+
+    def __init__(self, source: rtc.TrackSource.ValueType, name: str = ""):
+        self.sid = f"TR_{next(_ids)}"
+        self.source = source
+        self.name = name
+        self.kind = (
+            rtc.TrackKind.KIND_AUDIO
+            if source
+            in (
+                rtc.TrackSource.SOURCE_MICROPHONE,
+                rtc.TrackSource.SOURCE_SCREENSHARE_AUDIO,
+            )
+            else rtc.TrackKind.KIND_VIDEO
+        )
+        self.subscribed = False
+        self.muted = False
+        self.track = None
+
+    def set_subscribed(self, subscribed: bool):
+        self.subscribed = subscribed
+
+
+class FakeParticipant:
+    """Stand-in for rtc.RemoteParticipant."""
+
+    def __init__(self, identity: str, joined_at: datetime | None = None):
+        self.sid = f"PA_{next(_ids)}"
+        self.identity = identity
+        self.joined_at = joined_at or datetime.now(timezone.utc)
+        self.track_publications: dict[str, FakePublication] = {}
+
+
+class FakeLocalParticipant:
+    """Stand-in for rtc.LocalParticipant with a fixed publish round trip."""
+
+    def __init__(self, publish_delay: float = 0.0, identity: str = "local"):
+        self.identity = identity
+        self.joined_at = datetime.now(timezone.utc)
+        self.publish_delay = publish_delay
+        self.published: list = []
+        self.network: "FakeNetwork | None" = None
+
+    async def publish_data(
+        self,
+        payload: bytes,
+        *,
+        reliable: bool = True,
+        destination_identities: list[str] | None = None,
+        topic: str = "",
+    ):
+        if self.network is not None:
+            self.network.deliver(
+                self.identity, payload, destination_identities or [], topic
+            )
+
+    async def publish_track(self, track):
+        await asyncio.sleep(self.publish_delay)
+        self.published.append(track)
+        return FakePublication(rtc.TrackSource.SOURCE_UNKNOWN, track.name)
+
+
+class FakeRoom(rtc.EventEmitter):
+    """Minimal local stand-in for rtc.Room that emits the same room events."""
+
+    def __init__(self):
+        super().__init__()
+        self.name = "fake-room"
+        self.remote_participants: dict[str, FakeParticipant] = {}
+        self.local_participant = FakeLocalParticipant()
+
+    async def disconnect(self):
+        self.emit("disconnected", "client initiated")
+
+    def join(self, identity: str, audio: bool = True, video: bool = True):
+        p = FakeParticipant(identity)
+        self.remote_participants[p.sid] = p
+        self.emit("participant_connected", p)
+        if audio:
+            self.publish(p, rtc.TrackSource.SOURCE_MICROPHONE)
+        if video:
+            self.publish(p, rtc.TrackSource.SOURCE_CAMERA)
+        return p
+
+    def leave(self, p: FakeParticipant):
+        self.remote_participants.pop(p.sid, None)
+        self.emit("participant_disconnected", p)
+
+    def publish(self, p: FakeParticipant, source: rtc.TrackSource.ValueType):
+        pub = FakePublication(source)
+        p.track_publications[pub.sid] = pub
+        self.emit("track_published", pub, p)
+        return pub
+
+    def unpublish(self, p: FakeParticipant, pub: FakePublication):
+        p.track_publications.pop(pub.sid, None)
+        self.emit("track_unpublished", pub, p)
+
+    def set_muted(self, p: FakeParticipant, pub: FakePublication, muted: bool):
+        pub.muted = muted
+        self.emit("track_muted" if muted else "track_unmuted", p, pub)
+
+    def set_subscribed(
+        self, p: FakeParticipant, pub: FakePublication, subscribed: bool
+    ):
+        pub.subscribed = subscribed
+        event = "track_subscribed" if subscribed else "track_unsubscribed"
+        self.emit(event, pub.track, pub, p)
+
+    def populate(self, count: int):
+        return [self.join(f"unit-{i:04d}") for i in range(count)]
+
+
+class FakeNetwork:
+    """Links several FakeRooms as clients of one room with a one-way delay.
+
+    Each joined identity gets its own FakeRoom that sees the others as
+    remote participants; data packets reach the other clients `latency`
+    seconds after they are sent, all of them from one timer per packet.
+    Clients joined with `receive=False` send but are never delivered to,
+    so a large fleet can be simulated with only a few full receivers.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.rooms: dict[str, FakeRoom] = {}
+        self._receivers: dict[str, FakeRoom] = {}
+        # Per client: remote participant by identity, for packet delivery.
+        self._peers: dict[str, dict[str, FakeParticipant]] = {}
+
+    def join(self, identity: str, receive: bool = True):
+        room = FakeRoom()
+        room.local_participant = FakeLocalParticipant(identity=identity)
+        room.local_participant.network = self
+        peers = self._peers[identity] = {}
+        for other_identity, other in self.rooms.items():
+            mine = FakeParticipant(other_identity, other.local_participant.joined_at)
+            room.remote_participants[mine.sid] = mine
+            peers[other_identity] = mine
+            theirs = FakeParticipant(identity, room.local_participant.joined_at)
+            other.remote_participants[theirs.sid] = theirs
+            self._peers[other_identity][identity] = theirs
+            other.emit("participant_connected", theirs)
+        self.rooms[identity] = room
+        if receive:
+            self._receivers[identity] = room
+        return room
+
+    def leave(self, identity: str):
+        self.rooms.pop(identity, None)
+        self._receivers.pop(identity, None)
+        self._peers.pop(identity, None)
+        for other_identity, other in self.rooms.items():
+            p = self._peers[other_identity].pop(identity, None)
+            if p is not None:
+                other.leave(p)
+
+    def deliver(self, sender: str, payload: bytes, destinations: list[str], topic: str):
+        targets = [
+            (room, self._peers[identity].get(sender))
+            for identity, room in self._receivers.items()
+            if identity != sender and (not destinations or identity in destinations)
+        ]
+        if targets:
+            asyncio.get_running_loop().call_later(
+                self.latency, self._arrive, targets, payload, topic
+            )
+
+    def _arrive(self, targets: list, payload: bytes, topic: str):
+        for room, sender in targets:
+            packet = rtc.DataPacket(
+                data=payload,
+                kind=rtc.DataPacketKind.KIND_RELIABLE,
+                participant=sender,
+                topic=topic,
+            )
+            room.emit("data_received", packet)
@@ -0,0 +1,145 @@
+"""PTT floor control on a local stand-in room: grant RTT, contention, recovery.
+
+Clients are FloorControl instances on a FakeNetwork with a fixed one-way
+delay. Checks that:
+  * grant round trips for non-arbiter clients stay within FLOOR_GRANT_BUDGET_MS;
+  * simultaneous presses end with exactly one holder that every client agrees on;
+  * a higher priority request preempts the holder;
+  * the floor is recovered when the holder disconnects;
+  * a grant sent by anyone but the arbiter is ignored;
+  * the floor still works after the arbiter drops and rejoins.
+Exits non-zero on any failure.
+
+Run with: python -m benchmarks.floor_rtt [clients] [one_way_ms]
+"""
+
+import asyncio
+import random
+import sys
+from app.services.floor import (
+    FLOOR_GRANT_BUDGET_MS,
+    FLOOR_TOPIC,
+    GRANT,
+    FloorControl,
+    encode_floor,
+)
+from app.services.stats import LatencyWindow
+from benchmarks.fake_room import FakeNetwork
+
+
+async def settle(network: FakeNetwork, hops: int = 3):
+    await asyncio.sleep(network.latency * hops + 0.01)
+
+
+def agreed(floors: dict[str, FloorControl]) -> str | None:
+    holders = {floor.holder for floor in floors.values()}
+    return holders.pop() if len(holders) == 1 else None
+
+
+async def measure(clients: int, one_way_ms: int) -> tuple[dict, list[str]]:
+    """Grant round trip summary and the checks that failed."""
+    network = FakeNetwork(latency=one_way_ms / 1000)
+    priorities = {f"unit-{clients - 1:02d}": 5}
+    floors: dict[str, FloorControl] = {}
+    for i in range(clients):
+        identity = f"unit-{i:02d}"
+        floor = FloorControl(network.join(identity), priorities)
+        floor.attach()
+        floors[identity] = floor
+    await settle(network)
+    failures = []
+
+    rtt = LatencyWindow()
+    rng = random.Random(9)
+    others = [identity for identity in floors if identity != "unit-00"][:-1]
+    for _ in range(40):
+        floor = floors[rng.choice(others)]
+        if not await asyncio.wait_for(floor.acquire(), 1.0):
+            failures.append("uncontended request was not granted")
+        rtt.record(floor.grant_ms.last)
+        floor.release()
+        await settle(network)
+    summary = rtt.summary()
+    print(f"grant rtt (one way {one_way_ms} ms): {summary}")
+    if summary["p95"] > FLOOR_GRANT_BUDGET_MS:
+        failures.append(f"grant p95 {summary['p95']} ms over budget")
+
+    a, b = floors[others[0]], floors[others[1]]
+    results = await asyncio.gather(
+        asyncio.wait_for(a.acquire(), 0.5),
+        asyncio.wait_for(b.acquire(), 0.5),
+        return_exceptions=True,
+    )
+    await settle(network)
+    winners = [r for r in results if r is True]
+    holder = agreed(floors)
+    print(f"simultaneous presses: winners={len(winners)} holder={holder!r}")
+    if len(winners) != 1 or holder not in (a.identity, b.identity):
+        failures.append("simultaneous presses did not end with one agreed holder")
+    loser = b if holder == a.identity else a
+    queued = asyncio.create_task(loser.acquire())
+    floors[holder].release()
+    if not await asyncio.wait_for(queued, 1.0):
+        failures.append("queued request was not granted after release")
+
+    revoked = asyncio.Event()
+    loser.on_revoked = revoked.set
+    dispatcher = floors[f"unit-{clients - 1:02d}"]
+    await asyncio.wait_for(dispatcher.acquire(), 1.0)
+    await asyncio.wait_for(revoked.wait(), 1.0)
+    await settle(network)
+    print(f"preemption: holder={agreed(floors)!r}")
+    if agreed(floors) != dispatcher.identity:
+        failures.append("priority request did not preempt the holder")
+
+    waiting = asyncio.create_task(floors[others[2]].acquire())
+    await settle(network)
+    lost = asyncio.get_running_loop().time()
+    dispatcher.close()
+    network.leave(dispatcher.identity)
+    del floors[dispatcher.identity]
+    granted = await asyncio.wait_for(waiting, 1.0)
+    recovery = (asyncio.get_running_loop().time() - lost) * 1000
+    await settle(network)
+    print(f"holder disconnect: recovered in {recovery:.0f} ms, {agreed(floors)!r}")
+    if not granted or agreed(floors) != others[2]:
+        failures.append("floor was not recovered after the holder left")
+
+    forger = floors[others[3]]
+    await forger._room.local_participant.publish_data(
+        encode_floor(GRANT, 2**32 - 1, forger.identity), topic=FLOOR_TOPIC
+    )
+    await settle(network)
+    print(f"forged grant: holder={agreed(floors)!r}")
+    if agreed(floors) != others[2]:
+        failures.append("a grant from a non-arbiter was believed")
+    floors[others[2]].release()
+    await settle(network)
+
+    arbiter = floors["unit-00"]
+    network.leave(arbiter.identity)
+    arbiter.rebind(network.join(arbiter.identity))
+    await settle(network)
+    requester = floors[others[4]]
+    rejoined = await asyncio.wait_for(requester.acquire(), 1.0)
+    await settle(network)
+    print(f"arbiter rejoined: arbiter={requester.arbiter!r} holder={agreed(floors)!r}")
+    if not rejoined or agreed(floors) != requester.identity:
+        failures.append("floor stuck after the arbiter rejoined")
+
+    for floor in floors.values():
+        floor.close()
+    return summary, failures
+
+
+async def main(clients: int, one_way_ms: int):
+    _, failures = await measure(clients, one_way_ms)
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args or [8, 40])))
@@ -0,0 +1,107 @@
+"""Memory and CPU per added viewer: private connections vs. the shared hub.
+
+Every viewer watches the same channel as the same identity. Without the hub
+each viewer has its own room (its own peer receives every roster event) and
+its own roster loop; with the hub they share one RoomSession and one loop.
+Fake rooms stand in for the peers, so media decode is not included: each
+saved peer would also have saved one decode per subscribed track.
+
+Run with: python -m benchmarks.hub_viewers [participants] [events]
+"""
+
+import asyncio
+import base64
+import json
+import random
+import sys
+import time
+import tracemalloc
+from app.services.hub import RoomHub
+from app.services.session import RoomSession
+from benchmarks.fake_room import FakeRoom
+
+URL = "wss://fake.livekit"
+
+
+def fake_token(room: str, identity: str) -> str:
+    claims = json.dumps({"sub": identity, "video": {"room": room}}).encode()
+    return "e30." + base64.urlsafe_b64encode(claims).decode().rstrip("=") + ".sig"
+
+
+class FakeSession(RoomSession):
+    """RoomSession whose peer is a FakeRoom populated by the benchmark."""
+
+    rooms: list[FakeRoom] = []
+    participants = 0
+
+    async def _open_room(self) -> FakeRoom:
+        room = FakeRoom()
+        room.populate(self.participants)
+        FakeSession.rooms.append(room)
+        return room
+
+
+async def run(shared: bool, viewers: int, participants: int, events: int):
+    FakeSession.rooms = []
+    FakeSession.participants = participants
+    hub = RoomHub()
+    token = fake_token("channel-1", "ops")
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = []
+    for i in range(viewers):
+        viewer_token = token if shared else fake_token("channel-1", f"ops-{i}")
+        sessions.append(
+            await hub.acquire(URL, viewer_token, session_factory=FakeSession)
+        )
+    pushes = [0] * viewers
+
+    async def consume(i: int, session: RoomSession):
+        feed = hub.roster_feed(session, "events", window=0.05)
+        async for _ in feed.subscribe():
+            state_rows = list(feed.roster.rows)
+            pushes[i] += len(state_rows) > 0
+
+    consumers = [asyncio.create_task(consume(i, s)) for i, s in enumerate(sessions)]
+    await asyncio.sleep(0.2)
+    memory = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    rng = random.Random(11)
+    started = time.process_time()
+    for _ in range(events):
+        for room in FakeSession.rooms:
+            p = rng.choice(list(room.remote_participants.values()))
+            pub = next(iter(p.track_publications.values()))
+            room.set_subscribed(p, pub, not pub.subscribed)
+        await asyncio.sleep(0.06)
+    await asyncio.sleep(0.2)
+    cpu = time.process_time() - started
+    for session in sessions:
+        await hub.release(session)
+    await asyncio.gather(*consumers, return_exceptions=True)
+    return {
+        "viewers": viewers,
+        "rooms": len(FakeSession.rooms),
+        "kib": round(memory / 1024),
+        "cpu_ms": round(cpu * 1000, 1),
+        "pushes": sum(pushes),
+    }
+
+
+async def main(participants: int, events: int):
+    for shared in (False, True):
+        base = await run(shared, 1, participants, events)
+        for viewers in (10, 50):
+            result = await run(shared, viewers, participants, events)
+            extra = viewers - 1
+            label = "hub" if shared else "private"
+            print(
+                f"{label:>7}: {result} per added viewer:"
+                f" {(result['kib'] - base['kib']) / extra:.1f} KiB,"
+                f" {(result['cpu_ms'] - base['cpu_ms']) / extra:.2f} ms CPU"
+            )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args or [200, 40])))
@@ -0,0 +1,85 @@
+"""Connect-to-ready time of the old sequential media chain vs RoomSession.
+
+Device opens and publish round trips are simulated with fixed delays (the
+ones we see on the cellular units) so the numbers only reflect ordering and
+the process-wide device cache. The second session reuses the cached devices.
+
+Run with: python -m benchmarks.media_startup
+"""
+
+import asyncio
+import time
+from app.services import devices
+from app.services.session import RoomSession
+from benchmarks.fake_room import FakeRoom
+
+CONNECT_S = 0.30
+PUBLISH_S = 0.15
+MIC_OPEN_S = 0.25
+CAMERA_OPEN_S = 0.70
+
+
+class SlowMic:
+    def __init__(self, *args):
+        time.sleep(MIC_OPEN_S)
+
+    def attach(self, sink):
+        pass
+
+    def detach(self, sink):
+        pass
+
+    def close(self):
+        pass
+
+
+class SlowCamera(SlowMic):
+    def __init__(self, *args):
+        time.sleep(CAMERA_OPEN_S)
+
+    def hold(self, holder, paused, scale, fps):
+        pass
+
+    def release(self, holder):
+        pass
+
+
+async def open_room() -> FakeRoom:
+    await asyncio.sleep(CONNECT_S)
+    room = FakeRoom()
+    room.local_participant.publish_delay = PUBLISH_S
+    return room
+
+
+async def sequential() -> float:
+    """The pre-RoomSession chain: every step waits for the one before it."""
+    started = time.perf_counter()
+    room = await open_room()
+    await asyncio.to_thread(SlowMic)
+    await room.local_participant.publish_track(type("T", (), {"name": "mic"}))
+    await asyncio.to_thread(SlowCamera)
+    await room.local_participant.publish_track(type("T", (), {"name": "cam"}))
+    return (time.perf_counter() - started) * 1000
+
+
+async def concurrent() -> dict[str, float]:
+    session = RoomSession("ws://fake", "token")
+    session._open_room = open_room
+    await session.connect()
+    await session.setup_media()
+    await session.camera_ready()
+    startup = dict(session.startup)
+    await session.close()
+    return startup
+
+
+async def main():
+    devices.MicDevice = SlowMic
+    devices.CameraDevice = SlowCamera
+    print(f"sequential: ready {await sequential():.0f} ms (camera included)")
+    print(f"session, cold devices: {await concurrent()}")
+    print(f"session, cached devices: {await concurrent()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""PTT press latency and loop lag with and without aggressive stats sampling.
+
+Twenty simulated rooms of 500 inbound streams each answer get_rtc_stats
+after a 5 ms FFI round trip; the sampler polls them every 50 ms (200x the
+production rate) while PTT presses run on one of the sessions.
+
+Run with: python -m benchmarks.metrics_overhead [rooms] [streams]
+"""
+
+import asyncio
+import sys
+import time
+from livekit.rtc._proto import stats_pb2
+from livekit import rtc
+from app.services.metrics import LOOP_LAG, SESSIONS, MetricsSampler, render
+from app.services.session import RoomSession
+from app.services.stats import LatencyWindow
+from benchmarks.fake_room import FakeRoom
+from benchmarks.ptt_stress import FakeLocalTrack
+
+PRESSES = 200
+FFI_DELAY_S = 0.005
+
+
+class StatsRoom(FakeRoom):
+    def __init__(self, name: str, streams: int):
+        super().__init__()
+        self.name = name
+        pair = stats_pb2.RtcStats()
+        pair.candidate_pair.candidate_pair.nominated = True
+        pair.candidate_pair.candidate_pair.current_round_trip_time = 0.042
+        self._stats = [pair]
+        for i in range(streams):
+            stat = stats_pb2.RtcStats()
+            stat.inbound_rtp.received.packets_received = 1000 + i
+            stat.inbound_rtp.received.packets_lost = i % 7
+            stat.inbound_rtp.received.jitter = 0.004
+            stat.inbound_rtp.inbound.bytes_received = 100_000 * i
+            self._stats.append(stat)
+
+    async def get_rtc_stats(self) -> rtc.RtcStats:
+        await asyncio.sleep(FFI_DELAY_S)
+        return rtc.RtcStats(publisher_stats=[], subscriber_stats=self._stats)
+
+
+async def presses(session: RoomSession) -> LatencyWindow:
+    window = LatencyWindow(PRESSES * 2)
+    for _ in range(PRESSES):
+        for talking in (True, False):
+            started = time.perf_counter()
+            await session.ptt.set_talking(session.audio_track, talking)
+            window.record((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(0.005)
+    return window
+
+
+async def run(rooms: int, streams: int, sampling: bool) -> tuple[dict, dict, int]:
+    sessions = []
+    for i in range(rooms):
+        session = RoomSession("ws://simulated", "")
+        session.room = StatsRoom(f"room-{i}", streams)
+        session.status = "connected"
+        session.audio_track = FakeLocalTrack()
+        SESSIONS.add(session)
+        sessions.append(session)
+    sampler = MetricsSampler(interval=0.05)
+    LOOP_LAG.reset()
+    if sampling:
+        sampler.start()
+    else:
+        sampler._tasks = [asyncio.create_task(sampler._watch_loop())]
+    await asyncio.sleep(0.3)
+    window = await presses(sessions[0])
+    sampler.stop()
+    for session in sessions:
+        SESSIONS.discard(session)
+    return window.summary(), LOOP_LAG.summary(), sampler.skipped
+
+
+async def main(rooms: int, streams: int):
+    for sampling in (False, True):
+        press, lag, skipped = await run(rooms, streams, sampling)
+        label = "sampling every 50 ms" if sampling else "no sampling"
+        print(
+            f"{label:>21}: press p50 {press['p50']:.2f} ms p99 {press['p99']:.2f} ms,"
+            f" loop lag p50 {lag['p50']:.2f} ms p99 {lag['p99']:.2f} ms,"
+            f" rooms skipped for PTT {skipped}"
+        )
+    started = time.perf_counter()
+    text = render()
+    print(
+        f"scrape: {len(text.splitlines())} lines,"
+        f" {(time.perf_counter() - started) * 1000:.2f} ms to render"
+    )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args or [20, 500])))
@@ -0,0 +1,41 @@
+"""CPU cost and memory of an idle (muted) mic session, with and without pre-roll.
+
+Feeds simulated seconds of 10 ms PCM blocks through MicPipeline as fast as
+possible and reports CPU time per second of audio.
+
+Run with: python -m benchmarks.preroll_cpu [seconds] [preroll_ms]
+"""
+
+import asyncio
+import sys
+import time
+import numpy as np
+from app.services.mic import FRAME_SAMPLES, MicPipeline
+
+
+async def idle_cost(seconds: int, preroll_ms: int) -> dict[str, float]:
+    mic = MicPipeline(preroll_ms=preroll_ms)
+    rng = np.random.default_rng(3)
+    blocks = rng.integers(-2000, 2000, size=(100, FRAME_SAMPLES), dtype=np.int16)
+    started = time.process_time()
+    for i in range(seconds * 100):
+        await mic.push(blocks[i % 100])
+    cpu = time.process_time() - started
+    await mic.aclose()
+    return {
+        "preroll_ms": preroll_ms,
+        "cpu_ms_per_audio_s": round(cpu * 1000 / seconds, 3),
+        "cpu_pct_of_core": round(cpu * 100 / seconds, 4),
+        "frames_sent": mic.frames_sent,
+        "preroll_bytes": mic.preroll_bytes,
+    }
+
+
+async def main(seconds: int, preroll_ms: int):
+    print(await idle_cost(seconds, 0))
+    print(await idle_cost(seconds, preroll_ms))
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args or [60, 300])))
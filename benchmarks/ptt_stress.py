@@ -0,0 +1,118 @@
+"""Hammers PTT press/release while a large synthetic room is being refreshed.
+
+Compares the old path (PTT waits for the state lock held by the roster
+refresh) with the PTT lane. Exits non-zero if the lane ever leaves the mic in
+the wrong state or its p99 queueing delay exceeds the budget.
+
+Run with: python -m benchmarks.ptt_stress [participants] [presses]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from app.services.ptt import PttLane
+from app.services.registry import TrackRegistry
+from app.services.stats import LatencyWindow
+from benchmarks.fake_room import FakeRoom
+
+LANE_P99_BUDGET_MS = 5.0
+
+
+class FakeLocalTrack:
+    """Stand-in for rtc.LocalAudioTrack; mute and unmute are synchronous there too."""
+
+    def __init__(self):
+        self.muted = True
+        self.unmutes = 0
+
+    def unmute(self):
+        self.muted = False
+        self.unmutes += 1
+
+    def mute(self):
+        self.muted = True
+
+
+async def refresh_forever(room: FakeRoom, state_lock: asyncio.Lock, chunk: int = 50):
+    """Legacy-style refresh: walks the whole room while holding the state lock."""
+    registry = TrackRegistry()
+    while True:
+        async with state_lock:
+            for i, p in enumerate(room.remote_participants.values()):
+                registry.add_participant(p).row()
+                if i % chunk == 0:
+                    await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+
+async def hammer(press, release, presses: int, rng: random.Random):
+    for _ in range(presses):
+        await press()
+        await asyncio.sleep(rng.uniform(0, 0.004))
+        await release()
+        await asyncio.sleep(rng.uniform(0, 0.004))
+
+
+async def measure(participants: int, presses: int) -> dict:
+    """Queueing delay of both paths, and whether the lane left the mic open."""
+    room = FakeRoom()
+    room.populate(participants)
+    state_lock = asyncio.Lock()
+    refresher = asyncio.create_task(refresh_forever(room, state_lock))
+    rng = random.Random(11)
+
+    legacy_pub = FakeLocalTrack()
+    legacy_delay = LatencyWindow(presses * 2)
+
+    async def legacy(talking: bool):
+        requested = time.perf_counter()
+        async with state_lock:
+            legacy_delay.record((time.perf_counter() - requested) * 1000)
+            legacy_pub.unmute() if talking else legacy_pub.mute()
+
+    await hammer(lambda: legacy(True), lambda: legacy(False), presses, rng)
+
+    lane = PttLane()
+    lane.queue_delay = LatencyWindow(presses * 2)
+    lane_pub = FakeLocalTrack()
+    await hammer(
+        lambda: lane.set_talking(lane_pub, True),
+        lambda: lane.set_talking(lane_pub, False),
+        presses,
+        rng,
+    )
+    lane_summary = lane.queue_delay.summary()
+    # Overlapping requests queue behind each other on purpose; this only
+    # checks that the last request (a release) wins.
+    burst = []
+    for _ in range(presses):
+        burst.append(asyncio.create_task(lane.set_talking(lane_pub, True)))
+        burst.append(asyncio.create_task(lane.set_talking(lane_pub, False)))
+    await asyncio.gather(*burst)
+    refresher.cancel()
+    return {
+        "state_lock": legacy_delay.summary(),
+        "lane": lane_summary,
+        "mic_open": not lane_pub.muted or lane.transmitting,
+    }
+
+
+async def run(participants: int, presses: int) -> int:
+    r = await measure(participants, presses)
+    print(f"participants={participants} presses={presses}")
+    print(f"  state lock: {r['state_lock']}")
+    print(f"  ptt lane:   {r['lane']}")
+    failures = 0
+    if r["mic_open"]:
+        print("FAIL: mic left open after final release")
+        failures += 1
+    if r["lane"]["p99"] > LANE_P99_BUDGET_MS:
+        print(f"FAIL: lane p99 above {LANE_P99_BUDGET_MS} ms")
+        failures += 1
+    return failures
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    sys.exit(asyncio.run(run(*(args or [2000, 200]))))
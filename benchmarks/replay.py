@@ -0,0 +1,286 @@
+"""Replays a room journal through the roster and PTT logic faster than real time.
+
+The journal's room events are re-emitted with their recorded sids on the
+suite's Harness: RosterTracker -> RosterFanout -> the state delta
+monitor_room would send, plus FloorControl and the session PTT path for
+the recorded presses. Timing is compressed `--speed` times; the roster's
+own flush window still runs in real time. Roster event-to-state latency,
+state delta bytes and CPU per push (the whole replay's CPU, simulator
+included), and press latency are compared with benchmarks/baselines/
+replay.json under the journal's file name and speed, like the suite does;
+--save records the baseline for that journal.
+
+--capture records a synthetic journal from the suite's simulator instead
+and measures what journaling costs per room event.
+
+Run with: python -m benchmarks.replay JOURNAL [--speed 20] [--save]
+          python -m benchmarks.replay --capture journal/synthetic.ptj
+          [--participants 200] [--seconds 60]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from app.services.journal import (
+    CONNECTED,
+    DISCONNECTED,
+    MUTED,
+    PTT_PRESS,
+    PTT_RELEASE,
+    PUBLISHED,
+    RESET,
+    SPEAKERS,
+    SUBSCRIBED,
+    UNMUTED,
+    UNPUBLISHED,
+    UNSUBSCRIBED,
+    RoomJournal,
+    read_journal,
+)
+from app.services.ptt import PttTrace
+from app.services.roster import RosterTracker
+from app.services.stats import LatencyWindow
+from benchmarks.fake_room import FakeParticipant, FakePublication
+from benchmarks.simulator import RoomSimulator, SimulatedRoom
+from benchmarks.suite import TOLERANCE, Harness, compare, result
+
+BASELINE = Path(__file__).parent / "baselines" / "replay.json"
+RATES = {"joins": 1.0, "leaves": 1.0, "mutes": 5.0}
+OVERHEAD_EVENTS = 20000
+
+
+class Replayer:
+    """Turns journal records back into room events on a Harness."""
+
+    def __init__(self, harness: Harness):
+        self.harness = harness
+        self.press_ms = LatencyWindow()
+        self.events = 0
+        self._presses: set[asyncio.Task] = set()
+
+    @property
+    def room(self) -> SimulatedRoom:
+        return self.harness.room
+
+    def _find(self, sid: str, track_sid: str):
+        p = self.room.remote_participants.get(sid)
+        pub = p.track_publications.get(track_sid) if p is not None else None
+        return (p, pub) if pub is not None else (None, None)
+
+    def apply(self, code: int, args: tuple):
+        room = self.room
+        if code == CONNECTED:
+            p = FakeParticipant(args[1])
+            p.sid = args[0]
+            room.remote_participants[p.sid] = p
+            room.emit("participant_connected", p)
+        elif code == DISCONNECTED:
+            p = room.remote_participants.get(args[0])
+            if p is not None:
+                room.leave(p)
+        elif code == PUBLISHED:
+            p = room.remote_participants.get(args[0])
+            if p is None:
+                return
+            pub = FakePublication(args[2])
+            pub.sid = args[1]
+            p.track_publications[pub.sid] = pub
+            room.emit("track_published", pub, p)
+        elif code in (UNPUBLISHED, SUBSCRIBED, UNSUBSCRIBED, MUTED, UNMUTED):
+            p, pub = self._find(*args)
+            if p is None:
+                return
+            if code == UNPUBLISHED:
+                room.unpublish(p, pub)
+            elif code in (SUBSCRIBED, UNSUBSCRIBED):
+                room.set_subscribed(p, pub, code == SUBSCRIBED)
+            else:
+                room.set_muted(p, pub, code == MUTED)
+        elif code == SPEAKERS:
+            speakers = [
+                room.remote_participants[sid]
+                for sid in args
+                if sid in room.remote_participants
+            ]
+            room.emit("active_speakers_changed", speakers)
+        elif code == PTT_PRESS:
+            self._track(self._press())
+        elif code == PTT_RELEASE:
+            self._track(self.harness.session.stop_talking())
+        elif code == RESET:
+            self._reset()
+
+    def _reset(self):
+        """A reconnect: the session moves to an empty replacement room."""
+        room = SimulatedRoom()
+        session = self.harness.session
+        self.harness.room = session.room = room
+        session.roster.rebind(room)
+        session.floor.rebind(room)
+
+    def _track(self, coro):
+        task = asyncio.create_task(coro)
+        self._presses.add(task)
+        task.add_done_callback(self._presses.discard)
+
+    async def _press(self):
+        started = time.perf_counter()
+        if await self.harness.session.start_talking(PttTrace()):
+            self.press_ms.record((time.perf_counter() - started) * 1000)
+
+    async def run(self, records: list[tuple[int, int, tuple]], speed: float):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for at_ms, code, args in records:
+            delay = started + at_ms / 1000 / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.apply(code, args)
+            self.events += 1
+            if code in (PTT_PRESS, PTT_RELEASE):
+                # Let the press or release journal itself before the room
+                # events recorded right after it are re-emitted.
+                await asyncio.sleep(0)
+        await asyncio.gather(*self._presses, return_exceptions=True)
+
+
+async def replay(path: Path, speed: float) -> tuple[dict, dict]:
+    records = list(read_journal(path))
+    harness = Harness(0, dict.fromkeys(RATES, 0.0))
+    replayer = Replayer(harness)
+    roster = harness.session.roster
+    roster.latency = LatencyWindow()
+    started, cpu = time.perf_counter(), time.process_time()
+    await replayer.run(records, speed)
+    await asyncio.sleep(0.2)
+    wall, cpu = time.perf_counter() - started, time.process_time() - cpu
+    pushes = harness.pushes
+    # Compressing time changes how much each roster flush coalesces, so a
+    # baseline only holds for the speed it was recorded at.
+    name = f"{path.stem}x{speed:g}"
+    results = {
+        f"monitor_room@{name}": result(
+            roster.latency, pushes, cpu, harness.delta_bytes / max(1, pushes)
+        ),
+        f"start_talking@{name}": result(
+            replayer.press_ms, replayer.press_ms.count, 0.0
+        ),
+    }
+    await harness.close()
+    recorded = records[-1][0] / 1000 if records else 0.0
+    info = {"events": replayer.events, "recorded_s": recorded, "wall_s": wall}
+    return results, info
+
+
+async def overhead(participants: int) -> tuple[float, float, float, float]:
+    """CPU us per room event without and with a journal, per record, and B/event.
+
+    Most of the difference is the SDK dispatching to one more handler, which
+    inspects the callback's signature on every event.
+    """
+    costs, size = [], 0.0
+    kinds, weights = zip(*(("join", 1), ("leave", 1), ("mute", 5)), strict=True)
+    for journaled in (False, True):
+        room = SimulatedRoom()
+        simulator = RoomSimulator(room, participants, seed=3)
+        roster = RosterTracker(room)
+        roster.attach()
+        rng = random.Random(5)
+        with tempfile.TemporaryDirectory() as folder:
+            journal = RoomJournal(room, Path(folder) / "overhead.ptj")
+            if journaled:
+                journal.attach()
+            events = journal.events
+            cpu = time.process_time()
+            for _ in range(OVERHEAD_EVENTS):
+                simulator._step(rng.choices(kinds, weights)[0])
+            costs.append((time.process_time() - cpu) / OVERHEAD_EVENTS * 1e6)
+            if journaled:
+                journal.close()
+                size = journal.bytes / max(1, journal.events - events)
+        roster.close()
+    with tempfile.TemporaryDirectory() as folder:
+        journal = RoomJournal(SimulatedRoom(), Path(folder) / "record.ptj")
+        cpu = time.process_time()
+        for _ in range(OVERHEAD_EVENTS):
+            journal.record(MUTED, "PA_journal", "TR_journal")
+        record_us = (time.process_time() - cpu) / OVERHEAD_EVENTS * 1e6
+    return costs[0], costs[1], record_us, size
+
+
+async def capture(path: Path, participants: int, seconds: float):
+    harness = Harness(participants, RATES)
+    journal = RoomJournal(harness.room, path)
+    journal.attach(harness.session.floor)
+    harness.session.journal = journal
+    rng = random.Random(9)
+
+    async def ptt():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        while loop.time() < deadline:
+            await asyncio.sleep(rng.expovariate(1 / 4))
+            asyncio.create_task(harness.session.start_talking(PttTrace()))
+            await asyncio.sleep(rng.uniform(0.5, 3))
+            await harness.session.stop_talking()
+
+    await asyncio.gather(harness.simulator.run(seconds), ptt())
+    journal.close()
+    await harness.close()
+    print(
+        f"captured {journal.events} events in {seconds:.0f} s to {path}:"
+        f" {journal.bytes} bytes, {journal.bytes / max(1, journal.events):.1f} B/event"
+    )
+    without, with_journal, record_us, size = await overhead(participants)
+    print(
+        f"room event cost: {without:.1f} us without the journal,"
+        f" {with_journal:.1f} us with it (+{with_journal - without:.1f} us,"
+        f" of which {record_us:.1f} us encoding; {size:.1f} B/event)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("journal", type=Path)
+    parser.add_argument("--speed", type=float, default=20.0)
+    parser.add_argument("--save", action="store_true", help="rewrite the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--capture", action="store_true")
+    parser.add_argument("--participants", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    args = parser.parse_args()
+    if args.capture:
+        args.journal.parent.mkdir(parents=True, exist_ok=True)
+        asyncio.run(capture(args.journal, args.participants, args.seconds))
+        return 0
+    results, info = asyncio.run(replay(args.journal, max(args.speed, 1e-3)))
+    print(
+        f"{info['events']} events recorded over {info['recorded_s']:.1f} s"
+        f" replayed in {info['wall_s']:.1f} s"
+        f" ({info['recorded_s'] / max(info['wall_s'], 1e-9):.1f}x)"
+    )
+    print(f"{'scenario':<34}{'p50 ms':>9}{'p95 ms':>9}{'delta B':>10}{'cpu us':>9}")
+    for key, m in results.items():
+        print(
+            f"{key:<34}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}"
+            f"{m['delta_bytes']:>10}{m['cpu_us']:>9.1f}"
+        )
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    if args.save:
+        BASELINE.parent.mkdir(exist_ok=True)
+        BASELINE.write_text(json.dumps({**baseline, **results}, indent=2) + "\n")
+        print(f"baseline saved to {BASELINE}")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Event-to-UI roster latency and push size, event-driven vs. 0.5 s polling.
+
+`avg_patch_bytes` is what the tracker changed; `avg_sent_bytes` is the
+Reflex delta LiveKitState produces for the push, the changed page rows
+and stats.
+
+Run with: python -m benchmarks.roster_latency [participants] [events]
+"""
+
+import asyncio
+import random
+import sys
+from types import SimpleNamespace
+from app.services.roster import RosterTracker, patch_size
+from app.states.livekit_state import LiveKitState
+from benchmarks.fake_room import FakeRoom
+
+
+async def measure(
+    mode: str, participants: int, events: int, window: float = 0.05
+) -> dict[str, float]:
+    room = FakeRoom()
+    units = room.populate(participants)
+    pushes = {"count": -1, "patch_bytes": 0, "sent_bytes": 0}
+    roster = RosterTracker(room)
+    roster.attach()
+    state = LiveKitState(_reflex_internal_init=True)
+    state._session = SimpleNamespace(roster=roster, thumbnails=None, autosub=None)
+
+    async def consume():
+        async for patch in roster.updates(mode, window=window):
+            state._push_roster(roster)
+            state._clean()
+            pushes["count"] += 1
+            if pushes["count"]:
+                pushes["patch_bytes"] += patch_size(patch)
+                pushes["sent_bytes"] += state.roster_push["delta_bytes"]
+
+    consumer = asyncio.create_task(consume())
+    rng = random.Random(7)
+    await asyncio.sleep(0.6)
+    for _ in range(events):
+        p = rng.choice(units)
+        pub = next(iter(p.track_publications.values()))
+        room.set_subscribed(p, pub, not pub.subscribed)
+        await asyncio.sleep(rng.uniform(0.05, 0.25))
+    await asyncio.sleep(0.6)
+    roster.close()
+    await consumer
+    count = max(1, pushes["count"])
+    return {
+        **roster.latency.summary(),
+        "pushes": pushes["count"],
+        "avg_patch_bytes": round(pushes["patch_bytes"] / count),
+        "avg_sent_bytes": round(pushes["sent_bytes"] / count),
+    }
+
+
+async def main(participants: int, events: int):
+    for mode in ("poll", "events"):
+        summary = await measure(mode, participants, events)
+        print(f"{mode:>6}: {summary}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args or [200, 60])))
@@ -0,0 +1,106 @@
+"""Paged, sorted and searched roster views vs. the full list per update.
+
+Builds a roster of N rows, then for a stream of single-row patches compares
+the old path (copy and serialize every row, sort per request) with the
+directory (maintained indexes, one page sent only when it changed).
+
+Run with: python -m benchmarks.roster_window [participants] [updates]
+"""
+
+import random
+import sys
+import time
+from app.services.directory import ROSTER_PAGE_SIZE, RosterDirectory
+from app.services.roster import patch_size
+
+SORTS = {
+    "talking": lambda row: (not row["speaking"], row["identity"].casefold()),
+    "audio": lambda row: (
+        not row["audio_subscribed"],
+        not row["has_audio"],
+        row["identity"].casefold(),
+    ),
+}
+
+
+def make_row(i: int, rng: random.Random) -> dict:
+    return {
+        "sid": f"PA_{i}",
+        "identity": f"{rng.choice(('unit', 'car', 'base', 'med'))}-{i:05d}",
+        "has_audio": True,
+        "audio_subscribed": rng.random() < 0.1,
+        "has_video": True,
+        "video_subscribed": rng.random() < 0.01,
+        "video_track": f"TR_{i}",
+        "has_screen": False,
+        "screen_subscribed": False,
+        "speaking": False,
+    }
+
+
+def main(participants: int, updates: int):
+    rng = random.Random(9)
+    rows = {f"PA_{i}": make_row(i, rng) for i in range(participants)}
+    directory = RosterDirectory()
+    started = time.perf_counter()
+    directory.apply(rows)
+    print(
+        f"{participants} rows indexed in {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+
+    full_bytes = page_bytes = full_s = page_s = 0.0
+    page = []
+    for _ in range(updates):
+        sid = rng.choice(list(rows))
+        row = {**rows[sid], "speaking": not rows[sid]["speaking"]}
+        rows[sid] = row
+        started = time.perf_counter()
+        full_bytes += patch_size(list(rows.values()))
+        full_s += time.perf_counter() - started
+        started = time.perf_counter()
+        directory.apply({sid: row})
+        view, _ = directory.view("talking")
+        if view != page:
+            page = view
+            page_bytes += patch_size(view)
+        page_s += time.perf_counter() - started
+    print(
+        f"per update: full list {full_bytes / updates / 1024:.1f} KiB,"
+        f" {full_s / updates * 1e6:.0f} us | page of {ROSTER_PAGE_SIZE}"
+        f" {page_bytes / updates / 1024:.2f} KiB, {page_s / updates * 1e6:.0f} us"
+    )
+
+    for order, key in SORTS.items():
+        started = time.perf_counter()
+        for _ in range(100):
+            sorted(rows.values(), key=key)[:ROSTER_PAGE_SIZE]
+        sort_us = (time.perf_counter() - started) / 100 * 1e6
+        started = time.perf_counter()
+        for _ in range(100):
+            directory.view(order, offset=rng.randrange(participants))
+        view_us = (time.perf_counter() - started) / 100 * 1e6
+        print(
+            f"order {order:>8}: sort per request {sort_us:.0f} us, index {view_us:.0f} us"
+        )
+
+    for prefix in ("car-0001", "med", "u"):
+        started = time.perf_counter()
+        for _ in range(100):
+            matches = [
+                r for r in rows.values() if r["identity"].casefold().startswith(prefix)
+            ]
+            sorted(matches, key=SORTS["talking"])[:ROSTER_PAGE_SIZE]
+        scan_us = (time.perf_counter() - started) / 100 * 1e6
+        started = time.perf_counter()
+        for _ in range(100):
+            _, total = directory.view("talking", prefix)
+        view_us = (time.perf_counter() - started) / 100 * 1e6
+        print(
+            f"prefix {prefix!r:>10} ({total} hits): scan {scan_us:.0f} us,"
+            f" index {view_us:.0f} us"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*(args or [5000, 2000]))
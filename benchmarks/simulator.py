@@ -0,0 +1,90 @@
+"""Synthetic room traffic for benchmarking without a LiveKit server.
+
+`SimulatedRoom` is a FakeRoom whose subscriptions complete after an SFU
+round trip, and `RoomSimulator` drives it with Poisson joins, leaves and
+mic mute flips at configurable rates while keeping the population steady.
+"""
+
+import asyncio
+import itertools
+import random
+from livekit import rtc
+from benchmarks.fake_room import FakeParticipant, FakePublication, FakeRoom
+
+SFU_DELAY_S = 0.02
+
+
+class SimulatedRoom(FakeRoom):
+    """FakeRoom whose set_subscribed lands `sfu_delay` seconds later."""
+
+    def __init__(self, sfu_delay: float = SFU_DELAY_S):
+        super().__init__()
+        self.sfu_delay = sfu_delay
+
+    def publish(self, p: FakeParticipant, source: rtc.TrackSource.ValueType):
+        pub = super().publish(p, source)
+        pub.set_subscribed = lambda subscribed: self._signal(p, pub, subscribed)
+        return pub
+
+    def _signal(self, p: FakeParticipant, pub: FakePublication, subscribed: bool):
+        asyncio.get_running_loop().call_later(
+            self.sfu_delay, self._land, p, pub, subscribed
+        )
+
+    def _land(self, p: FakeParticipant, pub: FakePublication, subscribed: bool):
+        if p.sid in self.remote_participants and pub.subscribed != subscribed:
+            self.set_subscribed(p, pub, subscribed)
+
+
+class RoomSimulator:
+    """Poisson churn on a SimulatedRoom; every rate is events per second."""
+
+    def __init__(
+        self,
+        room: SimulatedRoom,
+        participants: int,
+        joins: float = 1.0,
+        leaves: float = 1.0,
+        mutes: float = 5.0,
+        seed: int = 1,
+    ):
+        self.room = room
+        self.rates = {"join": joins, "leave": leaves, "mute": mutes}
+        self._rng = random.Random(seed)
+        self._names = itertools.count()
+        self.events = dict.fromkeys(self.rates, 0)
+        for _ in range(participants):
+            self._join()
+
+    def _join(self):
+        self.room.join(f"unit-{next(self._names):05d}")
+
+    def _step(self, kind: str):
+        units = list(self.room.remote_participants.values())
+        if kind == "join" or not units:
+            self._join()
+        elif kind == "leave":
+            self.room.leave(self._rng.choice(units))
+        else:
+            p = self._rng.choice(units)
+            for pub in p.track_publications.values():
+                if pub.source == rtc.TrackSource.SOURCE_MICROPHONE:
+                    self.room.set_muted(p, pub, not pub.muted)
+        self.events[kind] += 1
+
+    async def run(self, seconds: float):
+        """Fires events for `seconds`, interleaving the kinds by their rates."""
+        total = sum(self.rates.values())
+        if total <= 0:
+            await asyncio.sleep(seconds)
+            return
+        kinds, weights = zip(*self.rates.items(), strict=True)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        while True:
+            delay = self._rng.expovariate(total)
+            if loop.time() + delay > deadline:
+                await asyncio.sleep(max(0.0, deadline - loop.time()))
+                return
+            await asyncio.sleep(delay)
+            self._step(self._rng.choices(kinds, weights)[0])
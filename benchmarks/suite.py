@@ -0,0 +1,265 @@
+"""Hot-path benchmark suite for LiveKitState, with saved baselines.
+
+For each room size a SimulatedRoom is churned (joins, leaves, mute flips)
+while a LiveKitState instance on a RoomSession is driven the way the app
+drives it:
+
+- monitor_room: room event -> roster patch pushed through the state's own
+  _push_roster, and the bytes of the Reflex delta that push produces
+- roster_view: paging, sort and search events -> page rows re-sent, and
+  the delta bytes the browser re-renders from
+- toggle_subscription: click -> SFU round trip -> row flipped in state
+- start_talking: PTT press -> floor granted and mic unmuted
+
+CPU is process time spent per operation, simulator included. Results are
+compared against benchmarks/baselines/suite.json and the run exits non-zero
+on a regression beyond the tolerance; --save rewrites the baseline.
+
+Run with: python -m benchmarks.suite [--sizes 10,100,1000] [--save]
+          [--joins 1] [--leaves 1] [--mutes 5]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from reflex.utils import format
+from app.services.floor import FloorControl
+from app.services.hub import RosterFanout
+from app.services.ptt import PttTrace
+from app.services.roster import RosterTracker
+from app.services.session import RoomSession
+from app.services.stats import LatencyWindow
+from app.states.livekit_state import ROSTER_SLOTS, LiveKitState
+from benchmarks.ptt_stress import FakeLocalTrack
+from benchmarks.simulator import RoomSimulator, SimulatedRoom
+
+BASELINE = Path(__file__).parent / "baselines" / "suite.json"
+PHASE_S = 3.0
+TOGGLES_PER_S = 20
+PRESSES_PER_S = 20
+VIEWS_PER_S = 20
+# A metric regresses when it grows by more than TOLERANCE plus some slack:
+# the floor below, or for latencies the baseline's own p50-p95 spread, since
+# toggles land anywhere inside a roster flush window.
+TOLERANCE = 0.5
+FLOORS = {"p50_ms": 1.0, "p95_ms": 2.0, "delta_bytes": 256, "cpu_us": 250.0}
+# What a user does to the roster list besides watching it.
+VIEWS = (
+    ("roster_page", 1),
+    ("roster_page", -1),
+    ("set_roster_order", "talking"),
+    ("set_roster_query", "unit-00"),
+    ("set_roster_query", ""),
+    ("set_roster_order", "name"),
+)
+
+
+class Harness:
+    """A LiveKitState on a RoomSession over a simulated room."""
+
+    def __init__(self, participants: int, rates: dict[str, float]):
+        self.room = SimulatedRoom()
+        self.simulator = RoomSimulator(self.room, participants, **rates)
+        self.session = RoomSession("ws://simulated", "")
+        self.session.room = self.room
+        self.session.roster = RosterTracker(self.room)
+        self.session.roster.attach()
+        self.session.floor = FloorControl(self.room)
+        self.session.floor.attach()
+        self.session.audio_track = FakeLocalTrack()
+        self.session.audio_publication = object()
+        self.state = LiveKitState(_reflex_internal_init=True)
+        self.state._session = self.session
+        self.fanout = RosterFanout(self.session.roster, "events", 0.05)
+        self.pushes = 0
+        self.delta_bytes = 0
+        self.toggles: dict[str, tuple[bool, float]] = {}
+        self.toggle_ms = LatencyWindow()
+        self._monitor = asyncio.create_task(self._monitor_room())
+
+    def page(self) -> list[dict]:
+        """The roster rows the browser shows, in order."""
+        return [getattr(self.state, ROSTER_SLOTS[s]) for s in self.state.roster_slots]
+
+    def sent(self) -> int:
+        """Bytes of the state's pending delta, which is then marked sent."""
+        size = len(format.json_dumps(self.state.get_delta()))
+        self.state._clean()
+        return size
+
+    async def _monitor_room(self):
+        async for patch in self.fanout.subscribe():
+            self.state._push_roster(self.fanout.roster)
+            self.delta_bytes += self.sent()
+            self.pushes += 1
+            now = time.perf_counter()
+            for sid, row in patch.items():
+                expected = self.toggles.get(sid)
+                if expected and row and row["audio_subscribed"] == expected[0]:
+                    self.toggle_ms.record((now - expected[1]) * 1000)
+                    del self.toggles[sid]
+
+    async def close(self):
+        self.fanout.close()
+        self.session.roster.close()
+        self.session.floor.close()
+        self._monitor.cancel()
+        await asyncio.gather(self._monitor, return_exceptions=True)
+
+
+async def measure(harness: Harness, load) -> tuple[float, float]:
+    """(seconds, cpu seconds) of `load` running alongside the churn."""
+    started, cpu = time.perf_counter(), time.process_time()
+    await asyncio.gather(harness.simulator.run(PHASE_S), load)
+    return time.perf_counter() - started, time.process_time() - cpu
+
+
+def result(window: LatencyWindow, ops: int, cpu: float, delta: float = 0) -> dict:
+    summary = window.summary()
+    return {
+        "p50_ms": summary["p50"],
+        "p95_ms": summary["p95"],
+        "delta_bytes": round(delta),
+        "cpu_us": round(cpu / max(1, ops) * 1e6, 1),
+        "ops": ops,
+    }
+
+
+async def monitor_room(harness: Harness) -> dict:
+    roster = harness.session.roster
+    roster.latency = LatencyWindow()
+    pushes, delta = harness.pushes, harness.delta_bytes
+    _, cpu = await measure(harness, asyncio.sleep(0))
+    ops = harness.pushes - pushes
+    return result(roster.latency, ops, cpu, (harness.delta_bytes - delta) / max(1, ops))
+
+
+async def roster_view(harness: Harness) -> dict:
+    state = harness.state
+    view_ms = LatencyWindow()
+    sent = 0
+
+    async def views():
+        nonlocal sent
+        for event, arg in itertools.islice(
+            itertools.cycle(VIEWS), int(PHASE_S * VIEWS_PER_S)
+        ):
+            await asyncio.sleep(1 / VIEWS_PER_S)
+            started = time.perf_counter()
+            getattr(state, event)(arg)
+            sent += harness.sent()
+            view_ms.record((time.perf_counter() - started) * 1000)
+
+    _, cpu = await measure(harness, views())
+    return result(view_ms, view_ms.count, cpu, sent / max(1, view_ms.count))
+
+
+async def toggle_subscription(harness: Harness) -> dict:
+    rng = random.Random(2)
+
+    async def clicks():
+        for _ in range(int(PHASE_S * TOGGLES_PER_S)):
+            await asyncio.sleep(1 / TOGGLES_PER_S)
+            page = harness.page()
+            if not page:
+                continue
+            row = rng.choice(page)
+            if row["sid"] in harness.toggles or not row["has_audio"]:
+                continue
+            started = time.perf_counter()
+            if harness.session.toggle_subscription(row["sid"], "audio") is not None:
+                harness.toggles[row["sid"]] = (not row["audio_subscribed"], started)
+
+    harness.toggle_ms = LatencyWindow()
+    _, cpu = await measure(harness, clicks())
+    await asyncio.sleep(0.2)
+    return result(harness.toggle_ms, harness.toggle_ms.count, cpu)
+
+
+async def start_talking(harness: Harness) -> dict:
+    session = harness.session
+    press_ms = LatencyWindow()
+
+    async def presses():
+        for _ in range(int(PHASE_S * PRESSES_PER_S / 2)):
+            started = time.perf_counter()
+            if await session.start_talking(PttTrace()):
+                press_ms.record((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(1 / PRESSES_PER_S)
+            await session.stop_talking()
+            await asyncio.sleep(1 / PRESSES_PER_S)
+
+    _, cpu = await measure(harness, presses())
+    return result(press_ms, press_ms.count, cpu)
+
+
+SCENARIOS = {
+    "monitor_room": monitor_room,
+    "roster_view": roster_view,
+    "toggle_subscription": toggle_subscription,
+    "start_talking": start_talking,
+}
+
+
+async def run(sizes: list[int], rates: dict[str, float]) -> dict[str, dict]:
+    results = {}
+    for size in sizes:
+        harness = Harness(size, rates)
+        await asyncio.sleep(0.2)
+        for name, scenario in SCENARIOS.items():
+            results[f"{name}@{size}"] = await scenario(harness)
+        await harness.close()
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for key, metrics in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        spread = base.get("p95_ms", 0) - base.get("p50_ms", 0)
+        for metric, floor in FLOORS.items():
+            old, new = base.get(metric, 0), metrics[metric]
+            slack = max(floor, spread) if metric.endswith("_ms") else floor
+            if new > old * (1 + tolerance) + slack:
+                regressions.append(f"{key} {metric}: {old} -> {new}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000")
+    parser.add_argument("--save", action="store_true", help="rewrite the baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    for kind, rate in (("joins", 1.0), ("leaves", 1.0), ("mutes", 5.0)):
+        parser.add_argument(f"--{kind}", type=float, default=rate, help="per second")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    rates = {"joins": args.joins, "leaves": args.leaves, "mutes": args.mutes}
+    results = asyncio.run(run(sizes, rates))
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    print(f"{'scenario':<26}{'p50 ms':>9}{'p95 ms':>9}{'delta B':>10}{'cpu us':>9}")
+    for key, m in results.items():
+        print(
+            f"{key:<26}{m['p50_ms']:>9.2f}{m['p95_ms']:>9.2f}"
+            f"{m['delta_bytes']:>10}{m['cpu_us']:>9.1f}"
+        )
+    if args.save:
+        BASELINE.parent.mkdir(exist_ok=True)
+        BASELINE.write_text(json.dumps({**baseline, **results}, indent=2) + "\n")
+        print(f"baseline saved to {BASELINE}")
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
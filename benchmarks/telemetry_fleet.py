@@ -0,0 +1,151 @@
+"""Unit telemetry bandwidth per client as the fleet grows.
+
+Every unit is a TelemetryChannel on a FakeNetwork. Each one reads its GPS
+at 5 Hz while walking, reports battery every 10 s, keys PTT about 20% of
+the time and goes busy now and then. Measured per unit: payload bytes and
+packets per second sent and received, against a naive client that sends
+every reading as its own JSON message. Wire bytes add a rough per-packet
+cost for the LiveKit data packet envelope and SCTP/DTLS/UDP/IP headers.
+Every unit sends, but only the first RECEIVERS units are delivered to and
+the inbound numbers are averaged over them: receiving costs the same at
+every unit, and delivering to all of them would make the single-process
+simulation quadratic in fleet size. Tick lag is how late the simulation
+loop ran; when it grows the numbers undercount.
+
+Run with: python -m benchmarks.telemetry_fleet [seconds] [sizes]
+"""
+
+import asyncio
+import json
+import random
+import sys
+from app.services.telemetry import TelemetryChannel
+from benchmarks.fake_room import FakeNetwork
+
+GPS_HZ = 5
+BATTERY_S = 10.0
+TICK_S = 0.05
+RECEIVERS = 20
+# Rough per-packet overhead: protobuf envelope with identity and topic,
+# SCTP chunk, DTLS record, UDP/IPv4.
+WIRE_OVERHEAD = 110
+
+
+class Unit:
+    """Synthetic sensors and PTT habits of one unit."""
+
+    def __init__(self, rng: random.Random, channel: TelemetryChannel):
+        self.rng = rng
+        self.channel = channel
+        self.lat = 59.33 + rng.uniform(-0.05, 0.05)
+        self.lon = 18.06 + rng.uniform(-0.05, 0.05)
+        self.battery = rng.uniform(30, 100)
+        self.talking = False
+        self.busy = False
+        self.next_gps = rng.uniform(0, 1 / GPS_HZ)
+        self.next_battery = rng.uniform(0, BATTERY_S)
+        self.naive_bytes = 0
+        self.naive_packets = 0
+
+    def _naive(self, message: dict):
+        self.naive_bytes += len(json.dumps(message, separators=(",", ":")))
+        self.naive_packets += 1
+
+    def tick(self, now: float):
+        rng = self.rng
+        while self.next_gps <= now:
+            self.next_gps += 1 / GPS_HZ
+            # Walking pace plus a few metres of GPS noise.
+            self.lat += rng.gauss(0, 3e-6)
+            self.lon += rng.gauss(0, 5e-6)
+            position = (round(self.lat, 7), round(self.lon, 7))
+            self.channel.update(position=position)
+            self._naive({"type": "gps", "lat": position[0], "lon": position[1]})
+        if self.next_battery <= now:
+            self.next_battery += BATTERY_S
+            self.battery -= rng.uniform(0, 0.3)
+            self.channel.update(battery=round(self.battery))
+            self._naive({"type": "battery", "level": round(self.battery)})
+        # 4 s transmissions, about one in five seconds on the air.
+        flip = TICK_S / 4 if self.talking else TICK_S / 16
+        if rng.random() < flip:
+            self.talking = not self.talking
+            self.channel.update(talking=self.talking)
+            self._naive({"type": "talking", "on": self.talking})
+        if rng.random() < TICK_S / 60:
+            self.busy = not self.busy
+            self.channel.update(busy=self.busy)
+            self._naive({"type": "busy", "on": self.busy})
+
+
+async def run_fleet(size: int, seconds: float, seed: int = 7) -> dict[str, float]:
+    rng = random.Random(seed)
+    network = FakeNetwork(latency=0.02)
+    units = []
+    for i in range(size):
+        room = network.join(f"unit-{i:04d}", receive=i < RECEIVERS)
+        channel = TelemetryChannel(room)
+        channel.attach()
+        units.append(Unit(random.Random(rng.random()), channel))
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    ticks, late = 0, 0.0
+    while (now := loop.time() - started) < seconds:
+        for unit in units:
+            unit.tick(now)
+        await asyncio.sleep(TICK_S)
+        ticks += 1
+        late += loop.time() - started - now - TICK_S
+    await asyncio.sleep(0.1)
+    for unit in units:
+        unit.channel.close()
+    naive_bytes = sum(unit.naive_bytes for unit in units)
+    naive_packets = sum(unit.naive_packets for unit in units)
+    sent_bytes = sum(unit.channel.sent_bytes for unit in units)
+    sent_packets = sum(unit.channel.sent_packets for unit in units)
+    receivers = units[:RECEIVERS]
+    received_bytes = sum(unit.channel.received_bytes for unit in receivers)
+    received_packets = sum(unit.channel.received_packets for unit in receivers)
+    per_unit = size * seconds
+    per_receiver = len(receivers) * seconds
+    # Every naive message also reaches each of the other units.
+    naive_in = naive_bytes * (size - 1) / per_unit
+    naive_in_packets = naive_packets * (size - 1) / per_unit
+    return {
+        "sent_bps": sent_bytes / per_unit,
+        "sent_pps": sent_packets / per_unit,
+        "received_bps": received_bytes / per_receiver,
+        "received_pps": received_packets / per_receiver,
+        "naive_sent_bps": naive_bytes / per_unit,
+        "naive_received_bps": naive_in,
+        "wire_in": (received_bytes + WIRE_OVERHEAD * received_packets)
+        / per_receiver,
+        "naive_wire_in": naive_in + WIRE_OVERHEAD * naive_in_packets,
+        "stale": sum(unit.channel.stale for unit in receivers),
+        "lag_ms": late / max(1, ticks) * 1000,
+    }
+
+
+async def main(seconds: float, sizes: list[int]):
+    print(f"{seconds:.0f} s per fleet, GPS {GPS_HZ} Hz, per unit (payload B/s):")
+    for size in sizes:
+        r = await run_fleet(size, seconds)
+        print(
+            f"{size:>4} units: out {r['sent_bps']:6.1f} B/s"
+            f" ({r['sent_pps']:.2f} pkt/s, naive {r['naive_sent_bps']:6.1f}),"
+            f" in {r['received_bps']:8.1f} B/s"
+            f" ({r['received_pps']:6.1f} pkt/s, naive {r['naive_received_bps']:8.1f}),"
+            f" wire in ~{r['wire_in'] / 1000:6.1f} vs"
+            f" {r['naive_wire_in'] / 1000:6.1f} kB/s, {r['stale']} stale,"
+            f" tick lag {r['lag_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    sizes = (
+        [int(size) for size in sys.argv[2].split(",")]
+        if len(sys.argv) > 2
+        else [10, 25, 50, 100, 200]
+    )
+    asyncio.run(main(seconds, sizes))
@@ -0,0 +1,251 @@
+"""Roster thumbnails: cost per still, bandwidth per viewer and cache behaviour.
+
+1. A 640x480 camera frame through the change check and the JPEG encode, as
+   a unit does when asked for its still.
+2. One viewer and `units` units on a FakeNetwork. The viewer shows a page
+   of PAGE units and asks them for stills every round (the real
+   THUMB_INTERVAL_S, compressed to ROUND_S here); a quarter of the units
+   move, half of the cameras are paused by the governor. Compared with
+   subscribing to the same page at the lowest simulcast layer.
+3. The HTTP handler and LRU under browsers paging through a big roster with
+   Zipf-distributed page popularity, at several cache budgets: hit rate,
+   share answered 304, memory and how often a unit had to resend a still
+   because it had been evicted.
+
+Run with: python -m benchmarks.thumbnail_cache [units] [rounds]
+"""
+
+import asyncio
+import math
+import random
+import sys
+import time
+from types import SimpleNamespace
+import numpy as np
+from livekit import rtc
+from starlette.requests import Request
+import app.api as api
+import app.services.thumbnails as thumbnails
+from app.services.access import MEDIA_KEYS
+from app.services.registry import TrackRegistry
+from app.services.thumbnails import (
+    THUMB_HEIGHT,
+    THUMB_WIDTH,
+    ThumbnailCache,
+    ThumbnailExchange,
+    changed,
+    signature,
+    thumb_key,
+)
+from app.services.video import encode_jpeg, decimate
+from app.services.viewport import LAYERS, LOW
+from benchmarks.fake_room import FakeNetwork
+
+PAGE = 20
+ROUND_S = 0.25
+MOVING = 0.25
+PAUSED = 0.5
+ROSTER = 2000
+BROWSERS = 10
+VIEWS = 2000
+# One page view per second across all browsers; a unit's still visibly
+# changes every CHANGE_S on average.
+VIEW_S = 1.0
+CHANGE_S = 120.0
+BUDGETS = (256 * 1024, 1024 * 1024, 4 * 1024 * 1024)
+
+
+def scene(rng: np.random.Generator) -> np.ndarray:
+    """A smooth background with a few blocks, as BGR."""
+    y, x = np.mgrid[0:480, 0:640]
+    frame = np.stack(
+        [x * 255 // 640, y * 255 // 480, (x + y) * 255 // 1120], axis=2
+    ).astype(np.uint8)
+    for _ in range(4):
+        top, left = rng.integers(0, 380), rng.integers(0, 540)
+        frame[top : top + 100, left : left + 100] = rng.integers(0, 255, 3)
+    return frame
+
+
+class FakeCamera:
+    """CameraDevice stand-in: a still scene with sensor noise, maybe moving."""
+
+    def __init__(self, rng: np.random.Generator, moving: bool, paused: bool):
+        self.rng = rng
+        self.base = scene(rng)
+        self.moving = moving
+        self.paused = paused
+        self.x = 0
+        self.latest: np.ndarray | None = None
+        self.capture()
+
+    def capture(self):
+        frame = self.base.copy()
+        if self.moving:
+            self.x = (self.x + 37) % 540
+            frame[200:320, self.x : self.x + 100] = (40, 60, 200)
+        noise = self.rng.normal(0, 2, frame.shape)
+        self.latest = np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+    def still(self):
+        if self.paused:
+            self.capture()
+
+
+def still_cost(rounds: int = 50) -> tuple[float, float, float]:
+    """(signature us, encode ms, JPEG bytes) for one 640x480 frame."""
+    camera = FakeCamera(np.random.default_rng(1), True, False)
+    rgb = camera.latest[:, :, ::-1]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        changed(signature(rgb), signature(rgb))
+    signature_us = (time.perf_counter() - started) / rounds / 2 * 1e6
+    started = time.perf_counter()
+    for _ in range(rounds):
+        jpeg = encode_jpeg(
+            decimate(rgb, THUMB_WIDTH, THUMB_HEIGHT), THUMB_WIDTH, THUMB_HEIGHT
+        )
+    encode_ms = (time.perf_counter() - started) / rounds * 1000
+    return signature_us, encode_ms, len(jpeg)
+
+
+async def exchange(units: int, rounds: int) -> dict[str, float]:
+    thumbnails.THUMB_INTERVAL_S = ROUND_S
+    thumbnails.THUMB_STILL_WAIT_S = 0.02
+    rng = np.random.default_rng(3)
+    network = FakeNetwork(latency=0.02)
+    viewer_room = network.join("viewer")
+    registry = TrackRegistry()
+    viewer = ThumbnailExchange(viewer_room, registry)
+    viewer.attach()
+    publishers = []
+    for i in range(units):
+        room = network.join(f"unit-{i:04d}")
+        publisher = ThumbnailExchange(room, TrackRegistry())
+        publisher.camera = FakeCamera(rng, i % 4 == 0, i % 2 == 1)
+        publisher.attach()
+        publishers.append(publisher)
+    for p in list(viewer_room.remote_participants.values()):
+        viewer_room.publish(p, rtc.TrackSource.SOURCE_CAMERA)
+    registry.load(viewer_room)
+    shown = sorted(viewer_room.remote_participants, key=lambda sid: int(sid[3:]))
+    viewer.want("browser", shown[:PAGE])
+    for _ in range(rounds):
+        await asyncio.sleep(ROUND_S)
+        for publisher in publishers:
+            if not publisher.camera.paused:
+                publisher.camera.capture()
+    await asyncio.sleep(0.2)
+    for publisher in (viewer, *publishers):
+        publisher.close()
+    interval = thumbnails.THUMB_INTERVAL_S = 5.0
+    encodes = sum(publisher.encodes for publisher in publishers)
+    unchanged = sum(publisher.unchanged for publisher in publishers)
+    return {
+        "received_bps": viewer.bytes_received / rounds / interval,
+        "frames": viewer.frames_received,
+        "requests": viewer.requests_sent,
+        "encodes": encodes,
+        "unchanged": unchanged,
+        "low_layer_bps": PAGE * LAYERS[LOW][1] * 1000 / 8,
+    }
+
+
+async def browse(budget: int, jpegs: list[bytes]) -> dict[str, float]:
+    """Browsers paging through the roster against one cache budget."""
+    rng = random.Random(11)
+    cache = api.THUMBNAILS = thumbnails.THUMBNAILS = ThumbnailCache(budget)
+    media_key = MEDIA_KEYS.grant(SimpleNamespace(room=SimpleNamespace(name="bench")))
+    pages = ROSTER // PAGE
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(pages)]
+    picture = [rng.randrange(len(jpegs)) for _ in range(ROSTER)]
+    seen: list[dict[int, str]] = [{} for _ in range(BROWSERS)]
+    known: set[int] = set()
+    changed_at = [0.0] * ROSTER
+    sent = served = refills = 0
+    for view in range(VIEWS):
+        now = view * VIEW_S
+        page = rng.choices(range(pages), weights)[0]
+        browser = seen[rng.randrange(BROWSERS)]
+        for unit in range(page * PAGE, (page + 1) * PAGE):
+            if rng.random() < 1 - math.exp(-(now - changed_at[unit]) / CHANGE_S):
+                picture[unit] = rng.randrange(len(jpegs))
+                changed_at[unit] = now
+            sid = f"TR_{unit}"
+            key = thumb_key("bench", sid)
+            # Rows only carry an image once a still has arrived; the page
+            # renders before the exchange asks the shown units again.
+            if unit in known:
+                held = browser.get(unit, "")
+                request = Request(
+                    {
+                        "type": "http",
+                        "method": "GET",
+                        "path": f"/api/thumbs/{sid}",
+                        "path_params": {"track_sid": sid},
+                        "query_string": f"key={media_key}".encode(),
+                        "headers": [(b"if-none-match", f'"{held}"'.encode())],
+                    }
+                )
+                response = await api.thumbnail(request)
+                if response.status_code != 404:
+                    browser[unit] = response.headers["etag"].strip('"')
+                    served += len(cache._entries[key].jpeg)
+                sent += len(response.body)
+            if unit in known and key not in cache:
+                refills += 1
+            cache.put(key, jpegs[picture[unit]])
+            known.add(unit)
+    MEDIA_KEYS.revoke(media_key)
+    return {
+        **cache.stats(),
+        "refills_per_view": refills / VIEWS,
+        "sent_kb_per_view": sent / VIEWS / 1024,
+        "unconditional_kb_per_view": served / VIEWS / 1024,
+    }
+
+
+async def main(units: int, rounds: int):
+    signature_us, encode_ms, size = still_cost()
+    print(
+        f"still: change check {signature_us:.0f} us, encode {encode_ms:.2f} ms,"
+        f" {size} B JPEG ({THUMB_WIDTH}x{THUMB_HEIGHT} box)"
+    )
+    r = await exchange(units, rounds)
+    print(
+        f"{units} units, page of {PAGE}, {rounds} rounds:"
+        f" viewer in {r['received_bps'] / 1000:.2f} kB/s at 5 s rounds"
+        f" vs {r['low_layer_bps'] / 1000:.0f} kB/s for the page at the lowest layer;"
+        f" {r['requests']} requests, {r['frames']} stills received,"
+        f" {r['encodes']} encodes, {r['unchanged']} unchanged skipped"
+    )
+    rng = np.random.default_rng(9)
+    jpegs = []
+    for _ in range(64):
+        rgb = scene(rng)[:, :, ::-1]
+        jpegs.append(
+            encode_jpeg(
+                decimate(rgb, THUMB_WIDTH, THUMB_HEIGHT), THUMB_WIDTH, THUMB_HEIGHT
+            )
+        )
+    print(
+        f"{ROSTER} units, {BROWSERS} browsers, {VIEWS} Zipf page views,"
+        f" one view per {VIEW_S:.0f} s, stills change every ~{CHANGE_S:.0f} s:"
+    )
+    for budget in BUDGETS:
+        r = await browse(budget, jpegs)
+        print(
+            f"  {budget // 1024:>5} kB cache: {r['entries']:>5} stills,"
+            f" {r['kb']:7.1f} kB, hit rate {r['hit_rate']:5.1f}%,"
+            f" {r['not_modified_pct']:5.1f}% answered 304,"
+            f" {r['evictions']:>6} evictions,"
+            f" {r['refills_per_view']:5.2f} resends/view,"
+            f" {r['sent_kb_per_view']:6.1f} kB/view to the browser"
+            f" (vs {r['unconditional_kb_per_view']:.1f} without validators)"
+        )
+
+
+if __name__ == "__main__":
+    units = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    asyncio.run(main(units, rounds))
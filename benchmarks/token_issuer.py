@@ -0,0 +1,97 @@
+"""Access token issuance throughput and cache behaviour under reconnects.
+
+Signs tokens for distinct identities to measure raw issuance, times cached
+lookups, then runs leased sessions that reconnect at random for several
+token lifetimes (scaled down to seconds) while the refresher keeps their
+tokens ahead of expiry. Reports the hit rate, the provider latency a
+reconnect sees and whether any token handed out was already past expiry.
+
+Run with: python -m benchmarks.token_issuer [sessions]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from app.services.stats import LatencyWindow
+from app.services.tokens import TokenIssuer
+
+KEY, SECRET = "bench-key", "bench-secret-0123456789abcdef0123456789"
+MINTS = 2000
+LOOKUPS = 200_000
+TTL_S = 4.0
+REFRESH_S = 1.0
+RUN_S = 12.0
+RECONNECTS_PER_S = 2.0
+
+
+def issuance() -> tuple[float, float]:
+    """(tokens per second, mean us) signing a new token each time."""
+    issuer = TokenIssuer(KEY, SECRET)
+    started = time.perf_counter()
+    for i in range(MINTS):
+        issuer.token("bench", f"unit-{i:05d}")
+    elapsed = time.perf_counter() - started
+    return MINTS / elapsed, elapsed / MINTS * 1e6
+
+
+def lookups() -> float:
+    """Nanoseconds per cached token lookup."""
+    issuer = TokenIssuer(KEY, SECRET)
+    issuer.token("bench", "unit-0")
+    started = time.perf_counter()
+    for _ in range(LOOKUPS):
+        issuer.token("bench", "unit-0")
+    return (time.perf_counter() - started) / LOOKUPS * 1e9
+
+
+async def reconnects(
+    sessions: int, refresh: bool
+) -> tuple[TokenIssuer, LatencyWindow, int]:
+    issuer = TokenIssuer(KEY, SECRET, ttl_s=TTL_S, refresh_s=REFRESH_S)
+    leases = [issuer.lease("bench", f"unit-{i:05d}") for i in range(sessions)]
+    if not refresh:
+        issuer.stop()
+    for lease in leases:
+        await lease()
+    latency = LatencyWindow(sessions * int(RUN_S * RECONNECTS_PER_S) * 2)
+    expired = 0
+
+    async def session(lease, rng: random.Random):
+        nonlocal expired
+        deadline = time.monotonic() + RUN_S
+        while time.monotonic() < deadline:
+            await asyncio.sleep(rng.expovariate(RECONNECTS_PER_S))
+            started = time.perf_counter()
+            await lease()
+            latency.record((time.perf_counter() - started) * 1e6)
+            if issuer._cache[lease.key][1] <= time.time():
+                expired += 1
+
+    await asyncio.gather(
+        *(session(lease, random.Random(i)) for i, lease in enumerate(leases))
+    )
+    issuer.stop()
+    return issuer, latency, expired
+
+
+async def main(sessions: int):
+    rate, mean_us = issuance()
+    print(f"issuance: {rate:,.0f} tokens/s ({mean_us:.1f} us each)")
+    print(f"cached lookup: {lookups():.0f} ns")
+    for refresh in (False, True):
+        issuer, latency, expired = await reconnects(sessions, refresh)
+        stats = issuer.stats()
+        summary = latency.summary()
+        print(
+            f"{sessions} sessions, ttl {TTL_S:.0f} s, {RUN_S:.0f} s of reconnects,"
+            f" refresher {'on' if refresh else 'off'}:"
+            f" hit rate {stats['hit_rate']:.1%}, {stats['misses']} signed on demand,"
+            f" {stats['refreshed']} refreshed ahead,"
+            f" provider p50 {summary['p50']:.1f} us p99 {summary['p99']:.1f} us,"
+            f" expired served {expired}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
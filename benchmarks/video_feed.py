@@ -0,0 +1,65 @@
+"""Remote video pipeline under a fast and a slow viewer.
+
+Feeds synthetic 720p RGB24 frames at 30 fps into a VideoFeed and reports
+encode time, delivered fps and dropped frames.
+
+Run with: python -m benchmarks.video_feed [seconds]
+"""
+
+import asyncio
+import sys
+import types
+import numpy as np
+from livekit import rtc
+from app.services.video import VideoFeed
+
+
+class FakeVideoStream:
+    """Produces RGB24 frames at a fixed rate, like rtc.VideoStream would."""
+
+    def __init__(self, width: int = 1280, height: int = 720, fps: int = 30):
+        rng = np.random.default_rng(5)
+        self._frames = [
+            rtc.VideoFrame(
+                width,
+                height,
+                rtc.VideoBufferType.RGB24,
+                rng.integers(0, 255, width * height * 3, dtype=np.uint8).tobytes(),
+            )
+            for _ in range(4)
+        ]
+        self._interval = 1 / fps
+        self._count = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self._interval)
+        self._count += 1
+        return types.SimpleNamespace(frame=self._frames[self._count % 4])
+
+    async def aclose(self):
+        pass
+
+
+async def viewer(feed: VideoFeed, delay: float, received: list[int]):
+    async for _ in feed.frames():
+        received[0] += 1
+        await asyncio.sleep(delay)
+
+
+async def run(seconds: float) -> None:
+    for name, delay in (("fast viewer", 0.0), ("slow viewer", 0.25)):
+        feed = VideoFeed(None, stream=FakeVideoStream())
+        received = [0]
+        task = asyncio.create_task(viewer(feed, delay, received))
+        await asyncio.sleep(seconds)
+        stats = feed.stats()
+        task.cancel()
+        await feed.aclose()
+        print(f"{name}: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(run(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0))
@@ -0,0 +1,109 @@
+"""VOX detection cost and uplink saved against an always-open mic.
+
+Synthesises a conversation turn pattern (harmonic voiced talk spurts with
+syllable-rate dips, separated by pauses) over background noise, feeds it
+10 ms at a time through a VoxController on a RoomSession, and reports the
+CPU per frame, how long the mic stayed open, the speech it clipped and the
+uplink saved. The noise gate's attenuation of the background is measured on
+the same audio.
+
+Run with: python -m benchmarks.vox_bandwidth [seconds]
+"""
+
+import asyncio
+import sys
+import numpy as np
+from app.services.mic import FRAME_SAMPLES, SAMPLE_RATE
+from app.services.session import RoomSession
+from app.services.vox import MIC_KBPS, VoxController
+
+NOISE_DB = (-60.0, -45.0)
+SPEECH_DB = -20.0
+HANGS_MS = (400, 800, 1500)
+
+
+class InstantTrack:
+    """Local track whose mute/unmute apply synchronously, as in the SDK."""
+
+    muted = True
+
+    def mute(self):
+        self.muted = True
+
+    def unmute(self):
+        self.muted = False
+
+
+def conversation(seconds: float, noise_db: float, seed: int = 3):
+    """(int16 PCM, per-frame speech mask) for alternating talk and silence."""
+    rng = np.random.default_rng(seed)
+    frames = int(seconds * 100)
+    speech = np.zeros(frames, dtype=bool)
+    at = 0
+    while at < frames:
+        at += int(rng.exponential(200)) + 50
+        length = int(rng.exponential(150)) + 40
+        speech[at : at + length] = True
+        at += length
+    t = np.arange(frames * FRAME_SAMPLES) / SAMPLE_RATE
+    f0 = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    envelope = np.repeat(speech, FRAME_SAMPLES) * syllables
+    level = 10 ** (SPEECH_DB / 20) * 32768 / np.sqrt(np.mean(voice**2))
+    noise = rng.normal(0, 10 ** (noise_db / 20) * 32768, t.size)
+    noise = np.convolve(noise, np.ones(4) / 2, mode="same")
+    pcm = np.clip(voice * envelope * level + noise, -32768, 32767)
+    return pcm.astype(np.int16), speech
+
+
+async def run(pcm: np.ndarray, speech: np.ndarray, hang_ms: int, gate: bool):
+    session = RoomSession("ws://benchmark", "")
+    session.audio_track = InstantTrack()
+    session.audio_publication = object()
+    vox = session.vox = VoxController(session, True, gate, hang_ms)
+    out = np.empty_like(pcm)
+    open_mask = np.zeros(speech.size, dtype=bool)
+    for i in range(speech.size):
+        frame = slice(i * FRAME_SAMPLES, (i + 1) * FRAME_SAMPLES)
+        out[frame] = vox.process(pcm[frame])
+        await asyncio.sleep(0)
+        open_mask[i] = session.ptt.transmitting
+    return vox, out, open_mask
+
+
+def level_db(pcm: np.ndarray) -> float:
+    rms = np.sqrt(np.mean((pcm.astype(np.float64) / 32768) ** 2))
+    return 20 * np.log10(rms + 1e-12)
+
+
+async def main(seconds: float):
+    for noise_db in NOISE_DB:
+        pcm, speech = conversation(seconds, noise_db)
+        print(
+            f"noise {noise_db:.0f} dBFS, speech {speech.mean():.0%} of {seconds:.0f} s"
+        )
+        for hang_ms in HANGS_MS:
+            vox, _, open_mask = await run(pcm, speech, hang_ms, gate=False)
+            clipped = (speech & ~open_mask).sum() / max(1, speech.sum())
+            stats = vox.stats()
+            p99 = vox.process_us.percentile(99)
+            print(
+                f"  hang {hang_ms:>4} ms: {stats['cpu_us_per_frame']:5.1f} us/frame"
+                f" (p99 {p99:5.1f} per call, {stats['cpu_pct']:.2f}% of a core),"
+                f" open {open_mask.mean():5.1%}, clipped {clipped:5.1%},"
+                f" {vox.transmissions:>3} transmissions,"
+                f" saved {MIC_KBPS * (1 - open_mask.mean()):4.1f} of {MIC_KBPS} kbps"
+            )
+        vox, out, _ = await run(pcm, speech, HANGS_MS[1], gate=True)
+        quiet = ~np.repeat(speech, FRAME_SAMPLES)
+        print(
+            f"  gate: {vox.stats()['cpu_us_per_frame']:5.1f} us/frame with VAD,"
+            f" background {level_db(pcm[quiet]):.1f} -> {level_db(out[quiet]):.1f} dBFS,"
+            f" speech {level_db(pcm[~quiet]):.1f} -> {level_db(out[~quiet]):.1f} dBFS"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 120.0))
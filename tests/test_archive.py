@@ -0,0 +1,53 @@
+import wave
+import numpy as np
+from app.services import archive as archive_module
+from app.services.archive import TransmissionArchive
+
+
+def record(archive, room, identity, value, frames=1600):
+    handle = archive.open(room, identity, 16000)
+    assert archive.write(handle, np.full(frames, value, dtype=np.int16))
+    archive.close(handle)
+
+
+def test_room_scoped_reads_only_reach_their_room(tmp_path):
+    archive = TransmissionArchive(tmp_path)
+    record(archive, "ops", "unit-1", 1000)
+    record(archive, "field", "unit-2", -1000, frames=3200)
+    assert archive.flush()
+
+    rows = archive.search()
+    assert {(r["room"], r["identity"]) for r in rows} == {
+        ("ops", "unit-1"),
+        ("field", "unit-2"),
+    }
+    ops = archive.search(room="ops")
+    assert [(r["identity"], r["duration_ms"]) for r in ops] == [("unit-1", 100)]
+    assert archive.search(room="field", identity="unit-1") == []
+    field_id = archive.search(room="field")[0]["id"]
+
+    assert archive.read(field_id, "ops") is None
+    assert archive.read(12345) is None
+    chunks = archive.read(ops[0]["id"], "ops")
+    path = tmp_path / "ops.wav"
+    path.write_bytes(b"".join(chunks))
+    with wave.open(str(path)) as wav:
+        assert wav.getframerate() == 16000
+        pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    assert pcm.size == 1600 and (pcm == 1000).all()
+
+
+def test_archives_sharing_a_root_never_share_a_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(archive_module, "_now_ms", lambda: 1_700_000_000_000)
+    first, second = TransmissionArchive(tmp_path), TransmissionArchive(tmp_path)
+    record(first, "ops", "unit-1", 1000)
+    record(second, "ops", "unit-1", -1000)
+    assert first.flush() and second.flush()
+
+    paths = {first.path(row["id"]) for row in first.search()}
+    assert len(paths) == 2
+    values = set()
+    for path in paths:
+        with wave.open(str(path)) as wav:
+            values.add(int(np.frombuffer(wav.readframes(1), dtype=np.int16)[0]))
+    assert values == {1000, -1000}
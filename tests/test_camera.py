@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+from app.services import camera
+from app.services.camera import CAMERA_TALKING, CameraGovernor
+
+
+class StatsRoom:
+    """Counts stats calls; reports no video layers."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def on(self, event, handler):
+        return handler
+
+    def off(self, event, handler):
+        pass
+
+    async def get_rtc_stats(self):
+        self.calls += 1
+        return SimpleNamespace(publisher_stats=[])
+
+
+def test_no_stats_calls_around_ptt(monkeypatch):
+    monkeypatch.setattr(camera, "CAMERA_POLL_S", 0.01)
+
+    async def scenario():
+        room = StatsRoom()
+        ptt = SimpleNamespace(busy=True, transmitting=False)
+        session = SimpleNamespace(room=room, ptt=ptt, video_track=None)
+        governor = CameraGovernor(session, None)
+        governor.attach()
+        await asyncio.sleep(0.1)
+        pressing = room.calls
+        ptt.busy, ptt.transmitting = False, True
+        await asyncio.sleep(0.1)
+        on_air = (room.calls, governor.level)
+        ptt.transmitting = False
+        await asyncio.sleep(0.1)
+        governor.close()
+        return pressing, on_air, room.calls, governor.skipped
+
+    pressing, (on_air, level), idle, skipped = asyncio.run(scenario())
+    assert pressing == 0 and skipped > 0
+    assert on_air == 0 and level == CAMERA_TALKING
+    assert idle > 0
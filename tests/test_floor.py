@@ -0,0 +1,107 @@
+import asyncio
+from app.services import floor as floor_module
+from app.services.floor import (
+    ANNOUNCE,
+    FLOOR_GRANT_BUDGET_MS,
+    FLOOR_REQUEST_TRIES,
+    FLOOR_TOPIC,
+    REQUEST,
+    FloorControl,
+    decode_floor,
+    encode_floor,
+    floor_priorities,
+)
+from benchmarks.fake_room import FakeNetwork
+from benchmarks.floor_rtt import measure
+
+
+def test_grants_within_budget_and_checks_pass():
+    summary, failures = asyncio.run(measure(8, 40))
+    assert failures == []
+    assert summary["count"] == 40
+    assert summary["p95"] <= FLOOR_GRANT_BUDGET_MS
+
+
+def test_newcomer_does_not_elect_itself_before_hearing_older_clients():
+    async def scenario():
+        network = FakeNetwork(latency=0.02)
+        first = FloorControl(network.join("unit-b"), {})
+        first.attach()
+        assert await asyncio.wait_for(first.acquire(), 0.5)
+        newcomer = FloorControl(network.join("unit-a"), {})
+        newcomer.attach()
+        pressed = asyncio.create_task(newcomer.acquire())
+        await asyncio.sleep(0.2)
+        result = (pressed.done(), first.arbiter, newcomer.arbiter, newcomer.holder)
+        for floor in (first, newcomer):
+            floor.close()
+        return result
+
+    done, first_arbiter, newcomer_arbiter, holder = asyncio.run(scenario())
+    assert not done
+    assert first_arbiter == newcomer_arbiter == "unit-b"
+    assert holder == "unit-b"
+
+
+def test_press_fails_when_the_arbiter_never_answers(monkeypatch):
+    monkeypatch.setattr(floor_module, "FLOOR_RETRY_S", 0.05)
+
+    async def scenario():
+        network = FakeNetwork(latency=0.01)
+        hung = network.join("unit-a")
+        requests = []
+        hung.on(
+            "data_received",
+            lambda packet: requests.append(decode_floor(packet.data)[0] == REQUEST),
+        )
+        floor = FloorControl(network.join("unit-b"), {})
+        floor.attach()
+        announce = encode_floor(ANNOUNCE, 0, "unit-a")
+        await hung.local_participant.publish_data(announce, topic=FLOOR_TOPIC)
+        await asyncio.sleep(0.05)
+        granted = await asyncio.wait_for(floor.acquire(), 1.0)
+        result = (granted, floor.arbiter, floor.holder, sum(requests))
+        floor.close()
+        return result
+
+    granted, arbiter, holder, requests = asyncio.run(scenario())
+    assert not granted
+    assert arbiter == "unit-a" and holder == ""
+    assert requests == FLOOR_REQUEST_TRIES
+
+
+def test_queued_press_waits_while_the_arbiter_answers(monkeypatch):
+    monkeypatch.setattr(floor_module, "FLOOR_RETRY_S", 0.05)
+
+    async def scenario():
+        network = FakeNetwork(latency=0.01)
+        first = FloorControl(network.join("unit-a"), {})
+        first.attach()
+        assert await asyncio.wait_for(first.acquire(), 0.5)
+        second = FloorControl(network.join("unit-b"), {})
+        second.attach()
+        await asyncio.sleep(0.05)
+        change = asyncio.create_task(anext(second.updates()))
+        await asyncio.sleep(0)
+        pressed = asyncio.create_task(second.acquire())
+        await asyncio.wait_for(change, 0.5)
+        await asyncio.sleep(0.05 * (FLOOR_REQUEST_TRIES + 2))
+        waiting = second.waiting and not pressed.done()
+        first.release()
+        granted = await asyncio.wait_for(pressed, 0.5)
+        result = (waiting, granted, second.waiting)
+        for floor in (first, second):
+            floor.close()
+        return result
+
+    waiting, granted, still_waiting = asyncio.run(scenario())
+    assert waiting and granted and not still_waiting
+
+
+def test_floor_priorities():
+    assert floor_priorities("dispatch=5, lead=2,bad=x,=3,clamp=900") == {
+        "dispatch": 5,
+        "lead": 2,
+        "clamp": 255,
+    }
+    assert floor_priorities("") == {}
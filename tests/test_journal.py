@@ -0,0 +1,65 @@
+import asyncio
+from livekit import rtc
+from app.services.journal import (
+    META,
+    PTT_ON_AIR,
+    PTT_PRESS,
+    PTT_RELEASE,
+    RoomJournal,
+    read_journal,
+)
+from benchmarks.fake_room import FakeRoom
+from benchmarks.replay import Replayer
+from benchmarks.suite import Harness
+
+SPEED = 20.0
+
+
+def test_replay_reproduces_the_recorded_events(tmp_path):
+    async def scenario():
+        room = FakeRoom()
+        room.join("unit-a")
+        source = RoomJournal(room, tmp_path / "source.ptj")
+        source.attach()
+        unit = room.join("unit-b")
+        mic = next(
+            pub
+            for pub in unit.track_publications.values()
+            if pub.source == rtc.TrackSource.SOURCE_MICROPHONE
+        )
+        await asyncio.sleep(0.05)
+        room.set_subscribed(unit, mic, True)
+        room.emit("active_speakers_changed", [unit])
+        # A free floor: the session goes on the air as soon as it is pressed.
+        source.record(PTT_PRESS)
+        source.record(PTT_ON_AIR)
+        await asyncio.sleep(0.1)
+        source.record(PTT_RELEASE)
+        room.set_muted(unit, mic, True)
+        room.emit("active_speakers_changed", [])
+        room.leave(unit)
+        source.close()
+        recorded = list(read_journal(source.path))
+
+        harness = Harness(0, {"joins": 0.0, "leaves": 0.0, "mutes": 0.0})
+        replayed = RoomJournal(harness.room, tmp_path / "replayed.ptj")
+        replayed.attach()
+        harness.session.journal = replayed
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await Replayer(harness).run(recorded, SPEED)
+        wall = loop.time() - started
+        replayed.close()
+        await harness.close()
+        return recorded, list(read_journal(replayed.path)), wall
+
+    recorded, replayed, wall = asyncio.run(scenario())
+
+    def events(records):
+        return [(code, args) for _, code, args in records if code != META]
+
+    assert events(replayed) == events(recorded)
+    assert len(events(recorded)) > 8
+    recorded_s = recorded[-1][0] / 1000
+    assert recorded_s >= 0.15
+    assert wall < recorded_s / 2
@@ -0,0 +1,78 @@
+import asyncio
+import numpy as np
+from app.services import mixer as mixer_module
+from app.services.mixer import LIMITER_RELEASE, AudioMixer, JitterBuffer, mix
+from benchmarks.fake_room import FakeRoom
+
+
+def test_mix_applies_gains_and_limits_peaks():
+    frames = np.array([[1000, -2000], [3000, 500]], dtype=np.int16)
+    mixed, limiter = mix(frames, np.array([1.0, 0.5], dtype=np.float32), 1.0)
+    assert mixed.tolist() == [2500, -1750]
+    assert limiter == 1.0
+
+    loud = np.full((2, 4), 30000, dtype=np.int16)
+    mixed, limiter = mix(loud, np.ones(2, dtype=np.float32), 1.0)
+    assert mixed.max() <= 32767 and mixed.min() >= 32766
+    assert abs(limiter - (32767 / 60000 + LIMITER_RELEASE)) < 1e-6
+
+
+def test_jitter_buffer_primes_underruns_and_spans_chunks():
+    buffer = JitterBuffer(target=4, limit=16)
+    buffer.push(np.array([1, 2, 3], dtype=np.int16), 1.0)
+    assert buffer.pop(2) == (None, None)
+    assert buffer.underruns == 0
+    buffer.push(np.array([4, 5], dtype=np.int16), 2.0)
+    pcm, arrived = buffer.pop(2)
+    assert pcm.tolist() == [1, 2] and arrived == 1.0
+    pcm, arrived = buffer.pop(2)
+    assert pcm.tolist() == [3, 4] and arrived == 1.0
+    assert buffer.pop(2) == (None, None)
+    assert buffer.underruns == 1 and len(buffer) == 1
+    # Re-primes: one sample is not enough to read again.
+    buffer.push(np.array([6, 7], dtype=np.int16), 3.0)
+    assert buffer.pop(2) == (None, None)
+
+
+def test_jitter_buffer_drops_oldest_past_limit():
+    buffer = JitterBuffer(target=2, limit=6)
+    for i in range(4):
+        buffer.push(np.full(2, i, dtype=np.int16), float(i))
+    assert len(buffer) == 6 and buffer.dropped == 2
+    pcm, arrived = buffer.pop(2)
+    assert pcm.tolist() == [1, 1] and arrived == 1.0
+
+
+class FakeInput:
+    closed = 0
+
+    def __init__(self, track, identity: str):
+        self.identity = identity
+
+    async def aclose(self):
+        FakeInput.closed += 1
+
+
+def test_tracks_are_decoded_only_while_listening(monkeypatch):
+    monkeypatch.setattr(mixer_module, "MixerInput", FakeInput)
+
+    async def scenario():
+        room = FakeRoom()
+        mixer = AudioMixer(room)
+        mixer.attach()
+        p = room.join("unit-1", video=False)
+        pub = next(iter(p.track_publications.values()))
+        room.set_subscribed(p, pub, True)
+        idle = (len(mixer.tracks), len(mixer.inputs))
+        queue = mixer.listen()
+        listening = set(mixer.inputs)
+        mixer.unlisten(queue)
+        await asyncio.sleep(0)
+        stopped = len(mixer.inputs)
+        mixer.close()
+        return idle, listening, pub.sid, stopped
+
+    idle, listening, sid, stopped = asyncio.run(scenario())
+    assert idle == (1, 0)
+    assert listening == {sid}
+    assert stopped == 0 and FakeInput.closed == 1
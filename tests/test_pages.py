@@ -0,0 +1,5 @@
+from app.app import index
+
+
+def test_index_builds():
+    assert index() is not None
@@ -0,0 +1,40 @@
+import asyncio
+from app.services.ptt import PttLane
+from benchmarks.ptt_stress import LANE_P99_BUDGET_MS, FakeLocalTrack, measure
+
+
+def test_lane_meets_budget_under_refresh():
+    r = asyncio.run(measure(1000, 100))
+    assert not r["mic_open"]
+    assert r["lane"]["count"] == 200
+    assert r["lane"]["p99"] <= LANE_P99_BUDGET_MS
+
+
+def test_press_overtaken_by_release_never_opens_mic():
+    async def scenario():
+        lane = PttLane()
+        track = FakeLocalTrack()
+        async with lane._lock:
+            press = asyncio.create_task(lane.set_talking(track, True))
+            release = asyncio.create_task(lane.set_talking(track, False))
+            await asyncio.sleep(0)
+        return track, lane, await press, await release
+
+    track, lane, pressed, released = asyncio.run(scenario())
+    assert track.unmutes == 0
+    assert track.muted and not lane.transmitting
+    assert not pressed and not released
+
+
+def test_press_then_release_toggles_mic():
+    async def scenario():
+        lane = PttLane()
+        track = FakeLocalTrack()
+        assert await lane.set_talking(track, True)
+        assert not track.muted and lane.transmitting
+        assert not await lane.set_talking(track, False)
+        return track, lane
+
+    track, lane = asyncio.run(scenario())
+    assert track.muted and not lane.transmitting
+    assert track.unmutes == 1
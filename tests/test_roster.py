@@ -0,0 +1,213 @@
+import asyncio
+from types import SimpleNamespace
+from livekit import rtc
+from app.services.directory import (
+    ROSTER_PAGE_SIZE,
+    RosterDirectory,
+    has_next_page,
+    last_page,
+    page_bounds,
+)
+from app.services.registry import TrackRegistry
+from app.services.roster import RosterTracker
+from app.states.livekit_state import LiveKitState
+from benchmarks.fake_room import FakeParticipant, FakePublication, FakeRoom
+
+
+def row(sid, identity, speaking=False, audio=False, subscribed=False, video=False):
+    return {
+        "sid": sid,
+        "identity": identity,
+        "speaking": speaking,
+        "has_audio": audio,
+        "audio_subscribed": subscribed,
+        "video_subscribed": video,
+    }
+
+
+def identities(rows):
+    return [r["identity"] for r in rows]
+
+
+def rows(dirty_vars):
+    return {var for var in dirty_vars if var.startswith("roster_row_")}
+
+
+def test_registry_indexes_publications_by_source():
+    registry = TrackRegistry()
+    p = FakeParticipant("unit-1")
+    mic = FakePublication(rtc.TrackSource.SOURCE_MICROPHONE)
+    p.track_publications[mic.sid] = mic
+    registry.add_participant(p)
+    spare = FakePublication(rtc.TrackSource.SOURCE_MICROPHONE)
+    registry.add_publication(p, spare)
+    assert registry.publication(p.sid, rtc.TrackSource.SOURCE_MICROPHONE) is mic
+    registry.remove_publication(p, mic)
+    assert registry.publication(p.sid, rtc.TrackSource.SOURCE_MICROPHONE) is spare
+    assert registry.get(p.sid).row()["has_audio"]
+    assert registry.remove_participant(p.sid).identity == "unit-1"
+    assert len(registry) == 0
+
+
+def test_insert_remove_and_rename_keep_name_order():
+    directory = RosterDirectory()
+    directory.apply({"a": row("a", "Charlie"), "b": row("b", "alpha")})
+    directory.apply({"c": row("c", "Bravo")})
+    assert identities(directory.view()[0]) == ["alpha", "Bravo", "Charlie"]
+    directory.apply({"a": row("a", "aardvark")})
+    assert identities(directory.view()[0]) == ["aardvark", "alpha", "Bravo"]
+    directory.apply({"b": None, "missing": None})
+    rows, total = directory.view()
+    assert identities(rows) == ["aardvark", "Bravo"] and total == 2
+    for order in ("talking", "audio", "recent"):
+        assert len(directory.view(order)[0]) == 2
+
+
+def test_sort_orders():
+    directory = RosterDirectory()
+    directory.apply(
+        {
+            "a": row("a", "alpha"),
+            "b": row("b", "bravo", audio=True),
+            "c": row("c", "charlie", audio=True, subscribed=True),
+            "d": row("d", "delta", speaking=True),
+        }
+    )
+    assert identities(directory.view("name")[0]) == [
+        "alpha",
+        "bravo",
+        "charlie",
+        "delta",
+    ]
+    assert identities(directory.view("talking")[0])[0] == "delta"
+    assert identities(directory.view("audio")[0]) == [
+        "charlie",
+        "bravo",
+        "alpha",
+        "delta",
+    ]
+    # Most recently active first; never-active rows by name after them.
+    directory.apply({"d": row("d", "delta")})
+    directory.apply({"b": row("b", "bravo", audio=True, speaking=True)})
+    assert identities(directory.view("recent")[0]) == [
+        "bravo",
+        "delta",
+        "alpha",
+        "charlie",
+    ]
+    assert identities(directory.view("bogus")[0]) == identities(directory.view()[0])
+
+
+def test_query_filters_by_identity_prefix():
+    directory = RosterDirectory()
+    directory.apply({f"s{i}": row(f"s{i}", f"unit-{i:03d}") for i in range(100)})
+    directory.apply({"x": row("x", "Dispatch", speaking=True)})
+    rows, total = directory.view("name", " DIS ")
+    assert identities(rows) == ["Dispatch"] and total == 1
+    # Few matches: sorted on their own.
+    rows, total = directory.view("talking", "unit-00")
+    assert total == 10 and identities(rows) == [f"unit-00{i}" for i in range(10)]
+    # Most rows match: the order is walked and filtered.
+    rows, total = directory.view("talking", "unit", offset=95)
+    assert total == 100
+    assert identities(rows) == [f"unit-{i:03d}" for i in range(95, 100)]
+    assert directory.view("recent", "nobody") == ([], 0)
+
+
+def test_page_bounds():
+    directory = RosterDirectory()
+    directory.apply({f"s{i:03d}": row(f"s{i:03d}", f"u{i:03d}") for i in range(120)})
+    rows, total = directory.view(offset=100, limit=50)
+    assert identities(rows) == [f"u{i:03d}" for i in range(100, 120)]
+    assert total == 120
+    assert page_bounds(0, 120) == (1, 50)
+    assert page_bounds(100, 120) == (101, 120)
+    assert page_bounds(0, 0) == (0, 0)
+    assert page_bounds(150, 120) == (0, 0)
+    assert has_next_page(0, 120) and has_next_page(50, 120)
+    assert not has_next_page(100, 120) and not has_next_page(0, 50)
+    assert last_page(120) == 100 and last_page(100) == 50 and last_page(0) == 0
+
+
+def test_tracker_patches_feed_the_directory():
+    async def scenario():
+        room = FakeRoom()
+        first = room.join("bravo", video=False)
+        tracker = RosterTracker(room)
+        tracker.attach()
+        updates = tracker.updates(window=0)
+        initial = await anext(updates)
+        second = room.join("alpha")
+        room.leave(first)
+        patch = await anext(updates)
+        tracker.close()
+        return initial, patch, first.sid, second.sid, tracker.directory.view()
+
+    initial, patch, gone, joined, (rows, total) = asyncio.run(scenario())
+    assert list(initial) == [gone]
+    assert patch[gone] is None and patch[joined]["has_video"]
+    assert identities(rows) == ["alpha"] and total == 1
+
+
+def test_state_resends_only_the_rows_that_changed():
+    async def scenario():
+        room = FakeRoom()
+        units = room.populate(3)
+        tracker = RosterTracker(room)
+        tracker.attach()
+        state = LiveKitState(_reflex_internal_init=True)
+        state._session = SimpleNamespace(roster=tracker, thumbnails=None, autosub=None)
+        updates = tracker.updates(window=0)
+        pushes = []
+
+        async def push():
+            await anext(updates)
+            state._push_roster(tracker)
+            pushes.append((set(state.dirty_vars), dict(state.roster_push)))
+            state._clean()
+
+        await push()
+        mic = next(iter(units[1].track_publications.values()))
+        room.set_subscribed(units[1], mic, True)
+        await push()
+        room.join("aardvark", audio=False, video=False)
+        await push()
+        room.leave(units[0])
+        await push()
+        tracker.close()
+        return pushes, state
+
+    pushes, state = asyncio.run(scenario())
+    (initial, _), (flip, flip_push), (joined, _), (left, _) = pushes
+    assert len(rows(initial)) == 3 and "roster_slots" in initial
+    assert rows(flip) == {"roster_row_1"} and "roster_slots" not in flip
+    assert flip_push["rows"] == 1 and 0 < flip_push["delta_bytes"] < 1024
+    assert len(rows(joined)) == 1 and "roster_slots" in joined
+    assert not rows(left) and "roster_slots" in left
+    page = [getattr(state, f"roster_row_{slot}") for slot in state.roster_slots]
+    assert identities(page) == ["aardvark", "unit-0001", "unit-0002"]
+
+
+def test_paging_past_the_end_stays_on_the_last_page():
+    async def scenario():
+        room = FakeRoom()
+        room.populate(ROSTER_PAGE_SIZE + 5)
+        tracker = RosterTracker(room)
+        tracker.attach()
+        state = LiveKitState(_reflex_internal_init=True)
+        state._session = SimpleNamespace(roster=tracker, thumbnails=None, autosub=None)
+        await anext(tracker.updates(window=0))
+        state._push_roster(tracker)
+        offsets = []
+        for step in (1, 1, -1, -1):
+            state.roster_page(step)
+            offsets.append((state.roster_offset, len(state.roster_slots)))
+        tracker.close()
+        return offsets
+
+    assert asyncio.run(scenario()) == [
+        (ROSTER_PAGE_SIZE, 5),
+        (ROSTER_PAGE_SIZE, 5),
+        (0, ROSTER_PAGE_SIZE),
+        (0, ROSTER_PAGE_SIZE),
+    ]
@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from app.services.telemetry import (
+    BATTERY,
+    FLAGS,
+    POSITION,
+    TELEMETRY_TOPIC,
+    TelemetryChannel,
+    UnitStatus,
+    decode_telemetry,
+    encode_telemetry,
+    newer,
+)
+
+
+def status(position=None, battery=None, talking=False, busy=False) -> UnitStatus:
+    s = UnitStatus()
+    s.position, s.battery, s.talking, s.busy = position, battery, talking, busy
+    return s
+
+
+def test_codec_round_trip():
+    sent = status((59.3293235, -18.0685808), 87, talking=True, busy=True)
+    for mask in (FLAGS, POSITION, BATTERY | FLAGS, POSITION | BATTERY | FLAGS):
+        packet = encode_telemetry(513, mask, sent)
+        seq, got_mask, got = decode_telemetry(packet)
+        assert (seq, got_mask) == (513, mask)
+        if mask & POSITION:
+            assert got.position == sent.position
+        else:
+            assert got.position is None
+        assert got.battery == (87 if mask & BATTERY else None)
+        flags = bool(mask & FLAGS)
+        assert (got.talking, got.busy) == (flags, flags)
+    assert len(encode_telemetry(1, FLAGS, sent)) == 5
+    assert len(encode_telemetry(1, sent.mask, sent)) == 14
+
+
+def test_decode_rejects_truncated_and_foreign_packets():
+    packet = encode_telemetry(7, POSITION | BATTERY, status((1.0, 2.0), 50))
+    assert decode_telemetry(packet[:-1]) is None
+    assert decode_telemetry(b"\x01\x00") is None
+    assert decode_telemetry(b"\x09" + packet[1:]) is None
+
+
+def test_newer_wraps_around():
+    assert newer(2, 1)
+    assert not newer(1, 1)
+    assert not newer(1, 2)
+    assert newer(3, 0xFFFE)
+    assert not newer(0xFFFE, 3)
+
+
+def test_late_lossy_packet_does_not_mask_a_newer_flag_change():
+    channel = TelemetryChannel(SimpleNamespace(remote_participants={}))
+    unit = SimpleNamespace(sid="PA_b", identity="unit-b")
+
+    def receive(seq, mask, sent):
+        data = encode_telemetry(seq, mask, sent)
+        packet = SimpleNamespace(topic=TELEMETRY_TOPIC, participant=unit, data=data)
+        channel._on_data_received(packet)
+
+    receive(1, FLAGS | POSITION, status((1.0, 2.0)))
+    # Lossy position 3 overtakes reliable flags 2; both must land.
+    receive(3, POSITION, status((1.5, 2.5)))
+    receive(2, FLAGS, status(talking=True))
+    got = channel.units["unit-b"]
+    assert got.talking and got.position == (1.5, 2.5)
+    assert channel.stale == 0
+    # A position older than the one shown is still dropped.
+    receive(2, POSITION, status((9.0, 9.0)))
+    assert got.position == (1.5, 2.5) and channel.stale == 1
@@ -0,0 +1,60 @@
+import asyncio
+import time
+import pytest
+from app.services.tokens import ANY_IDENTITY, TokenIssuer, token_allow_list
+
+SECRET = "test-secret-" * 4
+
+
+def test_token_allow_list():
+    assert token_allow_list(" ops , ops/lead, field/unit-1,field/unit-2,,/x") == {
+        "ops": frozenset((ANY_IDENTITY, "lead")),
+        "field": frozenset(("unit-1", "unit-2")),
+    }
+    assert token_allow_list("ops/*") == {"ops": frozenset((ANY_IDENTITY,))}
+    assert token_allow_list("") == {}
+
+
+def test_permits():
+    issuer = TokenIssuer(
+        "key",
+        SECRET,
+        allowed=token_allow_list("ops,ops/dispatch,field/unit-1"),
+        reserved=frozenset(("dispatch", "lead")),
+    )
+    assert issuer.permits("ops", "anyone")
+    assert issuer.permits("ops", "dispatch")
+    assert not issuer.permits("ops", "lead")
+    assert issuer.permits("field", "unit-1")
+    assert not issuer.permits("field", "unit-2")
+    assert not issuer.permits("other", "unit-1")
+    with pytest.raises(PermissionError):
+        issuer.token("ops", "lead")
+    assert issuer.denied == 1
+    assert TokenIssuer("key", SECRET).permits("any", "lead")
+
+
+def test_cache_hits_and_refreshes_leased_tokens():
+    async def scenario():
+        issuer = TokenIssuer("key", SECRET, ttl_s=3600, refresh_s=600)
+        lease = issuer.lease("ops", "unit-1")
+        try:
+            first = await lease()
+            assert await lease() == first
+            assert issuer.verify(first) == ("ops", "unit-1")
+            assert (issuer.hits, issuer.misses) == (1, 1)
+            # Age the leased token into the refresh window and let an
+            # unleased one expire.
+            issuer._cache[lease.key] = (first, time.time() + 60)
+            issuer.token("ops", "unit-2")
+            issuer._cache[("ops", "unit-2")] = ("stale", time.time() - 1)
+            issuer.refresh()
+            return issuer, lease, issuer._cache.copy()
+        finally:
+            issuer.stop()
+
+    issuer, lease, cache = asyncio.run(scenario())
+    assert issuer.refreshed == 1
+    assert set(cache) == {lease.key}
+    assert cache[lease.key][1] - time.time() > issuer.ttl_s - 60
+    assert issuer.stats()["leases"] == 1
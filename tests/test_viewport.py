@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+from app.services.viewport import HIGH, LOW, MEDIUM, ViewportController
+
+
+class FakePublication:
+    def __init__(self):
+        self.qualities = []
+
+    def set_video_quality(self, quality):
+        self.qualities.append(quality)
+
+
+def feeds(*sids):
+    publications = {sid: FakePublication() for sid in sids}
+    return SimpleNamespace(publications=publications, feeds={})
+
+
+def tile(track, height, visible=True):
+    width = height * 16 // 9
+    return {"track": track, "width": width, "height": height, "visible": visible}
+
+
+def test_only_changed_tiles_are_reapplied():
+    room = feeds("TR_a", "TR_b")
+    viewport = ViewportController()
+    viewport.apply(room, [tile("TR_a", 720), tile("TR_b", 300)], "one")
+    a, b = room.publications["TR_a"], room.publications["TR_b"]
+    assert a.qualities == [HIGH] and b.qualities == [MEDIUM]
+    viewport.apply(room, [tile("TR_a", 720), tile("TR_b", 100)], "one")
+    assert a.qualities == [HIGH] and b.qualities == [MEDIUM, LOW]
+    room.publications["TR_c"] = FakePublication()
+    viewport.apply(room, [tile("TR_a", 720), tile("TR_b", 100)], "one")
+    assert room.publications["TR_c"].qualities == [LOW]
+    viewport.apply(room, [tile("TR_a", 720)], "two")
+    viewport.forget(room, "one")
+    assert a.qualities == [HIGH] and b.qualities == [MEDIUM, LOW]
+
+
+def test_savings_report_measured_video_beside_estimates():
+    room = feeds("TR_a", "TR_b")
+    viewport = ViewportController()
+    viewport.apply(room, [tile("TR_a", 720), tile("TR_b", 100, visible=False)])
+    measured = {
+        "TR_a": {"kbps": 1200.0, "fps": 24.0, "pixels": 921600, "decode_ms": 30.0},
+        "TR_b": {"kbps": 90.5, "fps": 0.0, "pixels": 57600, "decode_ms": 0.0},
+        "TR_gone": {"kbps": 500.0, "fps": 24.0, "pixels": 0, "decode_ms": 9.0},
+    }
+    savings = viewport.savings(measured)
+    assert savings["tracks"] == 2 and savings["paused"] == 1
+    assert savings["kbps"] == 1290.5 and savings["decode_ms"] == 30.0
+    assert savings["saved_kbps_est"] > 0
+    assert viewport.savings()["kbps"] == 0
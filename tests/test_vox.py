@@ -0,0 +1,153 @@
+import asyncio
+import numpy as np
+from app.services.mic import FRAME_SAMPLES, SAMPLE_RATE
+from app.services.ptt import PttLane
+from app.services.vox import VOX_ATTACK_FRAMES, VoiceDetector, VoxController, frame_levels
+
+HANG_MS = 100
+HANG_FRAMES = HANG_MS // 10
+RNG = np.random.default_rng(3)
+
+
+def hiss(frames: int) -> np.ndarray:
+    return RNG.integers(-8, 9, frames * FRAME_SAMPLES).astype(np.int16)
+
+
+def voice(frames: int) -> np.ndarray:
+    t = np.arange(frames * FRAME_SAMPLES) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+
+
+def feed(detector: VoiceDetector, pcm: np.ndarray) -> list[bool]:
+    """Whether the detector is open after each 10 ms frame."""
+    states = []
+    for start in range(0, pcm.size, FRAME_SAMPLES):
+        detector.update(*frame_levels(pcm[start : start + FRAME_SAMPLES]))
+        states.append(detector.open)
+    return states
+
+
+def test_detector_attack_and_hangover():
+    detector = VoiceDetector(HANG_MS)
+    assert not any(feed(detector, hiss(50)))
+    assert feed(detector, voice(VOX_ATTACK_FRAMES)) == [False] * (
+        VOX_ATTACK_FRAMES - 1
+    ) + [True]
+    # A pause shorter than the hang time keeps the detector open.
+    assert all(feed(detector, hiss(HANG_FRAMES - 1)))
+    assert all(feed(detector, voice(5)))
+    closing = feed(detector, hiss(HANG_FRAMES + 5))
+    assert closing.index(False) == HANG_FRAMES - 1
+
+
+def test_single_voiced_frame_does_not_open():
+    detector = VoiceDetector(HANG_MS)
+    feed(detector, hiss(50))
+    for _ in range(5):
+        assert not any(feed(detector, voice(VOX_ATTACK_FRAMES - 1)))
+        feed(detector, hiss(1))
+
+
+class FakeTrack:
+    def __init__(self):
+        self.muted = True
+
+    def mute(self):
+        self.muted = True
+
+    def unmute(self):
+        self.muted = False
+
+
+class FakeSession:
+    """Just the PTT surface VoxController drives."""
+
+    def __init__(self, grant: bool):
+        self.grant = grant
+        self.ptt = PttLane()
+        self.track = FakeTrack()
+        self.presses = 0
+        self.releases = 0
+        self.vox = None
+
+    async def start_talking(self, trace) -> bool:
+        self.presses += 1
+        if not self.grant:
+            return False
+        return await self.ptt.set_talking(self.track, True, trace)
+
+    async def stop_talking(self) -> bool:
+        self.releases += 1
+        return await self.ptt.set_talking(self.track, False)
+
+
+async def speak(vox: VoxController, pcm: np.ndarray):
+    for start in range(0, pcm.size, FRAME_SAMPLES):
+        vox.process(pcm[start : start + FRAME_SAMPLES])
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+
+
+def test_vox_keys_and_releases_the_mic():
+    async def scenario():
+        session = FakeSession(grant=True)
+        vox = session.vox = VoxController(session, hang_ms=HANG_MS)
+        await speak(vox, hiss(30))
+        idle = session.presses
+        await speak(vox, voice(20))
+        on_air = (session.presses, session.ptt.transmitting, vox.talking)
+        await speak(vox, hiss(HANG_FRAMES + 5))
+        off = (session.releases, session.ptt.transmitting, vox.talking)
+        return idle, on_air, off
+
+    idle, on_air, off = asyncio.run(scenario())
+    assert idle == 0
+    assert on_air == (1, True, True)
+    assert off == (1, False, False)
+
+
+def test_denied_floor_asks_once_per_utterance():
+    async def scenario():
+        session = FakeSession(grant=False)
+        vox = session.vox = VoxController(session, hang_ms=HANG_MS)
+        await speak(vox, hiss(30))
+        await speak(vox, voice(40))
+        during = (session.presses, vox.talking, vox.denied)
+        await speak(vox, hiss(HANG_FRAMES + 5))
+        cleared = vox.denied
+        await speak(vox, voice(10))
+        return during, cleared, session.presses, session.releases
+
+    during, cleared, presses, releases = asyncio.run(scenario())
+    assert during == (1, False, True)
+    assert not cleared
+    assert presses == 2
+    assert releases == 0
+
+
+def test_close_cancels_a_press_in_flight():
+    async def scenario():
+        session = FakeSession(grant=True)
+        pressed = asyncio.Event()
+        held = asyncio.Event()
+
+        async def slow_start(trace):
+            session.presses += 1
+            pressed.set()
+            await held.wait()
+            return await session.ptt.set_talking(session.track, True, trace)
+
+        session.start_talking = slow_start
+        vox = session.vox = VoxController(session, hang_ms=HANG_MS)
+        await speak(vox, hiss(30))
+        await speak(vox, voice(5))
+        await asyncio.wait_for(pressed.wait(), 0.5)
+        keyed = vox.keyed
+        vox.close()
+        held.set()
+        await asyncio.sleep(0.01)
+        return keyed, vox.keyed, session.presses, session.track.muted
+
+    keyed, still_keyed, presses, muted = asyncio.run(scenario())
+    assert keyed and not still_keyed
+    assert presses == 1 and muted